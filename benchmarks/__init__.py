@@ -0,0 +1,10 @@
+"""Performance benchmarks for loanpy on seeded synthetic data.
+
+Run from the repository root::
+
+    python -m benchmarks run --size 100k -o results.json
+    python -m benchmarks compare baseline.json results.json
+
+See ``benchmarks/README.rst`` for sizes, case selection and the results
+format.
+"""
@@ -0,0 +1,10 @@
+"""Command-line entry point: ``python -m benchmarks``."""
+
+from __future__ import annotations
+
+import sys
+
+from benchmarks.runner import main
+
+if __name__ == "__main__":
+    sys.exit(main())
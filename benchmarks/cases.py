@@ -0,0 +1,706 @@
+"""Benchmark cases: one timed call per public loanpy entry point.
+
+Each case is a setup function registered with :func:`case`. It receives a
+:class:`Dataset` and returns ``(run, items)``: a callable doing the timed work
+and the number of words, pairs or rows it processes, so results can be
+compared per item across sizes. Everything built by the setup is excluded
+from the timing.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import tempfile
+from collections.abc import Callable, Iterable
+from functools import cached_property
+from itertools import cycle, islice
+
+import loanpy
+from benchmarks import generators
+from loanpy import (
+    Adapt,
+    BlockingIndex,
+    Cluster,
+    Clusterer,
+    CorpusStore,
+    DPAlign,
+    Instrumentation,
+    LoanwordPipeline,
+    LoanwordSearch,
+    MappedCorrespondences,
+    PairFilter,
+    ResultCache,
+    Scorer,
+    ScoringService,
+    SegmentTable,
+    SegmentVocabulary,
+    SharedLexicon,
+    SharedScorer,
+    Uralign,
+)
+
+#: Donor words scored against the whole recipient wordlist in pairwise cases.
+DONORS = 10
+#: Distinct inputs prepared for cases whose inputs are costly to hold; they
+#: are cycled to reach the dataset size.
+DISTINCT = 10_000
+#: Forms on each side of the square matrix of ``significance.permutations``.
+SQUARE = 300
+
+Setup = Callable[["Dataset"], "tuple[Callable[[], object], int]"]
+
+
+def segment_distance(a: str, b: str) -> float:
+    """Deterministic stand-in for a feature-based phoneme distance."""
+    if a == b:
+        return 0.0
+    distance = abs(ord(a[0]) - ord(b[0])) % 17 + abs(len(a) - len(b))
+    if (a[0] in "aeiouɛɔyøæəɑɨ") != (b[0] in "aeiouɛɔyøæəɑɨ"):
+        distance += 100
+    return float(distance)
+
+
+class Dataset:
+    """Synthetic inputs of one size, built lazily and cached.
+
+    Parameters
+    ----------
+    size:
+        Number of recipient words, cognate rows and donor-style words.
+    seed:
+        Seed of every generator; each attribute draws from its own stream, so
+        adding an attribute does not change the others.
+    """
+
+    def __init__(self, size: int, seed: int = 0) -> None:
+        self.size = size
+        self.seed = seed
+        self._tempdir = tempfile.TemporaryDirectory(prefix="loanpy-bench-")
+        self.tempdir = self._tempdir.name
+
+    def rng(self, name: str) -> random.Random:
+        return random.Random(f"{self.seed}:{name}")
+
+    def close(self) -> None:
+        self._tempdir.cleanup()
+
+    # Inventories and words.
+
+    @cached_property
+    def ancestor(self) -> generators.Inventory:
+        return generators.Inventory.sample(self.rng("ancestor"))
+
+    @cached_property
+    def descendant(self) -> generators.Inventory:
+        return generators.Inventory.sample(self.rng("descendant"))
+
+    @cached_property
+    def donor(self) -> generators.Inventory:
+        return generators.Inventory.sample(self.rng("donor"), 26, 10)
+
+    @cached_property
+    def recipients(self) -> list[tuple[str, list[str], list[str]]]:
+        return generators.wordlist(self.rng("recipients"), self.descendant, self.size)
+
+    @cached_property
+    def foreign(self) -> list[tuple[str, list[str], list[str]]]:
+        """Donor-language words, as many as recipients."""
+        return generators.wordlist(self.rng("foreign"), self.donor, self.size, "d")
+
+    @property
+    def donors(self) -> list[tuple[str, list[str], list[str]]]:
+        return self.foreign[:DONORS]
+
+    @cached_property
+    def recipient_forms(self) -> list[tuple[list[str], list[str]]]:
+        return [(segments, profile) for _, segments, profile in self.recipients]
+
+    # Correspondences, adaptation and alignment.
+
+    @cached_property
+    def cognates(self) -> list[dict[str, str]]:
+        return generators.cognate_table(
+            self.rng("cognates"), self.ancestor, self.descendant, self.size // 2
+        )
+
+    @cached_property
+    def correspondences(self) -> dict[str, dict]:
+        return loanpy.get_sound_correspondences(self.cognates, "Uralign")
+
+    @property
+    def frequency(self) -> dict[tuple[str, str], int]:
+        return self.correspondences["AbsoluteFrequency"]
+
+    @cached_property
+    def scorer(self) -> Scorer:
+        return Scorer(self.frequency)
+
+    @cached_property
+    def templates(self) -> list[str]:
+        return loanpy.expand_phonotactics(generators.phonotactic_formula(3))
+
+    @cached_property
+    def adapt(self) -> Adapt:
+        adapt = Adapt()
+        adapt.get_substitutions(
+            self.donor.segments, self.ancestor.segments, segment_distance, {}
+        )
+        return adapt
+
+    @cached_property
+    def substituted(self) -> list[tuple[list[str], list[str]]]:
+        substitute = self.adapt.substitute
+        return [(substitute(seg), cv) for _, seg, cv in self.foreign]
+
+    @cached_property
+    def adapted(self) -> list[tuple[list[str], list[str]]]:
+        search = LoanwordSearch(self.frequency, self.adapt, self.templates)
+        return [
+            search.adapt_word(seg, cv)
+            for _, seg, cv in islice(self.foreign, min(self.size, DISTINCT))
+        ]
+
+    @cached_property
+    def cognate_pairs(self) -> list[tuple[list[str], list[str], str, str]]:
+        """``Uralign.hu`` arguments of every cognate set."""
+        rows = self.cognates
+        return [
+            (
+                descendant["Segments"].split(),
+                ancestor["Segments"].split(),
+                descendant["CV"][:1],
+                ancestor["CV"][:1],
+            )
+            for descendant, ancestor in zip(rows[::2], rows[1::2])
+        ]
+
+    @cached_property
+    def alignments(self) -> list[tuple[tuple[str, ...], tuple[str, ...]]]:
+        return Uralign.hu_many(self.cognate_pairs)
+
+    @cached_property
+    def closest(self) -> list[tuple[str, str]]:
+        """``(cv_profile, closest template)`` of up to :data:`DISTINCT` words."""
+        return [
+            ("".join(cv), loanpy.get_closest_phonotactics(cv, self.templates))
+            for _, cv in islice(self.substituted, DISTINCT)
+        ]
+
+    # Files.
+
+    @cached_property
+    def recipients_csv(self) -> str:
+        path = os.path.join(self.tempdir, "recipients.csv")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("ID,Segments,CV\n")
+            for word_id, segments, profile in self.recipients:
+                f.write(f"{word_id},{' '.join(segments)},{''.join(profile)}\n")
+        return path
+
+    @cached_property
+    def binary_path(self) -> str:
+        path = os.path.join(self.tempdir, "correspondences.bin")
+        loanpy.dump_binary(self.correspondences, path)
+        return path
+
+
+#: Registered cases by name, in registration order.
+CASES: dict[str, Case] = {}
+
+
+class Case:
+    """A named benchmark and the public loanpy names it exercises."""
+
+    def __init__(self, name: str, setup: Setup, covers: tuple[str, ...]) -> None:
+        self.name = name
+        self.setup = setup
+        self.covers = covers
+
+
+def case(name: str, *covers: str) -> Callable[[Setup], Setup]:
+    """Register a setup function as benchmark ``name``."""
+
+    def register(setup: Setup) -> Setup:
+        if name in CASES:
+            raise ValueError(f"duplicate benchmark {name!r}")
+        CASES[name] = Case(name, setup, covers)
+        return setup
+
+    return register
+
+
+def _consume(iterable: Iterable) -> None:
+    for _ in iterable:
+        pass
+
+
+def _cycled(items: list, n: int) -> list:
+    return list(islice(cycle(items), n))
+
+
+# Adaptation.
+
+
+@case("adapt.get_substitutions", "Adapt")
+def _adapt_get_substitutions(data):
+    donor, ancestor = data.donor.segments, data.ancestor.segments
+    return (
+        lambda: Adapt().get_substitutions(donor, ancestor, segment_distance, {}),
+        len(donor - ancestor),
+    )
+
+
+@case("adapt.substitute", "Adapt")
+def _adapt_substitute(data):
+    substitute, words = data.adapt.substitute, data.foreign
+    return lambda: [substitute(seg) for _, seg, _ in words], len(words)
+
+
+@case("adapt.repair", "Adapt")
+def _adapt_repair(data):
+    repair, templates, words = data.adapt.repair, data.templates, data.substituted
+    return lambda: [repair(seg, cv, templates) for seg, cv in words], len(words)
+
+
+@case("phonotactics.expand_phonotactics", "expand_phonotactics")
+def _phonotactics_expand_phonotactics(data):
+    formula = generators.phonotactic_formula(8)
+    return lambda: loanpy.expand_phonotactics(formula), 4 * 2**7
+
+
+@case("phonotactics.get_closest_phonotactics", "get_closest_phonotactics")
+def _phonotactics_get_closest_phonotactics(data):
+    closest, templates = loanpy.get_closest_phonotactics, data.templates
+    words = data.substituted
+    return lambda: [closest(cv, templates) for _, cv in words], len(words)
+
+
+# Edit operations, as chained by Adapt.repair.
+
+
+@case("edit.edit_distance_with2ops", "edit_distance_with2ops")
+def _edit_edit_distance_with2ops(data):
+    pairs = _cycled(data.closest, data.size)
+    distance = loanpy.edit_distance_with2ops
+    return lambda: [distance(a, b, w_ins=100) for a, b in pairs], len(pairs)
+
+
+@case("edit.edit_distance_matrix", "edit_distance_matrix")
+def _edit_edit_distance_matrix(data):
+    pairs = _cycled(data.closest, data.size)
+    matrix = loanpy.edit_distance_matrix
+    return lambda: [matrix(a, b) for a, b in pairs], len(pairs)
+
+
+@case("edit.shortest_edit_path", "shortest_edit_path")
+def _edit_shortest_edit_path(data):
+    matrices = [loanpy.edit_distance_matrix(a, b) for a, b in data.closest]
+    path = loanpy.shortest_edit_path
+    n = data.size
+    return lambda: [path(mtx) for mtx in islice(cycle(matrices), n)], n
+
+
+@case("edit.path_to_edit_operations", "path_to_edit_operations")
+def _edit_path_to_edit_operations(data):
+    steps = [
+        (loanpy.shortest_edit_path(loanpy.edit_distance_matrix(a, b)), a, b)
+        for a, b in data.closest
+    ]
+    to_ops = loanpy.path_to_edit_operations
+    n = data.size
+    return lambda: [to_ops(*step) for step in islice(cycle(steps), n)], n
+
+
+@case("edit.substitute_operations", "substitute_operations")
+def _edit_substitute_operations(data):
+    operations = []
+    for a, b in data.closest:
+        path = loanpy.shortest_edit_path(loanpy.edit_distance_matrix(a, b))
+        ops = []
+        for (i0, j0), (i1, j1) in zip(path, path[1:]):
+            if (i1 - i0, j1 - j0) == (1, 1):
+                ops.append(f"keep {a[j0]}")
+            elif i1 == i0:
+                ops.append(f"delete {a[j0]}")
+            else:
+                ops.append(f"insert {b[i0]}")
+        operations.append(ops)
+    substitute, n = loanpy.substitute_operations, data.size
+    return lambda: [substitute(ops) for ops in islice(cycle(operations), n)], n
+
+
+@case("edit.apply_edit", "apply_edit")
+def _edit_apply_edit(data):
+    edits = []
+    for (segments, _), (a, b) in zip(data.substituted, data.closest):
+        path = loanpy.shortest_edit_path(loanpy.edit_distance_matrix(a, b))
+        edits.append((segments, loanpy.path_to_edit_operations(path, a, b)))
+    apply, n = loanpy.apply_edit, data.size
+    return lambda: [apply(seg, ops) for seg, ops in islice(cycle(edits), n)], n
+
+
+# Clustering and alignment.
+
+
+@case("cluster.cv", "Cluster")
+def _cluster_cv(data):
+    words = data.recipient_forms
+    return lambda: [Cluster.cv(seg, cv) for seg, cv in words], len(words)
+
+
+@case("cluster.glides", "Cluster")
+def _cluster_glides(data):
+    words = data.recipient_forms
+    return lambda: [Cluster.glides(seg, cv) for seg, cv in words], len(words)
+
+
+@case("cluster.glides_many", "Clusterer")
+def _cluster_glides_many(data):
+    clusterer, words = Clusterer(), data.recipient_forms
+    return lambda: clusterer.glides_many(words), len(words)
+
+
+@case("cluster.gaps", "Cluster")
+def _cluster_gaps(data):
+    pairs = [(list(a), list(b)) for a, b in data.alignments]
+    return lambda: [Cluster.gaps(a, b) for a, b in pairs], len(pairs)
+
+
+@case("cluster.gaps_many", "Cluster")
+def _cluster_gaps_many(data):
+    pairs = data.alignments
+    return lambda: _consume(Cluster.gaps_many(pairs)), len(pairs)
+
+
+@case("cluster.cv_many", "Cluster", "SegmentTable")
+def _cluster_cv_many(data):
+    table = SegmentTable.from_rows(
+        data.cognates[::2], "Segments", "CV", vocabulary=SegmentVocabulary()
+    )
+    return table.cluster_cv, len(table)
+
+
+@case("uralign.hu", "Uralign")
+def _uralign_hu(data):
+    pairs, hu = data.cognate_pairs, Uralign.hu
+    return lambda: [hu(list(a), list(b), c, d) for a, b, c, d in pairs], len(pairs)
+
+
+@case("uralign.hu_many", "Uralign")
+def _uralign_hu_many(data):
+    pairs = data.cognate_pairs
+    return lambda: Uralign.hu_many(pairs), len(pairs)
+
+
+@case("uralign.get_score", "Uralign")
+def _uralign_get_score(data):
+    alignments, frequency = data.alignments, data.frequency
+    score = Uralign.get_score
+    return lambda: [score(a, b, frequency) for a, b in alignments], len(alignments)
+
+
+@case("dpalign.align", "DPAlign")
+def _dpalign_align(data):
+    align = DPAlign(data.scorer, band=2).align
+    pairs = [(a, b) for a, b, _, _ in data.cognate_pairs]
+    return lambda: [align(a, b) for a, b in pairs], len(pairs)
+
+
+@case("dpalign.align_many", "DPAlign")
+def _dpalign_align_many(data):
+    aligner = DPAlign(data.scorer, band=2)
+    pairs = [(a, b) for a, b, _, _ in data.cognate_pairs]
+    return lambda: aligner.align_many(pairs), len(pairs)
+
+
+@case("dpalign.align_ids", "DPAlign")
+def _dpalign_align_ids(data):
+    align_ids = DPAlign(data.scorer, band=2).align_ids
+    pairs = [data.scorer.encode(a, b) for a, b, _, _ in data.cognate_pairs]
+    return lambda: [align_ids(a, b) for a, b in pairs], len(pairs)
+
+
+@case("dpalign.align_many_ids", "DPAlign")
+def _dpalign_align_many_ids(data):
+    aligner = DPAlign(data.scorer, band=2)
+    pairs = [data.scorer.encode(a, b) for a, b, _, _ in data.cognate_pairs]
+    return lambda: aligner.align_many_ids(pairs), len(pairs)
+
+
+# Scoring.
+
+
+@case("scorer.compile", "Scorer")
+def _scorer_compile(data):
+    frequency = data.frequency
+    return lambda: Scorer(frequency), len(frequency)
+
+
+@case("scorer.get_score", "Scorer")
+def _scorer_get_score(data):
+    scorer = data.scorer
+    encoded = [scorer.encode(a, b) for a, b in data.alignments]
+    score = scorer.get_score
+    return lambda: [score(a, b) for a, b in encoded], len(encoded)
+
+
+@case("scorer.score", "Scorer")
+def _scorer_score(data):
+    score, alignments = data.scorer.score, data.alignments
+    return lambda: [score(a, b) for a, b in alignments], len(alignments)
+
+
+@case("bloom.all_attested", "PairFilter")
+def _bloom_all_attested(data):
+    pairs, alignments = PairFilter(data.frequency), data.alignments
+    return lambda: [pairs.all_attested(a, b) for a, b in alignments], len(alignments)
+
+
+@case("blocking.build", "BlockingIndex")
+def _blocking_build(data):
+    forms, scorer = data.recipient_forms, data.scorer
+    return lambda: BlockingIndex(forms, scorer), len(forms)
+
+
+@case("blocking.candidates", "BlockingIndex")
+def _blocking_candidates(data):
+    index = BlockingIndex(data.recipient_forms, data.scorer)
+    adapted = data.adapted[: max(1, DISTINCT // 10)]
+    return (
+        lambda: [index.candidates(seg, cv) for seg, cv in adapted],
+        len(adapted) * data.size,
+    )
+
+
+@case("significance.score_matrix", "score_matrix")
+def _significance_score_matrix(data):
+    recipients, donors = data.recipient_forms, data.adapted[:DONORS]
+    return (
+        lambda: loanpy.score_matrix(recipients, donors, data.scorer),
+        len(donors) * len(recipients),
+    )
+
+
+@case("significance.permutation_pvalues", "permutation_pvalues")
+def _significance_permutation_pvalues(data):
+    n = min(data.size, SQUARE)
+    matrix = loanpy.score_matrix(
+        data.recipient_forms[:n], data.adapted[:n], data.scorer
+    )
+    return lambda: loanpy.permutation_pvalues(matrix, 200), 200 * n
+
+
+# Correspondences and their storage.
+
+
+@case("correspondences.get_sound_correspondences", "get_sound_correspondences")
+def _correspondences_get_sound_correspondences(data):
+    rows = data.cognates
+    return lambda: loanpy.get_sound_correspondences(rows, "Uralign"), len(rows)
+
+
+@case("correspondences.add_separator", "add_separator")
+def _correspondences_add_separator(data):
+    correspondences = data.correspondences
+    return (
+        lambda: loanpy.add_separator(correspondences),
+        len(correspondences["AbsoluteFrequency"]),
+    )
+
+
+@case("evaluation.get_held_out_scores", "get_held_out_scores")
+def _evaluation_get_held_out_scores(data):
+    rows = data.cognates
+    return lambda: loanpy.get_held_out_scores(rows, "Uralign"), len(rows) // 2
+
+
+@case("binary.dump_binary", "dump_binary")
+def _binary_dump_binary(data):
+    correspondences = data.correspondences
+    path = os.path.join(data.tempdir, "dump.bin")
+    return (
+        lambda: loanpy.dump_binary(correspondences, path),
+        len(correspondences["AbsoluteFrequency"]),
+    )
+
+
+@case("binary.load_binary", "load_binary")
+def _binary_load_binary(data):
+    path = data.binary_path
+    return lambda: loanpy.load_binary(path), len(data.frequency)
+
+
+@case("binary.mapped_get_score", "MappedCorrespondences")
+def _binary_mapped_get_score(data):
+    mapped = MappedCorrespondences(data.binary_path)
+    alignments, score = data.alignments, Uralign.get_score
+    return lambda: [score(a, b, mapped) for a, b in alignments], len(alignments)
+
+
+@case("cache.content_hash", "content_hash")
+def _cache_content_hash(data):
+    forms = data.recipient_forms
+    return lambda: loanpy.content_hash(forms), len(forms)
+
+
+@case("cache.hit", "ResultCache")
+def _cache_hit(data):
+    cache = ResultCache(os.path.join(data.tempdir, "cache"), max_bytes=None)
+    rows = data.cognates
+    loanpy.get_sound_correspondences(rows, "Uralign", cache=cache)
+    return (
+        lambda: loanpy.get_sound_correspondences(rows, "Uralign", cache=cache),
+        len(rows),
+    )
+
+
+# Input and output.
+
+
+@case("reader.read_table", "read_table")
+def _reader_read_table(data):
+    path = data.recipients_csv
+    return lambda: loanpy.read_table(path, ["ID", "Segments"]), data.size
+
+
+@case("reader.iter_chunks", "iter_chunks", "iter_rows")
+def _reader_iter_chunks(data):
+    path = data.recipients_csv
+    return lambda: _consume(loanpy.iter_rows(path, ["ID", "Segments"])), data.size
+
+
+@case("table.from_csv", "SegmentTable")
+def _table_from_csv(data):
+    path = data.recipients_csv
+    return lambda: SegmentTable.from_csv(path, "Segments", "CV", ["ID"]), data.size
+
+
+@case("vocabulary.encode", "SegmentVocabulary")
+def _vocabulary_encode(data):
+    forms = data.recipient_forms
+
+    def run():
+        encode = SegmentVocabulary().encode
+        return [encode(segments) for segments, _ in forms]
+
+    return run, len(forms)
+
+
+@case("convert.convert_csv", "convert_csv")
+def _convert_convert_csv(data):
+    source = data.recipients_csv
+    target = os.path.join(data.tempdir, "converted.csv")
+    return (
+        lambda: loanpy.convert_csv(source, target, {"Clusters": "cv"}),
+        data.size,
+    )
+
+
+@case("sharedmem.publish", "SharedLexicon", "SharedScorer")
+def _sharedmem_publish(data):
+    forms, scorer = data.recipient_forms, data.scorer
+
+    def run():
+        for block in (SharedLexicon.publish(forms), SharedScorer.publish(scorer)):
+            block.close()
+            block.unlink()
+
+    return run, len(forms)
+
+
+# End to end.
+
+
+@case("search.search", "LoanwordSearch")
+def _search_search(data):
+    search = LoanwordSearch(data.frequency, data.adapt, data.templates)
+    donors, recipients = data.donors, data.recipients
+    return (
+        lambda: _consume(search.search(donors, recipients)),
+        len(donors) * len(recipients),
+    )
+
+
+@case("search.search_blocking", "LoanwordSearch")
+def _search_search_blocking(data):
+    search = LoanwordSearch(
+        data.frequency, data.adapt, data.templates, blocking=True
+    )
+    donors, recipients = data.donors, data.recipients
+    return (
+        lambda: _consume(search.search(donors, recipients)),
+        len(donors) * len(recipients),
+    )
+
+
+@case("search.search_instrumented", "Instrumentation")
+def _search_search_instrumented(data):
+    search = LoanwordSearch(data.frequency, data.adapt, data.templates)
+    donors, recipients = data.donors, data.recipients
+
+    def run():
+        with Instrumentation() as stats:
+            _consume(search.search(donors, recipients))
+        return stats.to_dict()
+
+    return run, len(donors) * len(recipients)
+
+
+@case("pipeline.run", "LoanwordPipeline")
+def _pipeline_run(data):
+    pipeline = LoanwordPipeline(data.frequency, data.adapt, data.templates)
+    donors, recipients = data.donors, data.recipients
+    return (
+        lambda: _consume(pipeline.run(donors, recipients)),
+        len(donors) * len(recipients),
+    )
+
+
+@case("service.score", "ScoringService")
+def _service_score(data):
+    search = LoanwordSearch(data.frequency, data.adapt, data.templates)
+    service = ScoringService(search, data.recipients)
+    donors = data.donors
+
+    async def main():
+        await asyncio.gather(*(service.score(seg, cv) for _, seg, cv in donors))
+        await service.close()
+
+    return lambda: asyncio.run(main()), len(donors) * data.size
+
+
+@case("store.first_run", "CorpusStore")
+def _store_first_run(data):
+    search = LoanwordSearch(data.frequency, data.adapt, data.templates, min_score=0)
+    donors, recipients = data.donors, data.recipients
+
+    def run():
+        with CorpusStore() as store:
+            store.sync_lexicon("donors", donors)
+            store.sync_lexicon("recipients", recipients)
+            store.update_scores(search, "donors", "recipients")
+            return store.top_matches(search, "donors", "recipients")
+
+    return run, len(donors) * len(recipients)
+
+
+@case("end_to_end")
+def _end_to_end(data):
+    """Mine, learn substitutions, expand templates, then search."""
+    rows, donors, recipients = data.cognates, data.donors, data.recipients
+    donor, ancestor = data.donor.segments, data.ancestor.segments
+    formula = generators.phonotactic_formula(3)
+
+    def run():
+        frequency = loanpy.get_sound_correspondences(rows, "Uralign")[
+            "AbsoluteFrequency"
+        ]
+        adapt = Adapt()
+        adapt.get_substitutions(donor, ancestor, segment_distance, {})
+        templates = loanpy.expand_phonotactics(formula)
+        search = LoanwordSearch(frequency, adapt, templates)
+        return list(search.search(donors, recipients))
+
+    return run, len(donors) * len(recipients)
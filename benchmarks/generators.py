@@ -0,0 +1,150 @@
+"""Seeded synthetic inventories, wordlists and cognate tables.
+
+Everything is drawn from a :class:`random.Random` seeded by the caller, so a
+size and seed always produce the same data. Segment frequencies follow a
+Zipf-like distribution and words are built from ``(C)V(C)`` syllables, which
+gives CV profiles, word lengths and pair counts close to real CLDF
+wordlists.
+"""
+
+from __future__ import annotations
+
+import random
+from collections.abc import Sequence
+
+#: Segment pools, roughly from most to least common cross-linguistically.
+CONSONANTS = tuple(
+    "t k n m s l r p j d v h ʃ g b f z ŋ w x ɲ t͡ʃ d͡ʒ t͡s"
+    " ɣ ʒ c ɟ q ʔ ð θ ɾ ʎ β kʷ tʲ sʲ lʲ rʲ".split()
+)
+VOWELS = tuple("a e i o u ɛ ɔ y ø æ ə ɑ ɨ aː eː iː oː uː yː øː".split())
+
+
+def _zipf(items: Sequence[str]) -> list[float]:
+    return [1 / rank for rank in range(1, len(items) + 1)]
+
+
+class Inventory:
+    """A segment inventory with Zipf-like segment frequencies.
+
+    Parameters
+    ----------
+    consonants, vowels:
+        Segments of the language.
+    """
+
+    def __init__(self, consonants: Sequence[str], vowels: Sequence[str]) -> None:
+        self.consonants = list(consonants)
+        self.vowels = list(vowels)
+        self._c_weights = _zipf(self.consonants)
+        self._v_weights = _zipf(self.vowels)
+
+    @classmethod
+    def sample(
+        cls, rng: random.Random, n_consonants: int = 22, n_vowels: int = 8
+    ) -> Inventory:
+        """Draw an inventory from the pooled segments, frequent ones first."""
+        consonants = list(CONSONANTS[:8]) + rng.sample(
+            CONSONANTS[8:], n_consonants - 8
+        )
+        vowels = list(VOWELS[:4]) + rng.sample(VOWELS[4:], n_vowels - 4)
+        return cls(consonants, vowels)
+
+    @property
+    def segments(self) -> set[str]:
+        return set(self.consonants) | set(self.vowels)
+
+    def word(self, rng: random.Random) -> tuple[list[str], list[str]]:
+        """One word of one to three ``(C)V(C)`` syllables."""
+        segments, profile = [], []
+        for _ in range(rng.choices((1, 2, 3), (3, 5, 2))[0]):
+            if rng.random() < 0.8:
+                segments.append(rng.choices(self.consonants, self._c_weights)[0])
+                profile.append("C")
+            segments.append(rng.choices(self.vowels, self._v_weights)[0])
+            profile.append("V")
+            if rng.random() < 0.35:
+                segments.append(rng.choices(self.consonants, self._c_weights)[0])
+                profile.append("C")
+        return segments, profile
+
+
+def wordlist(
+    rng: random.Random, inventory: Inventory, n: int, prefix: str = "w"
+) -> list[tuple[str, list[str], list[str]]]:
+    """``n`` ``(word_id, segments, cv_profile)`` entries."""
+    return [(f"{prefix}{i}", *inventory.word(rng)) for i in range(n)]
+
+
+def sound_changes(
+    rng: random.Random, ancestor: Inventory, descendant: Inventory
+) -> dict[str, list[str]]:
+    """Regular reflexes: each ancestor segment maps to one to three outcomes.
+
+    The first outcome is the regular one; later ones are conditioned or
+    sporadic reflexes, picked less often by :func:`cognate_table`.
+    """
+    changes = {}
+    for pool, targets in (
+        (ancestor.consonants, descendant.consonants),
+        (ancestor.vowels, descendant.vowels),
+    ):
+        for segment in pool:
+            regular = segment if segment in targets else rng.choice(targets)
+            changes[segment] = [regular] + rng.sample(targets, rng.randint(0, 2))
+    return changes
+
+
+def cognate_table(
+    rng: random.Random,
+    ancestor: Inventory,
+    descendant: Inventory,
+    n_sets: int,
+    aligned_col: str = "Uralign",
+) -> list[dict[str, str]]:
+    """Alternating descendant/ancestor rows of ``n_sets`` cognate sets.
+
+    Rows carry ``Language_ID``, ``Cognateset_ID``, ``Segments``, ``CV`` and a
+    space-separated alignment in ``aligned_col``, as expected by
+    :func:`loanpy.get_sound_correspondences`. Descendant words apply
+    :func:`sound_changes` to the ancestor word segment by segment, with
+    occasional loss of a final segment marked by ``-`` in the alignment.
+    """
+    changes = sound_changes(rng, ancestor, descendant)
+    rows = []
+    for index in range(n_sets):
+        segments, profile = ancestor.word(rng)
+        reflexes = [
+            rng.choices(changes[seg], (8, 2, 1)[: len(changes[seg])])[0]
+            for seg in segments
+        ]
+        aligned = list(reflexes)
+        kept = reflexes
+        if len(reflexes) > 2 and rng.random() < 0.15:
+            aligned[-1] = "-"
+            kept = reflexes[:-1]
+        cv = "".join("V" if seg in descendant.vowels else "C" for seg in kept)
+        rows.append(
+            {
+                "Language_ID": "desc",
+                "Cognateset_ID": str(index),
+                "Segments": " ".join(kept),
+                "CV": cv,
+                aligned_col: " ".join(aligned),
+            }
+        )
+        rows.append(
+            {
+                "Language_ID": "anc",
+                "Cognateset_ID": str(index),
+                "Segments": " ".join(segments),
+                "CV": "".join(profile),
+                aligned_col: " ".join(segments),
+            }
+        )
+    return rows
+
+
+def phonotactic_formula(syllables: int = 3) -> str:
+    """A prosodic formula such as ``"(C)V(C)+CV(C)+CV(C)"``."""
+    return "+".join(["(C)V(C)"] + ["CV(C)"] * (syllables - 1))
@@ -0,0 +1,301 @@
+"""Run the benchmark cases, save JSON results and compare against a baseline."""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from collections.abc import Iterable, Mapping, Sequence
+from datetime import datetime, timezone
+from statistics import median
+from typing import Any
+
+import loanpy
+from benchmarks.cases import CASES, Dataset
+
+#: Named dataset sizes.
+SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+#: Results format; bumped when the JSON layout changes.
+FORMAT = 1
+
+
+def parse_size(size: str) -> int:
+    """Number of words for a named size (``"100k"``) or a plain integer."""
+    if size.lower() in SIZES:
+        return SIZES[size.lower()]
+    try:
+        value = int(size)
+    except ValueError:
+        raise ValueError(
+            f"unknown size {size!r}; use {', '.join(SIZES)} or an integer"
+        ) from None
+    if value < 2:
+        raise ValueError("size must be at least 2")
+    return value
+
+
+def select(patterns: Sequence[str] = ()) -> list[str]:
+    """Case names matching any of the shell-style ``patterns`` (all if none)."""
+    if not patterns:
+        return list(CASES)
+    names = [
+        name
+        for name in CASES
+        if any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns)
+    ]
+    if not names:
+        raise ValueError(f"no benchmark matches {', '.join(patterns)}")
+    return names
+
+
+def _git_commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            timeout=10,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def time_case(run, repeat: int) -> list[float]:
+    """Wall-clock seconds of ``repeat`` calls, with garbage collection paused."""
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return timings
+
+
+def run_benchmarks(
+    size: int,
+    names: Iterable[str] | None = None,
+    repeat: int = 3,
+    seed: int = 0,
+    log=None,
+) -> dict[str, Any]:
+    """Time the selected cases on one synthetic dataset.
+
+    Parameters
+    ----------
+    size:
+        Number of words per generated wordlist.
+    names:
+        Case names; all registered cases if None.
+    repeat:
+        Timed calls per case; the minimum is the headline figure.
+    seed:
+        Seed of the data generators.
+    log:
+        Optional writable stream for progress lines.
+
+    Returns
+    -------
+    dict
+        ``meta`` (sizes, versions, machine and commit) and ``results``:
+        per case ``items``, ``setup_s``, ``min_s``, ``median_s``, ``max_s``
+        and ``per_item_us`` (minimum divided by ``items``).
+    """
+    data = Dataset(size, seed)
+    results = {}
+    try:
+        for name in names if names is not None else CASES:
+            start = time.perf_counter()
+            run, items = CASES[name].setup(data)
+            setup = time.perf_counter() - start
+            timings = time_case(run, repeat)
+            best = min(timings)
+            results[name] = {
+                "items": items,
+                "setup_s": setup,
+                "min_s": best,
+                "median_s": median(timings),
+                "max_s": max(timings),
+                "per_item_us": 1e6 * best / items if items else None,
+            }
+            if log is not None:
+                print(f"{name:45} {best:10.4f} s  {items:>10} items", file=log)
+    finally:
+        data.close()
+    return {
+        "meta": {
+            "format": FORMAT,
+            "size": size,
+            "seed": seed,
+            "repeat": repeat,
+            "loanpy": loanpy.__version__,
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "system": platform.system(),
+            "cpus": os.cpu_count(),
+            "commit": _git_commit(),
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        },
+        "results": results,
+    }
+
+
+def compare(
+    baseline: Mapping[str, Any], current: Mapping[str, Any], threshold: float = 0.1
+) -> dict[str, Any]:
+    """Per-case ratios of current to baseline minimum times.
+
+    Parameters
+    ----------
+    baseline, current:
+        Outputs of :func:`run_benchmarks`, usually loaded from JSON.
+    threshold:
+        Relative change beyond which a case counts as a regression
+        (slower) or an improvement (faster).
+
+    Returns
+    -------
+    dict
+        ``cases`` (name → ``baseline_s``, ``current_s``, ``ratio`` and
+        ``status``), ``regressions`` and ``improvements`` (names),
+        ``missing`` and ``new`` (cases only in the baseline or only in the
+        current run) and ``warnings`` about mismatched sizes or machines.
+    """
+    old, new = baseline["results"], current["results"]
+    cases = {}
+    for name in old.keys() & new.keys():
+        before, after = old[name]["min_s"], new[name]["min_s"]
+        ratio = after / before if before else float("inf")
+        if ratio > 1 + threshold:
+            status = "slower"
+        elif ratio < 1 - threshold:
+            status = "faster"
+        else:
+            status = "same"
+        cases[name] = {
+            "baseline_s": before,
+            "current_s": after,
+            "ratio": ratio,
+            "status": status,
+        }
+    warnings = [
+        f"{key} differs: baseline {baseline['meta'].get(key)!r}, "
+        f"current {current['meta'].get(key)!r}"
+        for key in ("size", "seed", "python", "machine", "cpus")
+        if baseline["meta"].get(key) != current["meta"].get(key)
+    ]
+    return {
+        "cases": {name: cases[name] for name in sorted(cases)},
+        "regressions": sorted(n for n, c in cases.items() if c["status"] == "slower"),
+        "improvements": sorted(n for n, c in cases.items() if c["status"] == "faster"),
+        "missing": sorted(old.keys() - new.keys()),
+        "new": sorted(new.keys() - old.keys()),
+        "warnings": warnings,
+    }
+
+
+def format_comparison(comparison: Mapping[str, Any]) -> str:
+    """Plain-text table of :func:`compare` output."""
+    lines = [f"{'benchmark':45} {'baseline':>10} {'current':>10} {'ratio':>7}"]
+    for name, row in comparison["cases"].items():
+        marker = {"slower": "  SLOWER", "faster": "  faster"}.get(row["status"], "")
+        lines.append(
+            f"{name:45} {row['baseline_s']:10.4f} {row['current_s']:10.4f}"
+            f" {row['ratio']:7.2f}{marker}"
+        )
+    for key in ("missing", "new"):
+        if comparison[key]:
+            lines.append(f"{key}: {', '.join(comparison[key])}")
+    lines.extend(f"warning: {warning}" for warning in comparison["warnings"])
+    return "\n".join(lines)
+
+
+def _load(path: str) -> dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        results = json.load(f)
+    if results.get("meta", {}).get("format") != FORMAT:
+        raise ValueError(f"{path} is not a loanpy benchmark results file")
+    return results
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Command line of ``python -m benchmarks``."""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description=__doc__.splitlines()[0]
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="time the benchmark cases")
+    run.add_argument(
+        "--size", default="1k", help="1k, 100k, 1m or a word count (default 1k)"
+    )
+    run.add_argument("--repeat", type=int, default=3, help="timed calls per case")
+    run.add_argument("--seed", type=int, default=0, help="data generator seed")
+    run.add_argument(
+        "-k",
+        dest="patterns",
+        action="append",
+        default=[],
+        metavar="PATTERN",
+        help="only cases matching this shell pattern; repeatable",
+    )
+    run.add_argument("-o", "--output", help="write JSON results to this file")
+
+    diff = commands.add_parser("compare", help="compare results with a baseline")
+    diff.add_argument("baseline", help="JSON results of the reference run")
+    diff.add_argument("current", help="JSON results of the run to check")
+    diff.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="relative slowdown reported as a regression (default 0.1)",
+    )
+    diff.add_argument("--json", action="store_true", help="print JSON, not a table")
+
+    listing = commands.add_parser("list", help="list benchmark cases")
+    listing.add_argument("-k", dest="patterns", action="append", default=[])
+
+    args = parser.parse_args(argv)
+    try:
+        if args.command == "list":
+            for name in select(args.patterns):
+                covers = ", ".join(CASES[name].covers)
+                print(f"{name:45} {covers}")
+            return 0
+        if args.command == "run":
+            if args.repeat < 1:
+                raise ValueError("--repeat must be at least 1")
+            results = run_benchmarks(
+                parse_size(args.size),
+                select(args.patterns),
+                args.repeat,
+                args.seed,
+                log=sys.stderr,
+            )
+            text = json.dumps(results, indent=2)
+            if args.output:
+                with open(args.output, "w", encoding="utf-8") as f:
+                    f.write(text + "\n")
+            else:
+                print(text)
+            return 0
+        comparison = compare(_load(args.baseline), _load(args.current), args.threshold)
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+    if args.json:
+        print(json.dumps(comparison, indent=2))
+    else:
+        print(format_comparison(comparison))
+    return 1 if comparison["regressions"] else 0
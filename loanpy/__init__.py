@@ -5,8 +5,14 @@ mining, edit-distance utilities, and adaptation (substitution plus phonotactic r
 """
 
 from loanpy.adapt import Adapt
-from loanpy.cluster import Cluster
+from loanpy.blocking import BlockingIndex
+from loanpy.bloom import PairFilter
+from loanpy.binary import MappedCorrespondences, dump_binary, load_binary
+from loanpy.cache import ResultCache, content_hash
+from loanpy.cluster import Cluster, Clusterer
+from loanpy.convert import convert_csv
 from loanpy.correspondences import add_separator, get_sound_correspondences
+from loanpy.dpalign import DPAlign
 from loanpy.edit import (
     apply_edit,
     edit_distance_matrix,
@@ -15,24 +21,63 @@ from loanpy.edit import (
     shortest_edit_path,
     substitute_operations,
 )
+from loanpy.evaluation import get_held_out_scores
+from loanpy.instrument import Instrumentation
 from loanpy.phonotactics import expand_phonotactics, get_closest_phonotactics
-from loanpy.uralign import Uralign
+from loanpy.pipeline import LoanwordPipeline
+from loanpy.reader import iter_chunks, iter_rows, read_table
+from loanpy.scorer import Scorer
+from loanpy.search import LoanwordSearch
+from loanpy.service import ScoringService
+from loanpy.sharedmem import SharedLexicon, SharedScorer
+from loanpy.significance import permutation_pvalues, score_matrix
+from loanpy.store import CorpusStore
+from loanpy.table import SegmentTable
+from loanpy.uralign import PRUNED, Uralign
+from loanpy.vocabulary import SegmentVocabulary
 
 __version__ = "4.0.0"
 
 __all__ = [
     "Adapt",
+    "BlockingIndex",
     "Cluster",
+    "Clusterer",
+    "CorpusStore",
+    "DPAlign",
+    "Instrumentation",
+    "LoanwordPipeline",
+    "LoanwordSearch",
+    "MappedCorrespondences",
+    "PRUNED",
+    "PairFilter",
+    "ResultCache",
+    "Scorer",
+    "ScoringService",
+    "SegmentTable",
+    "SegmentVocabulary",
+    "SharedLexicon",
+    "SharedScorer",
     "Uralign",
     "__version__",
     "apply_edit",
+    "content_hash",
+    "convert_csv",
     "edit_distance_matrix",
     "edit_distance_with2ops",
     "expand_phonotactics",
     "get_closest_phonotactics",
+    "get_held_out_scores",
     "add_separator",
+    "dump_binary",
     "get_sound_correspondences",
+    "iter_chunks",
+    "iter_rows",
+    "load_binary",
     "path_to_edit_operations",
+    "permutation_pvalues",
+    "read_table",
+    "score_matrix",
     "shortest_edit_path",
     "substitute_operations",
 ]
@@ -2,8 +2,9 @@
 
 from __future__ import annotations
 
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
 
+from loanpy.cache import ResultCache
 from loanpy.edit import (
     apply_edit,
     edit_distance_matrix,
@@ -11,6 +12,26 @@ from loanpy.edit import (
     shortest_edit_path,
 )
 from loanpy.phonotactics import get_closest_phonotactics
+from loanpy.vocabulary import SegmentVocabulary
+
+
+def _closest_substitutions(
+    donor_inventory: set[str],
+    recipient_inventory: set[str],
+    distance_func: Callable[[str, str], float],
+) -> dict[str, str]:
+    """Closest recipient phoneme for each donor phoneme the recipient lacks."""
+    substitutions = {}
+    for donor_phoneme in donor_inventory - recipient_inventory:
+        best_substitution = ""
+        lowest_distance = float("inf")
+        for recipient_phoneme in recipient_inventory:
+            distance = distance_func(donor_phoneme, recipient_phoneme)
+            if distance < lowest_distance:
+                lowest_distance = distance
+                best_substitution = recipient_phoneme
+        substitutions[donor_phoneme] = best_substitution
+    return substitutions
 
 
 class Adapt:
@@ -44,6 +65,7 @@ class Adapt:
         recipient_inventory: set[str],
         distance_func: Callable[[str, str], float],
         extra: dict[str, str],
+        cache: ResultCache | None = None,
     ) -> None:
         """Learn one-to-one donor→recipient substitutions by minimum distance.
 
@@ -59,17 +81,24 @@ class Adapt:
             Callable returning a numeric distance (e.g. feature-based).
         extra:
             Fixed substitutions applied on top of learned ones.
+        cache:
+            Optional :class:`~loanpy.cache.ResultCache`. The learned
+            substitutions are keyed by both inventories and the
+            ``module.qualname`` of ``distance_func``, which must therefore be
+            a module-level function.
         """
-        substitutions = {}
-        for donor_phoneme in donor_inventory - recipient_inventory:
-            best_substitution = ""
-            lowest_distance = float("inf")
-            for recipient_phoneme in recipient_inventory:
-                distance = distance_func(donor_phoneme, recipient_phoneme)
-                if distance < lowest_distance:
-                    lowest_distance = distance
-                    best_substitution = recipient_phoneme
-            substitutions[donor_phoneme] = best_substitution
+        if cache is None:
+            substitutions = _closest_substitutions(
+                donor_inventory, recipient_inventory, distance_func
+            )
+        else:
+            substitutions = cache.call(
+                "Adapt.get_substitutions",
+                (donor_inventory, recipient_inventory, distance_func),
+                lambda: _closest_substitutions(
+                    donor_inventory, recipient_inventory, distance_func
+                ),
+            )
         self.substitutions = substitutions | extra
 
     def substitute(self, segments: list[str]) -> list[str]:
@@ -91,6 +120,32 @@ class Adapt:
                 substitute.append(sub)
         return substitute
 
+    def substitute_ids(
+        self, ids: Iterable[int], vocabulary: SegmentVocabulary
+    ) -> list[int]:
+        """Id-based :meth:`substitute` over ``vocabulary`` ids.
+
+        Substitutions are translated to ids lazily and cached until
+        :attr:`substitutions` is reassigned or another vocabulary is used.
+        """
+        cache = getattr(self, "_substitution_ids", None)
+        if (
+            cache is None
+            or cache[0] is not vocabulary
+            or cache[1] is not self.substitutions
+        ):
+            cache = self._substitution_ids = (vocabulary, self.substitutions, {})
+        table = cache[2]
+        substitute = []
+        for segment_id in ids:
+            if segment_id not in table:
+                seg = vocabulary.segments[segment_id]
+                sub = self.substitutions.get(seg, seg)
+                table[segment_id] = vocabulary.intern(sub) if sub else None
+            if (sub_id := table[segment_id]) is not None:
+                substitute.append(sub_id)
+        return substitute
+
     def repair(
         self,
         segments: list[str],
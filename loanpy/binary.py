@@ -0,0 +1,335 @@
+"""Compact binary and memory-mapped storage for sound correspondences.
+
+The format stores the output of
+:func:`~loanpy.correspondences.get_sound_correspondences` so that workers can
+open a large scorer without parsing text. Layout (version 1, little-endian)::
+
+    header      magic, version, flags, counts, section offsets
+    segments    interned segment strings, sorted (string list)
+    pairs       (desc_id, anc_id, count) records sorted by id pair
+    rank        record indices in ``AbsoluteFrequency`` order
+    cognates    per-pair offsets into a flat cognate-id string list
+    examples    per-pair offsets into a flat example string list
+    sound       ``SoundCorrespondences`` as UTF-8 JSON
+
+A *string list* is ``n + 1`` offsets (``u64``) followed by the concatenated
+UTF-8 bytes. Segments are sorted by code point, which is also UTF-8 byte
+order, so lookups binary-search the raw bytes.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+from collections.abc import Iterator, Mapping
+
+MAGIC = b"LNPYSC"
+VERSION = 1
+
+_HEADER = struct.Struct("<6sHIII7Q")
+_PAIR = struct.Struct("<IIq")
+_U32 = struct.Struct("<I")
+_U64 = struct.Struct("<Q")
+
+_HAS_COGNATES = 1
+_HAS_EXAMPLES = 2
+_HAS_SOUND = 4
+
+
+def _split_key(key: tuple[str, str] | str, sep: str) -> tuple[str, str]:
+    """Return a ``(desc, anc)`` tuple from a tuple or ``"desc < anc"`` key."""
+    if isinstance(key, tuple):
+        return key
+    desc, found, anc = key.partition(sep)
+    if not found:
+        raise ValueError(f"key {key!r} does not contain separator {sep!r}")
+    return desc, anc
+
+
+def _pack_strings(strings: list[str]) -> bytes:
+    """Pack strings as ``len + 1`` offsets followed by their UTF-8 bytes."""
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = [0]
+    for blob in encoded:
+        offsets.append(offsets[-1] + len(blob))
+    return struct.pack(f"<{len(offsets)}Q", *offsets) + b"".join(encoded)
+
+
+def _pack_u64(values: list[int]) -> bytes:
+    return struct.pack(f"<{len(values)}Q", *values)
+
+
+def dump_binary(
+    correspondences: Mapping[str, Mapping],
+    path: str | os.PathLike,
+    sep: str = " < ",
+) -> None:
+    """Write correspondences to a versioned binary file.
+
+    Parameters
+    ----------
+    correspondences:
+        Output of :func:`~loanpy.correspondences.get_sound_correspondences`
+        (tuple keys) or of :func:`~loanpy.correspondences.add_separator`
+        (``"desc < anc"`` string keys, as read back from TOML).
+    path:
+        Destination file.
+    sep:
+        Separator used in string keys.
+
+    Raises
+    ------
+    ValueError
+        If ``Cognateset_IDs`` or ``Examples`` contain pairs missing from
+        ``AbsoluteFrequency``, or a string key lacks ``sep``.
+    """
+    frequency = {
+        _split_key(k, sep): v
+        for k, v in correspondences.get("AbsoluteFrequency", {}).items()
+    }
+    cognates = {
+        _split_key(k, sep): v
+        for k, v in correspondences.get("Cognateset_IDs", {}).items()
+    }
+    examples = {
+        _split_key(k, sep): v for k, v in correspondences.get("Examples", {}).items()
+    }
+    for section, pairs in (("Cognateset_IDs", cognates), ("Examples", examples)):
+        if not pairs.keys() <= frequency.keys():
+            raise ValueError(f"{section} has pairs missing from AbsoluteFrequency")
+
+    segments = sorted({seg for pair in frequency for seg in pair})
+    segment_ids = {seg: i for i, seg in enumerate(segments)}
+    records = sorted(frequency, key=lambda p: (segment_ids[p[0]], segment_ids[p[1]]))
+    record_ids = {pair: i for i, pair in enumerate(records)}
+
+    def _block(lists: dict) -> tuple[bytes, bytes]:
+        index, flat = [0], []
+        for pair in records:
+            flat.extend(str(v) for v in lists.get(pair, ()))
+            index.append(len(flat))
+        return _pack_u64(index), _pack_strings(flat)
+
+    cognate_index, cognate_strings = _block(cognates)
+    example_index, example_strings = _block(examples)
+    sections = [
+        _pack_strings(segments),
+        b"".join(
+            _PAIR.pack(segment_ids[d], segment_ids[a], frequency[(d, a)])
+            for d, a in records
+        ),
+        struct.pack(f"<{len(records)}I", *(record_ids[p] for p in frequency)),
+        cognate_index + cognate_strings,
+        example_index + example_strings,
+        json.dumps(
+            correspondences.get("SoundCorrespondences", {}), ensure_ascii=False
+        ).encode("utf-8"),
+    ]
+    flags = 0
+    if "Cognateset_IDs" in correspondences:
+        flags |= _HAS_COGNATES
+    if "Examples" in correspondences:
+        flags |= _HAS_EXAMPLES
+    if "SoundCorrespondences" in correspondences:
+        flags |= _HAS_SOUND
+
+    offsets = []
+    position = _HEADER.size
+    for section in sections:
+        offsets.append(position)
+        position += len(section)
+    header = _HEADER.pack(
+        MAGIC, VERSION, flags, len(segments), len(records), *offsets, position
+    )
+    with open(path, "wb") as f:
+        f.write(header)
+        for section in sections:
+            f.write(section)
+
+
+class MappedCorrespondences(Mapping):
+    """Read-only, memory-mapped view of a file written by :func:`dump_binary`.
+
+    Behaves as a ``(desc, anc) → count`` mapping, so it can be passed directly
+    as the ``scorer`` of :meth:`~loanpy.uralign.Uralign.get_score`. Lookups
+    binary-search the mapped file; nothing is parsed up front, so opening is
+    constant-time regardless of file size.
+
+    Examples
+    --------
+    ::
+
+        with MappedCorrespondences("scorer.bin") as scorer:
+            score = Uralign.get_score(alm_d, alm_a, scorer, freq_filter=2)
+            scorer.examples(("ɟ", "j"))
+
+    Raises
+    ------
+    ValueError
+        If the file is not a loanpy correspondence file or its version is
+        unsupported.
+    """
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+        if len(self._buffer) < _HEADER.size:
+            self.close()
+            raise ValueError("not a loanpy correspondence file")
+        (
+            magic,
+            version,
+            self._flags,
+            self._n_segments,
+            self._n_pairs,
+            self._segments_at,
+            self._pairs_at,
+            self._rank_at,
+            self._cognates_at,
+            self._examples_at,
+            self._sound_at,
+            self._end,
+        ) = _HEADER.unpack_from(self._buffer)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError("not a loanpy correspondence file")
+        if version != VERSION:
+            self.close()
+            raise ValueError(f"unsupported format version {version}")
+        self._segment_cache: dict[str, int] = {}
+
+    def close(self) -> None:
+        """Release the memory map."""
+        self._buffer.release()
+        self._mmap.close()
+
+    def __enter__(self) -> MappedCorrespondences:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _string(self, table_at: int, n: int, index: int) -> bytes:
+        """Raw UTF-8 bytes of item ``index`` in the string list at ``table_at``."""
+        start = _U64.unpack_from(self._buffer, table_at + 8 * index)[0]
+        stop = _U64.unpack_from(self._buffer, table_at + 8 * (index + 1))[0]
+        blob_at = table_at + 8 * (n + 1)
+        return bytes(self._buffer[blob_at + start : blob_at + stop])
+
+    def _segment(self, index: int) -> str:
+        return self._string(self._segments_at, self._n_segments, index).decode("utf-8")
+
+    def _segment_id(self, segment: str) -> int:
+        """Interned id of ``segment``, or -1 if it does not occur."""
+        if segment in self._segment_cache:
+            return self._segment_cache[segment]
+        target = segment.encode("utf-8")
+        lo, hi = 0, self._n_segments
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._string(self._segments_at, self._n_segments, mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        found = (
+            lo
+            if lo < self._n_segments
+            and self._string(self._segments_at, self._n_segments, lo) == target
+            else -1
+        )
+        self._segment_cache[segment] = found
+        return found
+
+    def _record(self, index: int) -> tuple[int, int, int]:
+        return _PAIR.unpack_from(self._buffer, self._pairs_at + _PAIR.size * index)
+
+    def _find(self, pair: tuple[str, str]) -> int:
+        """Record index of ``pair``, or -1."""
+        desc_id = self._segment_id(pair[0])
+        anc_id = self._segment_id(pair[1])
+        if desc_id < 0 or anc_id < 0:
+            return -1
+        target = (desc_id, anc_id)
+        lo, hi = 0, self._n_pairs
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._record(mid)[:2] < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._n_pairs and self._record(lo)[:2] == target:
+            return lo
+        return -1
+
+    def __getitem__(self, pair: tuple[str, str]) -> int:
+        index = self._find(pair)
+        if index < 0:
+            raise KeyError(pair)
+        return self._record(index)[2]
+
+    def __contains__(self, pair: object) -> bool:
+        return (
+            isinstance(pair, tuple) and len(pair) == 2 and self._find(pair) >= 0
+        )
+
+    def __len__(self) -> int:
+        return self._n_pairs
+
+    def __iter__(self) -> Iterator[tuple[str, str]]:
+        """Iterate pairs in ``AbsoluteFrequency`` order."""
+        for position in range(self._n_pairs):
+            index = _U32.unpack_from(self._buffer, self._rank_at + 4 * position)[0]
+            desc_id, anc_id, _ = self._record(index)
+            yield self._segment(desc_id), self._segment(anc_id)
+
+    def _block(self, block_at: int, index: int) -> list[str]:
+        start = _U64.unpack_from(self._buffer, block_at + 8 * index)[0]
+        stop = _U64.unpack_from(self._buffer, block_at + 8 * (index + 1))[0]
+        n_strings = _U64.unpack_from(self._buffer, block_at + 8 * self._n_pairs)[0]
+        table_at = block_at + 8 * (self._n_pairs + 1)
+        return [
+            self._string(table_at, n_strings, i).decode("utf-8")
+            for i in range(start, stop)
+        ]
+
+    def cognateset_ids(self, pair: tuple[str, str]) -> list[str]:
+        """Cognate set ids recorded for ``pair``."""
+        index = self._find(pair)
+        if index < 0:
+            raise KeyError(pair)
+        return self._block(self._cognates_at, index)
+
+    def examples(self, pair: tuple[str, str]) -> list[str]:
+        """Example alignment strings recorded for ``pair``."""
+        index = self._find(pair)
+        if index < 0:
+            raise KeyError(pair)
+        return self._block(self._examples_at, index)
+
+    def to_dict(self) -> dict[str, dict]:
+        """Rebuild the in-memory dict shape with ``(desc, anc)`` tuple keys."""
+        pairs = list(self)
+        out: dict[str, dict] = {}
+        if self._flags & _HAS_SOUND:
+            sound = bytes(self._buffer[self._sound_at : self._end])
+            out["SoundCorrespondences"] = json.loads(sound.decode("utf-8"))
+        out["AbsoluteFrequency"] = {pair: self[pair] for pair in pairs}
+        if self._flags & _HAS_COGNATES:
+            out["Cognateset_IDs"] = {pair: self.cognateset_ids(pair) for pair in pairs}
+        if self._flags & _HAS_EXAMPLES:
+            out["Examples"] = {pair: self.examples(pair) for pair in pairs}
+        return out
+
+
+def load_binary(path: str | os.PathLike) -> dict[str, dict]:
+    """Read a file written by :func:`dump_binary` back into the dict shape.
+
+    Keys are ``(desc, anc)`` tuples, as returned by
+    :func:`~loanpy.correspondences.get_sound_correspondences`; pass the result
+    through :func:`~loanpy.correspondences.add_separator` for TOML export.
+    """
+    with MappedCorrespondences(path) as mapped:
+        return mapped.to_dict()
@@ -0,0 +1,130 @@
+"""Bloom-filter prefilter for attested correspondence pairs."""
+
+from __future__ import annotations
+
+import math
+from collections.abc import Iterable, Mapping, Sequence
+from hashlib import blake2b
+
+
+class PairFilter:
+    """Compact set of the ``(a, b)`` pairs that ``get_score`` does not penalise.
+
+    A pair is *attested* if its count in ``AbsoluteFrequency`` is at least
+    ``freq_filter``; every other pair costs ``-1000`` in
+    :meth:`~loanpy.uralign.Uralign.get_score`. The filter stores the attested
+    pairs in a Bloom filter: a negative answer is exact, a positive one is
+    wrong with probability about ``false_positive_rate``. A candidate
+    alignment rejected by :meth:`all_attested` therefore certainly contains a
+    penalised pair and can be skipped before scoring.
+
+    Parameters
+    ----------
+    absolute_frequency:
+        Mapping of ``(descendant, ancestor)`` pairs to counts, e.g.
+        ``AbsoluteFrequency`` from
+        :func:`~loanpy.correspondences.get_sound_correspondences`.
+    freq_filter:
+        Minimum count for a pair to be attested, as in ``get_score``.
+    false_positive_rate:
+        Target probability that an unattested pair passes. Lower rates cost
+        about 1.44 × log2(1 / rate) bits per attested pair.
+
+    Raises
+    ------
+    ValueError
+        If ``false_positive_rate`` is not between 0 and 1.
+
+    Examples
+    --------
+    Skip candidates that would take a penalty before scoring them::
+
+        attested = PairFilter(stats["AbsoluteFrequency"], freq_filter=2)
+        for alm_d, alm_a in alignments:
+            if attested.all_attested(alm_d, alm_a):
+                score = Uralign.get_score(alm_d, alm_a, scorer)
+
+    Notes
+    -----
+    Hashes are computed with BLAKE2b rather than :func:`hash`, so a filter
+    pickled in one process gives the same answers in another. Lookups made
+    by :meth:`all_attested` are memoised per pair; the number of distinct
+    pairs is bounded by the square of the segment inventory.
+    """
+
+    def __init__(
+        self,
+        absolute_frequency: Mapping[tuple[str, str], float],
+        freq_filter: int = 2,
+        false_positive_rate: float = 0.01,
+    ) -> None:
+        if not 0 < false_positive_rate < 1:
+            raise ValueError("false_positive_rate must be between 0 and 1")
+        pairs = [
+            pair for pair, count in absolute_frequency.items() if count >= freq_filter
+        ]
+        capacity = max(len(pairs), 1)
+        bits_per_pair = -math.log(false_positive_rate) / math.log(2) ** 2
+        self.size = max(8, math.ceil(capacity * bits_per_pair))
+        self.n_hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+        self._cache: dict[tuple[str, str], bool] = {}
+        for desc, anc in pairs:
+            self.add(desc, anc)
+
+    def _positions(self, a: str, b: str) -> Iterable[int]:
+        digest = blake2b(f"{a}\x1f{b}".encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.n_hashes))
+
+    def add(self, a: str, b: str) -> None:
+        """Mark the pair ``(a, b)`` as attested."""
+        for position in self._positions(a, b):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+        self._cache.clear()
+
+    def __contains__(self, pair: tuple[str, str]) -> bool:
+        bits = self.bits
+        return all(
+            bits[position >> 3] >> (position & 7) & 1
+            for position in self._positions(*pair)
+        )
+
+    def all_attested(self, seqA: Iterable[str], seqB: Iterable[str]) -> bool:
+        """Check that every aligned pair of ``seqA`` and ``seqB`` is attested.
+
+        Returns
+        -------
+        bool
+            False if some pair would be penalised by ``get_score``; True if
+            none would, up to the false-positive rate.
+        """
+        cache = self._cache
+        for pair in zip(seqA, seqB):
+            attested = cache.get(pair)
+            if attested is None:
+                attested = cache[pair] = pair in self
+            if not attested:
+                return False
+        return True
+
+    def filter(
+        self, alignments: Iterable[tuple[Sequence[str], Sequence[str]]]
+    ) -> list[int]:
+        """Indices of the alignments that pass :meth:`all_attested`."""
+        return [
+            index
+            for index, (seqA, seqB) in enumerate(alignments)
+            if self.all_attested(seqA, seqB)
+        ]
+
+    @property
+    def false_positive_rate(self) -> float:
+        """Expected false-positive rate at the current fill."""
+        if not self.count:
+            return 0.0
+        fill = 1 - math.exp(-self.n_hashes * self.count / self.size)
+        return fill**self.n_hashes
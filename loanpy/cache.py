@@ -0,0 +1,281 @@
+"""Content-hash keyed result cache for expensive pipeline stages.
+
+:func:`~loanpy.correspondences.get_sound_correspondences`,
+:meth:`~loanpy.adapt.Adapt.get_substitutions` and
+:func:`~loanpy.phonotactics.expand_phonotactics` take an optional ``cache``;
+a rerun on unchanged inputs then loads the stored result instead of
+recomputing it.
+
+Examples
+--------
+Share one cache directory across experiment runs::
+
+    cache = ResultCache(".loanpy-cache", max_bytes=512 * 2**20)
+    stats = get_sound_correspondences(rows, "Uralign", cache=cache)
+    templates = expand_phonotactics("(C)V(C)+CV(C)+CV", cache=cache)
+    print(cache.stats())
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import time
+from array import array
+from collections.abc import Callable, Iterator, Mapping, Sequence
+from pathlib import Path
+from typing import Any, Protocol
+
+#: Bumped when a cached stage changes its result for the same inputs.
+CACHE_FORMAT = 1
+
+
+def _canonical(value: Any) -> Any:
+    """JSON-ready form of ``value`` that does not depend on insertion order."""
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, Mapping):
+        items = [(_canonical(key), _canonical(item)) for key, item in value.items()]
+        return {"map": sorted(items, key=lambda item: json.dumps(item[0]))}
+    if isinstance(value, (set, frozenset)):
+        return {"set": sorted(map(_canonical, value), key=json.dumps)}
+    if isinstance(value, (list, tuple, array, memoryview)):
+        return [_canonical(item) for item in value]
+    if callable(value):
+        module = getattr(value, "__module__", None)
+        qualname = getattr(value, "__qualname__", None)
+        if module is None or qualname is None or "<" in qualname:
+            raise TypeError(
+                f"cannot hash {value!r}; use a function defined at module level"
+            )
+        return {"callable": f"{module}.{qualname}"}
+    raise TypeError(f"cannot hash {type(value).__name__} values")
+
+
+def content_hash(*parts: Any) -> str:
+    """Stable hex digest of JSON-like ``parts``.
+
+    Mappings and sets are hashed independently of their iteration order;
+    lists, tuples and arrays by their items; functions and classes by their
+    ``module.qualname``. The digest is the same across processes and Python
+    versions, unlike :func:`hash`.
+
+    Raises
+    ------
+    TypeError
+        If a part holds a value that is not a string, number, bool, None,
+        mapping, set, sequence or module-level callable. Lambdas and nested
+        functions have no stable name and are rejected.
+
+    Notes
+    -----
+    A callable is identified by name only: editing the body of a distance
+    function does not change the hash, so rename it or clear the cache.
+    """
+    data = json.dumps(_canonical(parts), ensure_ascii=False, separators=(",", ":"))
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class CacheBackend(Protocol):
+    """Byte storage behind a :class:`ResultCache`."""
+
+    def read(self, key: str) -> bytes | None:
+        """Stored bytes for ``key``, or None, marking the entry as used."""
+
+    def write(self, key: str, data: bytes) -> None:
+        """Store ``data`` under ``key``, replacing any earlier entry."""
+
+    def delete(self, key: str) -> None:
+        """Remove ``key`` if present."""
+
+    def entries(self) -> Iterator[tuple[str, int, float]]:
+        """``(key, size_in_bytes, last_used)`` for every stored entry."""
+
+
+class DirectoryBackend:
+    """One file per entry under ``path``, fanned out by key prefix.
+
+    Writes go to a temporary file that is renamed into place, so concurrent
+    processes sharing the directory never read a partial entry. The file
+    modification time records the last use and drives eviction.
+    """
+
+    suffix = ".pickle"
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def _file(self, key: str) -> Path:
+        return self.path / key[:2] / f"{key}{self.suffix}"
+
+    def read(self, key: str) -> bytes | None:
+        file = self._file(key)
+        try:
+            data = file.read_bytes()
+            os.utime(file)
+        except FileNotFoundError:
+            return None
+        return data
+
+    def write(self, key: str, data: bytes) -> None:
+        file = self._file(key)
+        file.parent.mkdir(exist_ok=True)
+        fd, temp = tempfile.mkstemp(dir=file.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(data)
+            os.replace(temp, file)
+        except BaseException:
+            os.unlink(temp)
+            raise
+
+    def delete(self, key: str) -> None:
+        try:
+            self._file(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def entries(self) -> Iterator[tuple[str, int, float]]:
+        for file in self.path.glob(f"??/*{self.suffix}"):
+            try:
+                stat = file.stat()
+            except FileNotFoundError:
+                continue
+            yield file.name[: -len(self.suffix)], stat.st_size, stat.st_mtime
+
+
+class ResultCache:
+    """Results of pipeline stages keyed by a hash of their inputs.
+
+    Each entry is keyed by :func:`content_hash` of the stage name,
+    :data:`CACHE_FORMAT` and the stage's inputs and parameters, and stores the
+    pickled result with the seconds it took to compute. When the stored bytes
+    exceed ``max_bytes``, the least recently used entries are evicted.
+
+    Parameters
+    ----------
+    backend:
+        A directory path, or any object with the :class:`CacheBackend`
+        methods.
+    max_bytes:
+        Size limit of all entries together; ``None`` for no limit.
+
+    Notes
+    -----
+    Entries are pickles, so only point the cache at directories you trust.
+    The size total is read from the backend once and then kept in memory;
+    processes sharing a directory each enforce the limit on their own view,
+    so the directory can briefly exceed it.
+    """
+
+    def __init__(
+        self,
+        backend: str | os.PathLike | CacheBackend,
+        max_bytes: int | None = 256 * 2**20,
+    ) -> None:
+        if max_bytes is not None and max_bytes < 0:
+            raise ValueError("max_bytes must be non-negative")
+        if isinstance(backend, (str, os.PathLike)):
+            backend = DirectoryBackend(backend)
+        self.backend = backend
+        self.max_bytes = max_bytes
+        self._sizes = {key: size for key, size, _ in backend.entries()}
+        self._stages: dict[str, dict[str, float]] = {}
+        self._evictions = 0
+
+    def _stage(self, stage: str) -> dict[str, float]:
+        return self._stages.setdefault(
+            stage, {"hits": 0, "misses": 0, "saved_s": 0.0, "computed_s": 0.0}
+        )
+
+    def call(
+        self, stage: str, key_parts: Sequence[Any], compute: Callable[[], Any]
+    ) -> Any:
+        """Return the stored result for ``key_parts``, or compute and store it.
+
+        Parameters
+        ----------
+        stage:
+            Name of the cached stage; part of the key and of :meth:`stats`.
+        key_parts:
+            Everything the result depends on, hashable by :func:`content_hash`.
+        compute:
+            Called without arguments on a miss.
+        """
+        start = time.perf_counter()
+        key = content_hash(stage, CACHE_FORMAT, *key_parts)
+        counters = self._stage(stage)
+        data = self.backend.read(key)
+        if data is not None:
+            try:
+                elapsed, result = pickle.loads(data)
+            except Exception:  # unreadable entry: recompute and overwrite
+                self.backend.delete(key)
+                self._sizes.pop(key, None)
+            else:
+                counters["hits"] += 1
+                counters["saved_s"] += max(elapsed - (time.perf_counter() - start), 0)
+                return result
+        counters["misses"] += 1
+        start = time.perf_counter()
+        result = compute()
+        elapsed = time.perf_counter() - start
+        counters["computed_s"] += elapsed
+        data = pickle.dumps((elapsed, result), protocol=pickle.HIGHEST_PROTOCOL)
+        if self.max_bytes is None or len(data) <= self.max_bytes:
+            self.backend.write(key, data)
+            self._sizes[key] = len(data)
+            self._evict()
+        return result
+
+    def _evict(self) -> None:
+        if self.max_bytes is None or sum(self._sizes.values()) <= self.max_bytes:
+            return
+        total = 0
+        for key, size, _ in sorted(
+            self.backend.entries(), key=lambda entry: entry[2], reverse=True
+        ):
+            if total + size <= self.max_bytes:
+                total += size
+                continue
+            self.backend.delete(key)
+            self._sizes.pop(key, None)
+            self._evictions += 1
+        self._sizes = {key: size for key, size, _ in self.backend.entries()}
+
+    def clear(self) -> None:
+        """Delete every entry; counters are kept."""
+        for key, _, _ in list(self.backend.entries()):
+            self.backend.delete(key)
+        self._sizes.clear()
+
+    def stage_stats(self, stage: str) -> dict[str, float]:
+        """Counters of one stage, as in the ``stages`` entry of :meth:`stats`."""
+        return dict(self._stage(stage))
+
+    def stats(self) -> dict[str, Any]:
+        """Hit and timing counters since construction.
+
+        Returns
+        -------
+        dict
+            ``hits``, ``misses``, ``saved_s`` (compute time of the hits
+            minus the time spent hashing their inputs and loading them),
+            ``computed_s`` (time spent on misses), ``entries``, ``bytes``,
+            ``evictions`` and ``stages``, the same counters per stage name.
+        """
+        stages = {stage: dict(counters) for stage, counters in self._stages.items()}
+        return {
+            "hits": sum(counters["hits"] for counters in stages.values()),
+            "misses": sum(counters["misses"] for counters in stages.values()),
+            "saved_s": sum(counters["saved_s"] for counters in stages.values()),
+            "computed_s": sum(counters["computed_s"] for counters in stages.values()),
+            "entries": len(self._sizes),
+            "bytes": sum(self._sizes.values()),
+            "evictions": self._evictions,
+            "stages": stages,
+        }
@@ -1,5 +1,40 @@
 """Phoneme clustering: CV grouping, glide clustering, and gap collapsing."""
 
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from functools import lru_cache
+from itertools import accumulate, compress
+from operator import ne
+
+from loanpy.vocabulary import SegmentVocabulary
+
+
+def _collapse_gaps(
+    seqA: Sequence[str], seqB: Sequence[str]
+) -> tuple[list[str], list[str]]:
+    """Body of :meth:`Cluster.gaps`; empty input gives ``([], [])``."""
+    seqA_new: list[str] = []
+    seqB_new: list[str] = []
+    append_a, append_b = seqA_new.append, seqB_new.append
+    in_gap = False
+    for tokA, tokB in zip(seqA, seqB):
+        if tokB == "-":
+            if in_gap:
+                seqA_new[-1] += f".{tokA}"
+                continue
+            in_gap = True
+        else:
+            in_gap = False
+        append_a(tokA)
+        append_b(tokB)
+    if in_gap:
+        seqB_new.pop()
+        seqA_new.append(seqA_new[-1])
+        seqA_new[-2] = "+"
+    return seqA_new, seqB_new
+
 
 class Cluster:
     """Static helpers for segment clustering in CLDF pipelines.
@@ -21,6 +56,10 @@ class Cluster:
 
         alm_a, alm_b = Cluster.gaps(alm_a, alm_b)
 
+    The ``*_ids`` variants take segment ids from a
+    :class:`~loanpy.vocabulary.SegmentVocabulary` and return ids of the same
+    clusters, decoding to exactly the strings of their string counterparts.
+
     Notes
     -----
     Used in **CLDF conversion** scripts (``cldfbench_*.py``) for datasets such as
@@ -58,6 +97,98 @@ class Cluster:
                 result[-1] += "." + segment
         return result
 
+    @staticmethod
+    def cv_ids(
+        ids: Sequence[int], cv_profile: Sequence[str], vocabulary: SegmentVocabulary
+    ) -> list[int]:
+        """Id-based :meth:`cv`; clusters are interned in ``vocabulary``."""
+        result = []
+        run: list[int] = []
+        previous = None
+        for segment_id, cv in zip(ids, cv_profile):
+            if run and cv != previous:
+                result.append(run[0] if len(run) == 1 else vocabulary.join(run))
+                run = []
+            run.append(segment_id)
+            previous = cv
+        if run:
+            result.append(run[0] if len(run) == 1 else vocabulary.join(run))
+        return result
+
+    @staticmethod
+    def cv_many(
+        ids: Sequence[int],
+        cv_profile: Sequence,
+        offsets: Sequence[int],
+        vocabulary: SegmentVocabulary,
+        as_strings: bool = False,
+    ):
+        """Batch :meth:`cv` over an integer-encoded corpus.
+
+        Run boundaries of the whole corpus are found with one element-wise
+        comparison of ``cv_profile`` against itself shifted by one, plus the
+        word starts; clusters are then cut out of ``ids`` run by run.
+
+        Parameters
+        ----------
+        ids:
+            Flat segment ids of all words, e.g.
+            :attr:`~loanpy.table.SegmentTable.ids`.
+        cv_profile:
+            Parallel labels: a string such as ``"CCVC…"``, bytes, or any
+            sequence of comparable values (e.g. 0/1 bits).
+        offsets:
+            ``n_words + 1`` word boundaries into ``ids``.
+        vocabulary:
+            Vocabulary of ``ids``; multi-segment clusters are interned in it.
+        as_strings:
+            Return the clustered words as string lists instead of ids.
+
+        Returns
+        -------
+        tuple or list[list[str]]
+            ``(cluster_ids, cluster_labels, cluster_offsets)`` in the input
+            layout — labels of the same type as ``cv_profile`` for strings
+            and bytes, a list otherwise — or, with ``as_strings``, one list of
+            ``"."``-joined clusters per word, each string built once.
+
+        Examples
+        --------
+        ::
+
+            ids, labels, offsets = Cluster.cv_many(
+                table.ids, table.cv, table.offsets, table.vocabulary
+            )
+        """
+        n = len(ids)
+        boundary = [*map(ne, cv_profile[1:n], cv_profile[: n - 1])]
+        if n:
+            boundary.insert(0, True)
+        for offset in offsets[:-1]:
+            if offset < n:
+                boundary[offset] = True
+        starts = list(compress(range(n), boundary))
+        stops = starts[1:] + [n]
+        run_counts = list(accumulate(boundary, initial=0))
+        cluster_offsets = array("q", map(run_counts.__getitem__, offsets))
+        # Tuple slices are the join memo's keys as they are.
+        runs = map(tuple(ids).__getitem__, map(slice, starts, stops))
+        cluster_ids = vocabulary.join_many(runs)
+        if as_strings:
+            clusters = list(map(vocabulary.segments.__getitem__, cluster_ids))
+            return [
+                clusters[start:stop]
+                for start, stop in zip(cluster_offsets, cluster_offsets[1:])
+            ]
+        labels = compress(cv_profile, boundary)
+        if isinstance(cv_profile, str):
+            labels = "".join(labels)
+        elif isinstance(cv_profile, (bytes, bytearray)):
+            labels = bytes(labels)
+        else:
+            labels = list(labels)
+        return array("i", cluster_ids), labels, cluster_offsets
+
     @staticmethod
     def glides(
         segments: list[str],
@@ -91,41 +222,22 @@ class Cluster:
         Used in **CLDF conversion** (e.g. UESz-year-origin ``Cluster_glide`` column,
         WestOldTurkic ``Clusters``).
         """
-        if len(segments) != len(cv_profile):
-            raise ValueError("segments and cv_profile must have the same length")
-        cluster2 = []
-        profile2 = []
-        for idx, phoneme in enumerate(segments):
-            if (
-                idx != 0
-                and phoneme in cluster_between_vowels
-                and cv_profile[idx - 1] == "V"
-            ):
-                cluster2[-1] += f".{phoneme}"
-                profile2[-1] += f".{cv_profile[idx]}"
-            elif (
-                idx != 0
-                and phoneme in cluster_after_l
-                and len(cluster2) > 0
-                and cluster2[-1] == "l"
-            ):
-                cluster2[-1] += f".{phoneme}"
-                profile2[-1] += f".{cv_profile[idx]}"
-            else:
-                cluster2.append(phoneme)
-                profile2.append(cv_profile[idx])
-
-        cluster3 = []
-        for idx, phoneme in enumerate(cluster2):
-            if (
-                idx != 0
-                and profile2[idx] == "V"
-                and any(f".{ph}" in cluster3[-1] for ph in cluster_between_vowels)
-            ):
-                cluster3[-1] += f".{phoneme}"
-            else:
-                cluster3.append(phoneme)
-        return cluster3
+        return _clusterer(
+            tuple(cluster_between_vowels), tuple(cluster_after_l)
+        ).glides(segments, cv_profile)
+
+    @staticmethod
+    def glides_ids(
+        ids: Sequence[int],
+        cv_profile: Sequence[str],
+        vocabulary: SegmentVocabulary,
+        cluster_between_vowels: tuple[str, ...] = ("ɣ", "w", "v"),
+        cluster_after_l: tuple[str, ...] = ("t͡ʃ", "d"),
+    ) -> list[int]:
+        """Id-based :meth:`glides`; clusters are interned in ``vocabulary``."""
+        return _clusterer(
+            tuple(cluster_between_vowels), tuple(cluster_after_l)
+        ).glides_ids(ids, cv_profile, vocabulary)
 
     @staticmethod
     def gaps(seqA: list[str], seqB: list[str]) -> tuple[list[str], list[str]]:
@@ -133,7 +245,7 @@ class Cluster:
 
         When two adjacent positions in ``seqB`` are gaps (``"-"``), the matching
         symbol in ``seqA`` is merged into the previous token. Trailing gaps may
-        introduce a ``"+"`` marker in ``seqA``.
+        introduce a ``"+"`` marker in ``seqA``. Empty input gives ``([], [])``.
 
         Parameters
         ----------
@@ -150,14 +262,193 @@ class Cluster:
         Used in **CLDF conversion** for WestOldTurkic (``Monogap`` alignments) after
         global pairwise alignment.
         """
+        return _collapse_gaps(seqA, seqB)
+
+    @staticmethod
+    def gaps_many(
+        pairs: Iterable[tuple[Sequence[str], Sequence[str]]],
+    ) -> Iterator[tuple[list[str], list[str]]]:
+        """Lazily apply :meth:`gaps` to a stream of aligned pairs.
+
+        Parameters
+        ----------
+        pairs:
+            Iterable of ``(seqA, seqB)`` alignments, e.g. every pair of a
+            cognate file; consumed one pair at a time.
+
+        Yields
+        ------
+        tuple[list[str], list[str]]
+            The collapsed pair, exactly as :meth:`gaps` returns it. Empty
+            pairs yield ``([], [])``.
+
+        Notes
+        -----
+        Open gap runs are tracked with a flag instead of re-reading the output
+        lists, and the trailing ``"+"`` is placed without ``list.insert``.
+        Each yielded pair is a fresh list pair that callers may keep.
+        """
+        for seqA, seqB in pairs:
+            yield _collapse_gaps(seqA, seqB)
+
+    @staticmethod
+    def gaps_ids(
+        seqA: Sequence[int], seqB: Sequence[int], vocabulary: SegmentVocabulary
+    ) -> tuple[list[int], list[int]]:
+        """Id-based :meth:`gaps`; merged tokens are interned in ``vocabulary``."""
+        gap = vocabulary.intern("-")
         seqA_new, seqB_new = [], []
         for idx, (tokA, tokB) in enumerate(zip(seqA, seqB)):
-            if idx != 0 and tokB == "-" and seqB_new[-1] == "-":
-                seqA_new[-1] += f".{tokA}"
+            if idx != 0 and tokB == gap and seqB_new[-1] == gap:
+                seqA_new[-1] = vocabulary.join((seqA_new[-1], tokA))
             else:
                 seqA_new.append(tokA)
                 seqB_new.append(tokB)
-        if seqB_new[-1] == "-":
-            seqA_new.insert(-1, "+")
+        if seqB_new and seqB_new[-1] == gap:
+            seqA_new.insert(-1, vocabulary.intern("+"))
             seqB_new.pop(-1)
         return seqA_new, seqB_new
+
+
+class Clusterer:
+    """Precompiled glide clustering, output-identical to :meth:`Cluster.glides`.
+
+    The segment classes are frozen once, and whether a cluster "contains a
+    glide" (``".<glide>"`` occurs in its joined string) is carried as state
+    instead of re-scanning the growing string for every vowel.
+
+    Parameters
+    ----------
+    cluster_between_vowels, cluster_after_l:
+        As in :meth:`Cluster.glides`.
+
+    Examples
+    --------
+    Configure once, then cluster a whole wordlist::
+
+        clusterer = Clusterer(cluster_between_vowels=("w", "j"))
+        clusters = clusterer.glides_many(zip(segment_lists, cv_profiles))
+
+    Notes
+    -----
+    A vowel is only ever attached to a cluster that already contains a
+    glide, and attaching more text cannot remove it, so the flag of a cluster
+    is decided by the token that opens it. That test is memoised per token
+    string, so each distinct token is scanned once per :class:`Clusterer`.
+    """
+
+    def __init__(
+        self,
+        cluster_between_vowels: Iterable[str] = ("ɣ", "w", "v"),
+        cluster_after_l: Iterable[str] = ("t͡ʃ", "d"),
+    ) -> None:
+        self.cluster_between_vowels = frozenset(cluster_between_vowels)
+        self.cluster_after_l = frozenset(cluster_after_l)
+        self._needles = tuple(f".{ph}" for ph in self.cluster_between_vowels)
+        self._has_glide: dict[str, bool] = {}
+
+    def _opens_glide_cluster(self, token: str) -> bool:
+        flag = self._has_glide.get(token)
+        if flag is None:
+            flag = self._has_glide[token] = any(
+                needle in token for needle in self._needles
+            )
+        return flag
+
+    def glides(self, segments: Sequence[str], cv_profile: Sequence[str]) -> list[str]:
+        """Cluster one word; see :meth:`Cluster.glides`.
+
+        Raises
+        ------
+        ValueError
+            If ``segments`` and ``cv_profile`` differ in length.
+        """
+        if len(segments) != len(cv_profile):
+            raise ValueError("segments and cv_profile must have the same length")
+        between, after_l = self.cluster_between_vowels, self.cluster_after_l
+        cluster2: list[str] = []
+        vowel2: list[bool] = []
+        previous_vowel = False
+        for phoneme, cv in zip(segments, cv_profile):
+            if cluster2 and (
+                (previous_vowel and phoneme in between)
+                or (phoneme in after_l and cluster2[-1] == "l")
+            ):
+                cluster2[-1] = f"{cluster2[-1]}.{phoneme}"
+                vowel2[-1] = False
+            else:
+                cluster2.append(phoneme)
+                vowel2.append(cv == "V")
+            previous_vowel = cv == "V"
+
+        opens_glide_cluster = self._opens_glide_cluster
+        cluster3: list[str] = []
+        glide = False
+        for token, vowel in zip(cluster2, vowel2):
+            if glide and vowel:
+                cluster3[-1] = f"{cluster3[-1]}.{token}"
+            else:
+                cluster3.append(token)
+                glide = opens_glide_cluster(token)
+        return cluster3
+
+    def glides_ids(
+        self,
+        ids: Sequence[int],
+        cv_profile: Sequence[str],
+        vocabulary: SegmentVocabulary,
+    ) -> list[int]:
+        """Id-based :meth:`glides`; clusters are interned in ``vocabulary``.
+
+        Raises
+        ------
+        ValueError
+            If ``ids`` and ``cv_profile`` differ in length.
+        """
+        if len(ids) != len(cv_profile):
+            raise ValueError("segments and cv_profile must have the same length")
+        known = vocabulary.ids
+        between = {known[ph] for ph in self.cluster_between_vowels if ph in known}
+        after_l = {known[ph] for ph in self.cluster_after_l if ph in known}
+        l_id = known.get("l")
+        join = vocabulary.join
+        cluster2: list[int] = []
+        vowel2: list[bool] = []
+        previous_vowel = False
+        for phoneme, cv in zip(ids, cv_profile):
+            if cluster2 and (
+                (previous_vowel and phoneme in between)
+                or (phoneme in after_l and cluster2[-1] == l_id)
+            ):
+                cluster2[-1] = join((cluster2[-1], phoneme))
+                vowel2[-1] = False
+            else:
+                cluster2.append(phoneme)
+                vowel2.append(cv == "V")
+            previous_vowel = cv == "V"
+
+        opens_glide_cluster = self._opens_glide_cluster
+        segments = vocabulary.segments
+        cluster3: list[int] = []
+        glide = False
+        for token, vowel in zip(cluster2, vowel2):
+            if glide and vowel:
+                cluster3[-1] = join((cluster3[-1], token))
+            else:
+                cluster3.append(token)
+                glide = opens_glide_cluster(segments[token])
+        return cluster3
+
+    def glides_many(
+        self, words: Iterable[tuple[Sequence[str], Sequence[str]]]
+    ) -> list[list[str]]:
+        """Cluster many ``(segments, cv_profile)`` pairs, in input order."""
+        glides = self.glides
+        return [glides(segments, cv_profile) for segments, cv_profile in words]
+
+
+@lru_cache(maxsize=32)
+def _clusterer(
+    cluster_between_vowels: tuple[str, ...], cluster_after_l: tuple[str, ...]
+) -> Clusterer:
+    return Clusterer(cluster_between_vowels, cluster_after_l)
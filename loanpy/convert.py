@@ -0,0 +1,314 @@
+"""Streaming CLDF conversion: derived cluster and alignment columns.
+
+Dataset conversion scripts load ``forms.csv`` or ``cognates.csv`` whole, add
+``Cluster``- and ``Uralign``-derived columns and write the table back.
+:func:`convert_csv` does the same chunk by chunk: rows are read with
+:func:`~loanpy.reader.iter_chunks`, each chunk is converted column by column
+(:meth:`~loanpy.cluster.Cluster.cv`,
+:meth:`~loanpy.cluster.Clusterer.glides_many`,
+:meth:`~loanpy.uralign.Uralign.hu_many`), optionally in worker processes,
+and written out before the next chunks are read. It is exposed on the command
+line as ``python -m loanpy convert``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import os
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from operator import ne
+from os import PathLike
+
+from loanpy.cluster import Cluster, Clusterer
+from loanpy.reader import iter_chunks
+from loanpy.uralign import Uralign
+
+#: Derived column kinds understood by :func:`convert_csv`.
+KINDS = ("cv", "glides", "uralign")
+
+
+def convert_rows(
+    rows: Sequence[Sequence[str]], kinds: Sequence[str]
+) -> list[tuple[str, ...]]:
+    """Derived column values for a chunk of ``(segments, cv_profile)`` rows.
+
+    Parameters
+    ----------
+    rows:
+        Space-separated segment strings and C/V profiles (``"C C V"`` or
+        ``"CCV"``).
+    kinds:
+        Entries of :data:`KINDS`, one per derived column.
+
+    Returns
+    -------
+    list[tuple[str, ...]]
+        One tuple of space-separated values per row, in ``kinds`` order.
+
+    Raises
+    ------
+    ValueError
+        If a profile does not match its segment count, or ``uralign`` is
+        requested for an odd number of rows.
+
+    Notes
+    -----
+    ``cv`` is :meth:`~loanpy.cluster.Cluster.cv`, ``glides`` is
+    :meth:`~loanpy.cluster.Cluster.glides` and ``uralign`` aligns the C/V
+    clusters of consecutive descendant / ancestor rows with
+    :meth:`~loanpy.uralign.Uralign.hu`, the layout that
+    :func:`~loanpy.correspondences.get_sound_correspondences` reads.
+    """
+    segments = [word.split() for word, _ in rows]
+    profiles = ["".join(profile.split()) for _, profile in rows]
+    if any(map(ne, map(len, segments), map(len, profiles))):
+        raise ValueError("segments and cv_profile must have the same length")
+    columns: list[list[str]] = []
+    clusters = None
+    if "cv" in kinds or "uralign" in kinds:
+        clusters = list(map(Cluster.cv, segments, profiles))
+    for kind in kinds:
+        if kind == "cv":
+            columns.append(list(map(" ".join, clusters)))
+        elif kind == "glides":
+            glides = Clusterer().glides_many(zip(segments, profiles))
+            columns.append(list(map(" ".join, glides)))
+        elif kind == "uralign":
+            if len(rows) % 2:
+                raise ValueError(
+                    "uralign needs descendant / ancestor row pairs; "
+                    "got an odd number of rows"
+                )
+            cv0 = [profile[:1] for profile in profiles]
+            aligned = Uralign.hu_many(
+                zip(clusters[0::2], clusters[1::2], cv0[0::2], cv0[1::2])
+            )
+            columns.append([" ".join(word) for pair in aligned for word in pair])
+        else:
+            raise ValueError(f"unknown kind {kind!r}; expected one of {KINDS}")
+    return list(zip(*columns)) if columns else [()] * len(rows)
+
+
+def _convert_chunk(
+    chunk: list[tuple[str, ...]], kinds: tuple[str, ...]
+) -> list[list[str]]:
+    """Append derived values to ``(segments, cv, *row)`` tuples of a chunk."""
+    derived = convert_rows([row[:2] for row in chunk], kinds)
+    return [[*row[2:], *values] for row, values in zip(chunk, derived)]
+
+
+def _paired_chunks(
+    chunks: Iterable[list[tuple[str, ...]]],
+) -> Iterator[list[tuple[str, ...]]]:
+    """Re-cut ``chunks`` so that none ends between a descendant and its ancestor.
+
+    Chunk sizes count lines, not rows, so a blank line can leave an odd number
+    of rows in a chunk; its last row is carried over into the next chunk.
+    """
+    carry: list[tuple[str, ...]] = []
+    for rows in chunks:
+        if carry:
+            rows = carry + rows
+        carry = rows[-1:] if len(rows) % 2 else []
+        if len(rows) > 1:
+            yield rows[: len(rows) - len(carry)]
+    if carry:
+        yield carry
+
+
+def _ordered_map(
+    func: Callable, items: Iterable, args: tuple, processes: int | None
+) -> Iterator:
+    """``map(func, items)`` over a process pool, in order, with bounded lookahead.
+
+    :meth:`concurrent.futures.Executor.map` submits the whole input up front;
+    here at most two tasks per worker are in flight, so the input is only read
+    as fast as results are consumed.
+    """
+    if processes == 1:
+        for item in items:
+            yield func(item, *args)
+        return
+    workers = processes or os.cpu_count() or 1
+    with ProcessPoolExecutor(workers) as executor:
+        pending: deque = deque()
+        for item in items:
+            pending.append(executor.submit(func, item, *args))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def convert_csv(
+    source: str | PathLike,
+    target: str | PathLike,
+    derived: Mapping[str, str],
+    segments_col: str = "Segments",
+    cv_col: str = "CV",
+    chunk_size: int = 10_000,
+    processes: int | None = 1,
+    delimiter: str = ",",
+    encoding: str = "utf-8-sig",
+    use_mmap: bool = False,
+) -> int:
+    """Stream a forms or cognates CSV to ``target`` with derived columns added.
+
+    Parameters
+    ----------
+    source, target:
+        Input and output CSV paths. The output keeps every input column, in
+        order; derived columns that already exist are overwritten in place,
+        the others are appended.
+    derived:
+        Output column name → kind from :data:`KINDS`, e.g.
+        ``{"Cluster_cv": "cv", "Uralign": "uralign"}``; see
+        :func:`convert_rows`.
+    segments_col, cv_col:
+        Columns with space-separated segments and their C/V profile.
+    chunk_size:
+        Rows per chunk. With ``uralign`` a chunk that ends between a
+        descendant and its ancestor row passes that row on to the next chunk,
+        so pairs never straddle two chunks.
+    processes:
+        Worker processes converting chunks; ``1`` runs in-process and
+        ``None`` uses all CPUs. Output order always matches the input.
+    delimiter, encoding, use_mmap:
+        Passed to :func:`~loanpy.reader.iter_chunks`. The output is written
+        as UTF-8 with ``"\\n"`` line endings.
+
+    Returns
+    -------
+    int
+        Number of data rows written.
+
+    Raises
+    ------
+    ValueError
+        If a kind is unknown, the input has no header or lacks a column, or
+        ``uralign`` meets an odd number of rows.
+
+    Examples
+    --------
+    ::
+
+        convert_csv(
+            "cldf/cognates.csv",
+            "cldf/cognates.out.csv",
+            {"Cluster_cv": "cv", "Uralign": "uralign"},
+            processes=8,
+        )
+
+    Notes
+    -----
+    Memory is bounded by ``chunk_size`` times the number of chunks in flight:
+    one in-process, or two per worker process.
+    """
+    unknown = sorted(set(derived.values()) - set(KINDS))
+    if unknown:
+        raise ValueError(f"unknown kinds: {', '.join(unknown)}; expected {KINDS}")
+    with open(source, encoding=encoding, newline="") as file:
+        header = next(csv.reader(file, delimiter=delimiter), None)
+    if not header:
+        raise ValueError(f"{source} has no header row")
+    missing = [name for name in (segments_col, cv_col) if name not in header]
+    if missing:
+        raise ValueError(f"columns not in header: {', '.join(missing)}")
+    kinds = tuple(derived.values())
+    kept = [name for name in header if name not in derived]
+    out_header = [*kept, *derived]
+    # Rows come back as kept + derived values; restore the input column order.
+    order = [out_header.index(name) for name in header]
+    order += [out_header.index(name) for name in derived if name not in header]
+    chunks = iter_chunks(
+        source,
+        [segments_col, cv_col, *kept],
+        chunk_size,
+        use_mmap=use_mmap,
+        delimiter=delimiter,
+        encoding=encoding,
+    )
+    if "uralign" in kinds:
+        chunks = _paired_chunks(chunks)
+    written = 0
+    with open(target, "w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file, delimiter=delimiter, lineterminator="\n")
+        writer.writerow([out_header[index] for index in order])
+        for rows in _ordered_map(_convert_chunk, chunks, (kinds,), processes):
+            writer.writerows([[row[index] for index in order] for row in rows])
+            written += len(rows)
+    return written
+
+
+def _parse_derived(specs: Sequence[str]) -> dict[str, str]:
+    derived = {}
+    for spec in specs:
+        name, sep, kind = spec.partition("=")
+        if not sep or not name or kind not in KINDS:
+            raise argparse.ArgumentTypeError(
+                f"expected NAME=KIND with KIND in {', '.join(KINDS)}, got {spec!r}"
+            )
+        derived[name] = kind
+    return derived
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Entry point of ``python -m loanpy``.
+
+    Examples
+    --------
+    ::
+
+        python -m loanpy convert cldf/forms.csv forms.out.csv \\
+            --add Cluster_cv=cv --add Cluster_glide=glides --processes 8
+    """
+    parser = argparse.ArgumentParser(prog="python -m loanpy", description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+    convert = commands.add_parser(
+        "convert",
+        help="add cluster and alignment columns to a CSV, streaming in chunks",
+    )
+    convert.add_argument("source", help="input forms or cognates CSV")
+    convert.add_argument("target", help="output CSV")
+    convert.add_argument(
+        "--add",
+        metavar="NAME=KIND",
+        action="append",
+        required=True,
+        help=f"derived column to write; KIND is one of {', '.join(KINDS)}",
+    )
+    convert.add_argument("--segments", default="Segments", help="segments column")
+    convert.add_argument("--cv", default="CV", help="C/V profile column")
+    convert.add_argument("--chunk-size", type=int, default=10_000)
+    convert.add_argument(
+        "--processes",
+        type=int,
+        default=1,
+        help="worker processes; 0 uses all CPUs (default: 1)",
+    )
+    convert.add_argument("--delimiter", default=",")
+    convert.add_argument("--mmap", action="store_true", help="read through mmap")
+    args = parser.parse_args(argv)
+    try:
+        derived = _parse_derived(args.add)
+    except argparse.ArgumentTypeError as error:
+        parser.error(str(error))
+    try:
+        written = convert_csv(
+            args.source,
+            args.target,
+            derived,
+            segments_col=args.segments,
+            cv_col=args.cv,
+            chunk_size=args.chunk_size,
+            processes=args.processes or None,
+            delimiter=args.delimiter,
+            use_mmap=args.mmap,
+        )
+    except (OSError, ValueError) as error:
+        parser.exit(1, f"{parser.prog}: error: {error}\n")
+    print(f"wrote {written} rows to {args.target}")
+    return 0
@@ -6,6 +6,9 @@ import logging
 from collections import Counter, defaultdict
 from collections.abc import Mapping, Sequence
 
+from loanpy.cache import ResultCache
+from loanpy.vocabulary import SegmentVocabulary
+
 
 def _is_alternating_language_sequence(
     table: Sequence[Mapping[str, str]],
@@ -53,6 +56,8 @@ def get_sound_correspondences(
     aligned_col: str,
     prefix_descendant: str = "",
     prefix_ancestor: str = "",
+    vocabulary: SegmentVocabulary | None = None,
+    cache: ResultCache | None = None,
 ) -> dict[str, dict]:
     """Extract segment correspondences from paired cognate alignment rows.
 
@@ -68,6 +73,15 @@ def get_sound_correspondences(
         Column with space-separated aligned segments (e.g. ``"Uralign"``).
     prefix_descendant, prefix_ancestor:
         Optional prefixes prepended to segment tokens in pair keys and examples.
+    vocabulary:
+        If given, (prefixed) segments are interned in this
+        :class:`~loanpy.vocabulary.SegmentVocabulary` and every segment and
+        pair key of the result is an id; examples stay strings.
+    cache:
+        If given, the result is looked up in this
+        :class:`~loanpy.cache.ResultCache` by a hash of the aligned and
+        ``Cognateset_ID`` values and the prefixes, and mined only on a miss.
+        Cannot be combined with ``vocabulary``, whose interning it would skip.
 
     Returns
     -------
@@ -96,6 +110,22 @@ def get_sound_correspondences(
       descendant/ancestor rows and an alignment column can be passed in; no
       hard-coded language names are required.
     """
+    if cache is not None:
+        if vocabulary is not None:
+            raise ValueError("cache cannot be combined with vocabulary")
+        return cache.call(
+            "get_sound_correspondences",
+            (
+                "\n".join(
+                    f"{row[aligned_col]}\t{row.get('Cognateset_ID')}" for row in table
+                ),
+                prefix_descendant,
+                prefix_ancestor,
+            ),
+            lambda: get_sound_correspondences(
+                table, aligned_col, prefix_descendant, prefix_ancestor
+            ),
+        )
     correspondences: dict[str, dict] = {
         key: defaultdict(list)
         for key in (
@@ -106,19 +136,39 @@ def get_sound_correspondences(
         )
     }
 
+    if vocabulary is not None:
+        # Interning memoised per raw token replaces the f-string per pair.
+        descendant_ids: dict[str, int] = {}
+        ancestor_ids: dict[str, int] = {}
     for index in range(0, len(table) - 1, 2):
         descendant_row, ancestor_row = table[index], table[index + 1]
         for descendant_seg, ancestor_seg in zip(
             descendant_row[aligned_col].split(),
             ancestor_row[aligned_col].split(),
         ):
+            if vocabulary is None:
+                pair_key = (
+                    f"{prefix_descendant}{descendant_seg}",
+                    f"{prefix_ancestor}{ancestor_seg}",
+                )
+            else:
+                if descendant_seg not in descendant_ids:
+                    descendant_ids[descendant_seg] = vocabulary.intern(
+                        f"{prefix_descendant}{descendant_seg}"
+                    )
+                if ancestor_seg not in ancestor_ids:
+                    ancestor_ids[ancestor_seg] = vocabulary.intern(
+                        f"{prefix_ancestor}{ancestor_seg}"
+                    )
+                pair_key = (
+                    descendant_ids[descendant_seg],
+                    ancestor_ids[ancestor_seg],
+                )
+                descendant_seg = vocabulary.intern(descendant_seg)
+                ancestor_seg = vocabulary.intern(ancestor_seg)
             correspondences["SoundCorrespondences"][descendant_seg].append(
                 ancestor_seg
             )
-            pair_key = (
-                f"{prefix_descendant}{descendant_seg}",
-                f"{prefix_ancestor}{ancestor_seg}",
-            )
             correspondences["AbsoluteFrequency"][pair_key].append(1)
             correspondences["Cognateset_IDs"][pair_key].append(
                 ancestor_row["Cognateset_ID"]
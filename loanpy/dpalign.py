@@ -0,0 +1,226 @@
+"""Score-maximising global alignment over compiled correspondence weights."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+
+from loanpy.scorer import Scorer
+
+_NEG = float("-inf")
+_DIAGONAL, _GAP_B, _GAP_A = 0, 1, 2
+
+
+class _Tables:
+    """Two score rows and a flat backpointer table, grown as pairs need."""
+
+    def __init__(self) -> None:
+        self.previous: list[float] = []
+        self.current: list[float] = []
+        self.moves = bytearray()
+
+    def fit(self, n: int, m: int) -> tuple[list[float], list[float], bytearray]:
+        """Buffers for an ``n × m`` problem; rows have a spare end cell."""
+        if len(self.previous) < m + 2:
+            self.previous = [_NEG] * (m + 2)
+            self.current = [_NEG] * (m + 2)
+        if len(self.moves) < (n + 1) * (m + 1):
+            self.moves = bytearray((n + 1) * (m + 1))
+        return self.previous, self.current, self.moves
+
+
+class DPAlign:
+    """Needleman–Wunsch alignment that maximises the ``get_score`` objective.
+
+    Unlike :meth:`~loanpy.uralign.Uralign.hu`, which places gaps only at the
+    word edges, gaps may open anywhere. Every column of the alignment is
+    weighted exactly as :meth:`~loanpy.scorer.Scorer.get_score` would weight
+    it: a match column ``(a, b)`` by the scorer cell, a gap column by the cell
+    of ``(a, "-")`` or ``("-", b)``. Gap columns are thus scored from mined
+    correspondences like any other pair, and unattested gaps cost ``-1000``.
+
+    Parameters
+    ----------
+    scorer:
+        Compiled :class:`~loanpy.scorer.Scorer`.
+    band:
+        Optional band half-width. Only cells whose diagonal offset lies
+        within ``band`` of the range spanned by the two lengths are filled,
+        reducing the work from ``n × m`` to about ``n × (2 × band + |n - m|)``.
+    gap:
+        Gap token, ``"-"`` as in the alignments mined by
+        :func:`~loanpy.correspondences.get_sound_correspondences`.
+
+    Examples
+    --------
+    The output has the same shape as :meth:`~loanpy.uralign.Uralign.hu`, so it
+    can be collapsed and scored unchanged::
+
+        aligner = DPAlign(scorer, band=2)
+        alm_d, alm_a = aligner.align(seg_d, seg_a)
+        alm_d, alm_a = Cluster.gaps(alm_d, alm_a)
+
+    Notes
+    -----
+    Ties prefer a match column, then a gap in ``seqB``, then a gap in
+    ``seqA``, so results are deterministic.
+
+    For all-pairs scans, :meth:`align_many_ids` takes pairs already encoded
+    with :meth:`~loanpy.scorer.Scorer.encode` and reuses one set of DP rows
+    and backpointers across the whole batch.
+    """
+
+    def __init__(self, scorer: Scorer, band: int | None = None, gap: str = "-") -> None:
+        if band is not None and band < 0:
+            raise ValueError("band must be non-negative")
+        self.scorer = scorer
+        self.band = band
+        self.gap = gap
+        self.gap_a = scorer.descendant_ids.get(gap, 0)
+        self.gap_b = scorer.ancestor_ids.get(gap, 0)
+
+    def _moves(
+        self, ids_a: Sequence[int], ids_b: Sequence[int], tables: _Tables
+    ) -> list[int]:
+        """Optimal column sequence as move codes, first column first.
+
+        Only two score rows are kept. Every cell the recurrence reads but the
+        current pair has not written, just outside the band, is reset to
+        ``-inf`` first, so ``tables`` may hold values from earlier pairs.
+        """
+        n, m = len(ids_a), len(ids_b)
+        weights = self.scorer.weights
+        gap_row = weights[self.gap_a]
+        gap_b = self.gap_b
+        if self.band is None:
+            low, high = -n, m
+        else:
+            low, high = min(0, m - n) - self.band, max(0, m - n) + self.band
+        previous, current, moves = tables.fit(n, m)
+        stride = m + 1
+
+        previous[0] = 0
+        top = min(m, high)
+        for j in range(1, top + 1):
+            previous[j] = previous[j - 1] + gap_row[ids_b[j - 1]]
+            moves[j] = _GAP_A
+        previous[top + 1] = _NEG
+        for i in range(1, n + 1):
+            row_a = weights[ids_a[i - 1]]
+            base = i * stride
+            first, last = max(1, i + low), min(m, i + high)
+            if 0 - i >= low:
+                current[0] = previous[0] + row_a[gap_b]
+                moves[base] = _GAP_B
+            else:
+                current[0] = _NEG
+            if first > 1:
+                current[first - 1] = _NEG
+            for j in range(first, last + 1):
+                b = ids_b[j - 1]
+                best, code = previous[j - 1] + row_a[b], _DIAGONAL
+                candidate = previous[j] + row_a[gap_b]
+                if candidate > best:
+                    best, code = candidate, _GAP_B
+                candidate = current[j - 1] + gap_row[b]
+                if candidate > best:
+                    best, code = candidate, _GAP_A
+                current[j] = best
+                moves[base + j] = code
+            current[last + 1] = _NEG
+            previous, current = current, previous
+
+        path = []
+        i, j = n, m
+        while i or j:
+            code = moves[i * stride + j]
+            path.append(code)
+            if code == _DIAGONAL:
+                i, j = i - 1, j - 1
+            elif code == _GAP_B:
+                i -= 1
+            else:
+                j -= 1
+        path.reverse()
+        return path
+
+    def align_ids(
+        self, ids_a: Sequence[int], ids_b: Sequence[int]
+    ) -> tuple[list[int], list[int]]:
+        """Align row and column ids from :meth:`~loanpy.scorer.Scorer.encode`.
+
+        Returns
+        -------
+        tuple[list[int], list[int]]
+            Aligned ids with the scorer's gap ids in gap columns, ready for
+            :meth:`~loanpy.scorer.Scorer.get_score`.
+        """
+        out_a, out_b = [], []
+        a, b = iter(ids_a), iter(ids_b)
+        for code in self._moves(ids_a, ids_b, _Tables()):
+            out_a.append(self.gap_a if code == _GAP_A else next(a))
+            out_b.append(self.gap_b if code == _GAP_B else next(b))
+        return out_a, out_b
+
+    def align(
+        self, seqA: Sequence[str], seqB: Sequence[str]
+    ) -> tuple[list[str], list[str]]:
+        """Align two segment lists; inputs are not modified.
+
+        Returns
+        -------
+        tuple[list[str], list[str]]
+            Aligned token lists with ``gap`` in gap columns.
+        """
+        out_a, out_b = [], []
+        a, b = iter(seqA), iter(seqB)
+        for code in self._moves(*self.scorer.encode(seqA, seqB), _Tables()):
+            out_a.append(self.gap if code == _GAP_A else next(a))
+            out_b.append(self.gap if code == _GAP_B else next(b))
+        return out_a, out_b
+
+    def align_many_ids(
+        self, pairs: Iterable[tuple[Sequence[int], Sequence[int]]]
+    ) -> list[tuple[list[int], list[int]]]:
+        """Align many encoded ``(ids_a, ids_b)`` pairs, in input order.
+
+        One set of score rows and backpointers is allocated for the whole
+        batch and grown only when a longer pair arrives, so an all-pairs scan
+        does not rebuild the dynamic-programming table per pair. Results equal
+        :meth:`align_ids` pair by pair.
+        """
+        tables = _Tables()
+        moves_of = self._moves
+        gap_a, gap_b = self.gap_a, self.gap_b
+        aligned = []
+        for ids_a, ids_b in pairs:
+            out_a, out_b = [], []
+            a, b = iter(ids_a), iter(ids_b)
+            for code in moves_of(ids_a, ids_b, tables):
+                out_a.append(gap_a if code == _GAP_A else next(a))
+                out_b.append(gap_b if code == _GAP_B else next(b))
+            aligned.append((out_a, out_b))
+        return aligned
+
+    def align_many(
+        self, pairs: Iterable[tuple[Sequence[str], Sequence[str]]]
+    ) -> list[tuple[list[str], list[str]]]:
+        """Align many ``(seqA, seqB)`` pairs, in input order.
+
+        As :meth:`align_many_ids`, with each pair encoded on the way in;
+        results equal :meth:`align` pair by pair.
+        """
+        tables = _Tables()
+        moves_of = self._moves
+        row, column = self.scorer.descendant_ids.get, self.scorer.ancestor_ids.get
+        gap = self.gap
+        aligned = []
+        for seqA, seqB in pairs:
+            ids_a = [row(segment, 0) for segment in seqA]
+            ids_b = [column(segment, 0) for segment in seqB]
+            out_a, out_b = [], []
+            a, b = iter(seqA), iter(seqB)
+            for code in moves_of(ids_a, ids_b, tables):
+                out_a.append(gap if code == _GAP_A else next(a))
+                out_b.append(gap if code == _GAP_B else next(b))
+            aligned.append((out_a, out_b))
+        return aligned
@@ -0,0 +1,310 @@
+"""Opt-in per-stage call counts and timings for the adapt and score path."""
+
+from __future__ import annotations
+
+import functools
+import importlib
+import json
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterable
+from typing import Any
+
+#: Instrumented by default: template search, edit-path construction,
+#: substitution and repair, alignment, scoring and the cached stages.
+TARGETS = (
+    "loanpy.phonotactics.get_closest_phonotactics",
+    "loanpy.edit.edit_distance_with2ops",
+    "loanpy.edit.edit_distance_matrix",
+    "loanpy.edit.shortest_edit_path",
+    "loanpy.edit.path_to_edit_operations",
+    "loanpy.edit.substitute_operations",
+    "loanpy.edit.apply_edit",
+    "loanpy.adapt.Adapt.substitute",
+    "loanpy.adapt.Adapt.repair",
+    "loanpy.uralign.Uralign.hu",
+    "loanpy.uralign.Uralign.hu_many",
+    "loanpy.uralign.Uralign.get_score",
+    "loanpy.scorer.Scorer.get_score",
+    "loanpy.scorer.Scorer.score",
+    "loanpy.blocking.BlockingIndex.candidates",
+    "loanpy.search.PreparedRecipients.scores",
+    "loanpy.search.LoanwordSearch.adapt_word",
+    "loanpy.cache.ResultCache.call",
+)
+
+_ACTIVE: Instrumentation | None = None
+_REGISTER = threading.Lock()
+
+
+def _resolve(target: str) -> tuple[Any, str, Any]:
+    """``(owner, attribute, raw value)`` for a dotted module or class path."""
+    parts = target.split(".")
+    for split in range(len(parts) - 1, 0, -1):
+        try:
+            owner = importlib.import_module(".".join(parts[:split]))
+        except ImportError:
+            continue
+        try:
+            for name in parts[split:-1]:
+                owner = getattr(owner, name)
+            raw = vars(owner)[parts[-1]]
+        except (AttributeError, KeyError):
+            break
+        return owner, parts[-1], raw
+    raise ValueError(f"cannot instrument {target!r}: not found")
+
+
+class _Counters(threading.local):
+    """Per-thread counters, so the hot path takes no lock."""
+
+    def __init__(self, registry: list[dict]) -> None:
+        self.stack: list[float] = []
+        self.functions: dict[str, list] = {}
+        self.caches: dict[str, list[int]] = {}
+        with _REGISTER:
+            registry.append(self.__dict__)
+
+
+class Instrumentation:
+    """Count calls and time the stages of adaptation and scoring.
+
+    While enabled, each target in :data:`TARGETS` (plus ``extra``) is
+    replaced by a wrapper that records its calls, total time and self time
+    (total minus time spent in other instrumented calls it made). Globals of
+    loanpy's own modules that are bound to a target function, such as
+    ``loanpy.apply_edit`` or the ``apply_edit`` imported by
+    :mod:`loanpy.adapt`, are rebound too; modules outside the package are
+    never touched. Disabling restores the original objects, so nothing is
+    wrapped and nothing is paid outside the ``with`` block.
+
+    Cache hit rates are read from the public counters of the repaired-profile
+    memo of :meth:`~loanpy.search.LoanwordSearch.adapt_word`
+    (:attr:`~loanpy.search.LoanwordSearch.profile_hits` and
+    :attr:`~loanpy.search.LoanwordSearch.profile_misses`) and of each stage
+    of a :class:`~loanpy.cache.ResultCache`
+    (:meth:`~loanpy.cache.ResultCache.stage_stats`).
+
+    Parameters
+    ----------
+    extra:
+        Further dotted paths to instrument, e.g.
+        ``"loanpy.cluster.Cluster.cv"``.
+
+    Examples
+    --------
+    ::
+
+        with Instrumentation() as stats:
+            results = list(search.search(donors, recipients))
+        print(stats.to_json(indent=2))
+
+    Notes
+    -----
+    Only one instance can be enabled at a time. Counting covers the calling
+    process and its threads; worker processes of
+    :class:`~loanpy.pipeline.LoanwordPipeline` or
+    :func:`~loanpy.significance.permutation_pvalues` are not seen, so
+    instrument with ``processes=1``. Functions imported into your own
+    modules, e.g. ``from loanpy import apply_edit``, or bound under another
+    name before enabling, e.g. ``score = Uralign.get_score``, are not
+    counted; call them through the package (``loanpy.apply_edit``) or the
+    class instead.
+    Each wrapped call costs roughly a microsecond, which inflates totals of
+    very cheap functions called millions of times.
+    """
+
+    def __init__(self, extra: Iterable[str] = ()) -> None:
+        self.targets = tuple(dict.fromkeys((*TARGETS, *extra)))
+        self._threads: list[dict] = []
+        self._counters = _Counters(self._threads)
+        self._patches: list[tuple[Any, str, Any]] = []
+        self._started: float | None = None
+        self._elapsed = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._patches)
+
+    def _timed(self, label: str, func: Callable) -> Callable:
+        counters = self._counters
+        clock = time.perf_counter
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            stack = counters.stack
+            stack.append(0.0)
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                inner = stack.pop()
+                if stack:
+                    stack[-1] += elapsed
+                record = counters.functions.get(label)
+                if record is None:
+                    record = counters.functions[label] = [0, 0.0, 0.0]
+                record[0] += 1
+                record[1] += elapsed
+                record[2] += elapsed - inner
+
+        return wrapper
+
+    def _count_cache(self, name: str, hits: int, misses: int) -> None:
+        if hits or misses:
+            record = self._counters.caches.setdefault(name, [0, 0])
+            record[0] += hits
+            record[1] += misses
+
+    def _wrap(self, label: str, func: Callable) -> Callable:
+        timed = self._timed(label, func)
+        if label == "LoanwordSearch.adapt_word":
+
+            @functools.wraps(func)
+            def adapt_word(search, segments, cv_profile):
+                hits, misses = search.profile_hits, search.profile_misses
+                result = timed(search, segments, cv_profile)
+                self._count_cache(
+                    "LoanwordSearch.repaired_profiles",
+                    search.profile_hits - hits,
+                    search.profile_misses - misses,
+                )
+                return result
+
+            return adapt_word
+        if label == "ResultCache.call":
+
+            @functools.wraps(func)
+            def call(cache, stage, key_parts, compute):
+                before = cache.stage_stats(stage)
+                result = timed(cache, stage, key_parts, compute)
+                after = cache.stage_stats(stage)
+                self._count_cache(
+                    f"ResultCache.{stage}",
+                    after["hits"] - before["hits"],
+                    after["misses"] - before["misses"],
+                )
+                return result
+
+            return call
+        return timed
+
+    def enable(self) -> Instrumentation:
+        """Install the wrappers; returns ``self``.
+
+        Raises
+        ------
+        RuntimeError
+            If this or another instance is already enabled.
+        """
+        global _ACTIVE
+        if _ACTIVE is not None:
+            raise RuntimeError("instrumentation is already enabled")
+        resolved = [_resolve(target) for target in self.targets]
+        _ACTIVE = self
+        functions = {}
+        for owner, name, raw in resolved:
+            func = raw.__func__ if isinstance(raw, (staticmethod, classmethod)) else raw
+            label = func.__qualname__
+            wrapper = self._wrap(label, func)
+            if isinstance(raw, (staticmethod, classmethod)):
+                wrapper = type(raw)(wrapper)
+            self._patches.append((owner, name, raw))
+            setattr(owner, name, wrapper)
+            if not isinstance(owner, type):
+                functions[id(raw)] = (raw, wrapper)
+        for module_name, module in list(sys.modules.items()):
+            if module_name != "loanpy" and not module_name.startswith("loanpy."):
+                continue
+            namespace = getattr(module, "__dict__", None)
+            if not isinstance(namespace, dict):
+                continue
+            for name, value in list(namespace.items()):
+                found = functions.get(id(value))
+                if found is not None and found[0] is value:
+                    self._patches.append((module, name, value))
+                    namespace[name] = found[1]
+        self._started = time.perf_counter()
+        return self
+
+    def disable(self) -> None:
+        """Restore every patched attribute; counters are kept."""
+        global _ACTIVE
+        if not self.enabled:
+            return
+        for owner, name, raw in reversed(self._patches):
+            setattr(owner, name, raw)
+        self._patches.clear()
+        self._elapsed += time.perf_counter() - self._started
+        self._started = None
+        _ACTIVE = None
+
+    def __enter__(self) -> Instrumentation:
+        return self.enable()
+
+    def __exit__(self, *exc_info) -> None:
+        self.disable()
+
+    def reset(self) -> None:
+        """Zero all counters."""
+        for counters in self._threads:
+            counters["functions"].clear()
+            counters["caches"].clear()
+        self._elapsed = 0.0
+        if self._started is not None:
+            self._started = time.perf_counter()
+
+    def to_dict(self) -> dict[str, Any]:
+        """Counters summed over threads.
+
+        Returns
+        -------
+        dict
+            ``elapsed_s`` (wall time while enabled), ``functions`` (label →
+            ``calls``, ``total_s``, ``self_s`` and ``mean_us``, slowest total
+            first) and ``caches`` (name → ``hits``, ``misses`` and
+            ``hit_rate``).
+        """
+        functions: dict[str, list] = {}
+        caches: dict[str, list[int]] = {}
+        for counters in list(self._threads):
+            for label, (calls, total, own) in list(counters["functions"].items()):
+                record = functions.setdefault(label, [0, 0.0, 0.0])
+                record[0] += calls
+                record[1] += total
+                record[2] += own
+            for name, (hits, misses) in list(counters["caches"].items()):
+                record = caches.setdefault(name, [0, 0])
+                record[0] += hits
+                record[1] += misses
+        elapsed = self._elapsed
+        if self._started is not None:
+            elapsed += time.perf_counter() - self._started
+        return {
+            "elapsed_s": elapsed,
+            "functions": {
+                label: {
+                    "calls": calls,
+                    "total_s": total,
+                    "self_s": own,
+                    "mean_us": 1e6 * total / calls,
+                }
+                for label, (calls, total, own) in sorted(
+                    functions.items(), key=lambda item: -item[1][1]
+                )
+            },
+            "caches": {
+                name: {
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_rate": hits / (hits + misses),
+                }
+                for name, (hits, misses) in sorted(caches.items())
+            },
+        }
+
+    def to_json(self, **kwargs) -> str:
+        """:meth:`to_dict` as JSON; keyword arguments go to :func:`json.dumps`."""
+        return json.dumps(self.to_dict(), **kwargs)
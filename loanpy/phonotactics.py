@@ -4,6 +4,7 @@ from __future__ import annotations
 
 from itertools import product
 
+from loanpy.cache import ResultCache
 from loanpy.edit import edit_distance_with2ops
 
 
@@ -40,7 +41,7 @@ def _expand_syllable_template(syllable: str) -> list[list[str]]:
     return variants
 
 
-def expand_phonotactics(formula: str) -> list[str]:
+def expand_phonotactics(formula: str, cache: ResultCache | None = None) -> list[str]:
     """Expand a prosodic formula into space-separated CV templates.
 
     ``(C)`` marks an optional consonant slot; bare ``C`` and ``V`` are required.
@@ -50,6 +51,9 @@ def expand_phonotactics(formula: str) -> list[str]:
     ----------
     formula:
         Prosodic string, e.g. ``"(C)V(C)+CV(C)+CV"``.
+    cache:
+        Optional :class:`~loanpy.cache.ResultCache`; the expansion of each
+        formula is computed once and then loaded.
 
     Returns
     -------
@@ -69,6 +73,10 @@ def expand_phonotactics(formula: str) -> list[str]:
     Inventories built this way feed :func:`get_closest_phonotactics` and
     :class:`~loanpy.adapt.Adapt`.
     """
+    if cache is not None:
+        return cache.call(
+            "expand_phonotactics", (formula,), lambda: expand_phonotactics(formula)
+        )
     syllables = [s.strip() for s in formula.split("+")]
     words = []
     for combo in product(*(_expand_syllable_template(s) for s in syllables)):
@@ -0,0 +1,220 @@
+"""End-to-end loanword detection over a process pool."""
+
+from __future__ import annotations
+
+import heapq
+import os
+from collections import deque
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any
+
+from loanpy.adapt import Adapt
+from loanpy.blocking import BlockingIndex
+from loanpy.scorer import Scorer
+from loanpy.search import LoanwordSearch, Word
+
+#: A deduplicated donor form: ``(segments, cv_profile)`` as tuples.
+Form = tuple[tuple[str, ...], tuple[str, ...]]
+
+_SEARCH: LoanwordSearch | None = None
+_RECIPIENTS: list = []
+_INDEX: BlockingIndex | None = None
+
+
+def _init_worker(search: LoanwordSearch, recipients: list) -> None:
+    global _SEARCH, _RECIPIENTS, _INDEX
+    _SEARCH, _RECIPIENTS = search, recipients
+    _INDEX = search.build_index(recipients)
+
+
+def _rank_forms(
+    forms: Sequence[Form],
+    search: LoanwordSearch | None = None,
+    recipients: list | None = None,
+    index: BlockingIndex | None = None,
+) -> list[list[tuple[int, int]]]:
+    """Adapt each form once and rank it: ``[(recipient_index, score), ...]``."""
+    if search is None:
+        search, recipients, index = _SEARCH, _RECIPIENTS, _INDEX
+    ranked = []
+    for segments, cv_profile in forms:
+        segments, cv_profile = search.adapt_word(segments, cv_profile)
+        ranked.append(search.rank(segments, cv_profile, recipients, index))
+    return ranked
+
+
+class LoanwordPipeline:
+    """Substitute, repair, align and score donor words in parallel.
+
+    Packages the adapt → :meth:`~loanpy.uralign.Uralign.hu` →
+    :meth:`~loanpy.uralign.Uralign.get_score` script loop: donors are read in
+    chunks of ``donor_chunk_size``, identical donor forms are collapsed so
+    each is adapted and ranked once, and the distinct forms of every chunk
+    are handed to a process pool running a
+    :class:`~loanpy.search.LoanwordSearch`. Results are streamed in donor
+    order whatever the number of processes.
+
+    Parameters
+    ----------
+    correspondences:
+        ``AbsoluteFrequency`` mapping from
+        :func:`~loanpy.correspondences.get_sound_correspondences`, or a
+        compiled :class:`~loanpy.scorer.Scorer`.
+    adapt:
+        :class:`~loanpy.adapt.Adapt` with :attr:`substitutions` set, e.g.
+        by :meth:`~loanpy.adapt.Adapt.get_substitutions`.
+    phonotactic_inventory:
+        Recipient CV templates for :meth:`~loanpy.adapt.Adapt.repair`.
+    processes:
+        Worker processes; ``1`` runs in-process and ``None`` uses all CPUs.
+    donor_chunk_size:
+        Donor words per task sent to a worker.
+    **search_options:
+        Further :class:`~loanpy.search.LoanwordSearch` parameters: ``k``,
+        ``freq_filter``, ``min_score``, ``initial_gap``, ``final_gap``,
+        ``chunk_size``, ``blocking`` and ``max_length_diff``.
+
+    Examples
+    --------
+    ::
+
+        adapt = Adapt()
+        adapt.get_substitutions(donor_inventory, recipient_inventory, dist, {})
+        pipeline = LoanwordPipeline(
+            stats["AbsoluteFrequency"], adapt, templates, processes=8, k=5
+        )
+        for donor_id, matches in pipeline.run(donors, recipients):
+            ...
+
+    Notes
+    -----
+    Each worker receives the search configuration and the recipients once,
+    through the pool initializer, and builds its own blocking index. At most
+    two chunks per worker are in flight, and only the ranked matches of
+    distinct donor forms are kept, so memory grows with the number of
+    distinct forms times ``k`` rather than with the donor list.
+    """
+
+    def __init__(
+        self,
+        correspondences: Scorer | Mapping[tuple[str, str], float],
+        adapt: Adapt | None = None,
+        phonotactic_inventory: list[str] | None = None,
+        processes: int | None = 1,
+        donor_chunk_size: int = 100,
+        **search_options: Any,
+    ) -> None:
+        if donor_chunk_size < 1:
+            raise ValueError("donor_chunk_size must be at least 1")
+        self.search = LoanwordSearch(
+            correspondences, adapt, phonotactic_inventory, **search_options
+        )
+        self.processes = processes
+        self.donor_chunk_size = donor_chunk_size
+
+    def _batches(
+        self, donors: Iterable[Word]
+    ) -> Iterator[tuple[list[tuple[Any, Form]], list[Form]]]:
+        """Yield ``(donor_id, form)`` entries and the forms not seen before."""
+        donors = iter(donors)
+        seen: set[Form] = set()
+        while batch := list(islice(donors, self.donor_chunk_size)):
+            entries, forms = [], []
+            for donor_id, segments, cv_profile in batch:
+                form = (tuple(segments), tuple(cv_profile))
+                entries.append((donor_id, form))
+                if form not in seen:
+                    seen.add(form)
+                    forms.append(form)
+            yield entries, forms
+
+    def _ranked_batches(
+        self, donors: Iterable[Word], recipients: list
+    ) -> Iterator[tuple[list[tuple[Any, Form]], dict[Form, list]]]:
+        """Yield each donor batch with the rankings of all forms seen so far."""
+        ranked: dict[Form, list] = {}
+        batches = self._batches(donors)
+        if self.processes == 1:
+            index = self.search.build_index(recipients)
+            for entries, forms in batches:
+                ranked.update(
+                    zip(forms, _rank_forms(forms, self.search, recipients, index))
+                )
+                yield entries, ranked
+            return
+        workers = self.processes or os.cpu_count() or 1
+        with ProcessPoolExecutor(
+            workers, initializer=_init_worker, initargs=(self.search, recipients)
+        ) as executor:
+            pending: deque = deque()
+            for entries, forms in batches:
+                pending.append((entries, forms, executor.submit(_rank_forms, forms)))
+                if len(pending) < 2 * workers:
+                    continue
+                entries, forms, future = pending.popleft()
+                ranked.update(zip(forms, future.result()))
+                yield entries, ranked
+            while pending:
+                entries, forms, future = pending.popleft()
+                ranked.update(zip(forms, future.result()))
+                yield entries, ranked
+
+    def run(
+        self, donors: Iterable[Word], recipients: Iterable[Word]
+    ) -> Iterator[tuple[Any, list[tuple[Any, int]]]]:
+        """Stream the top-``k`` recipient matches for each donor word.
+
+        Same output as :meth:`~loanpy.search.LoanwordSearch.search`.
+
+        Parameters
+        ----------
+        donors:
+            ``(word_id, segments, cv_profile)`` donor words; read lazily,
+            ``donor_chunk_size`` at a time.
+        recipients:
+            Recipient words; read once up front.
+
+        Yields
+        ------
+        tuple
+            ``(donor_id, [(recipient_id, score), ...])`` in donor order, with
+            matches sorted by descending score and, on ties, recipient order.
+        """
+        recipient_ids, words = self.search.prepare(recipients)
+        for entries, ranked in self._ranked_batches(donors, words):
+            for donor_id, form in entries:
+                yield donor_id, [
+                    (recipient_ids[recipient_index], score)
+                    for recipient_index, score in ranked[form]
+                ]
+
+    def run_global(
+        self, donors: Iterable[Word], recipients: Iterable[Word]
+    ) -> list[tuple[Any, Any, int]]:
+        """Return the overall top-``k`` donor/recipient pairs.
+
+        Same output as :meth:`~loanpy.search.LoanwordSearch.search_global`:
+        ``(donor_id, recipient_id, score)`` sorted by descending score and, on
+        ties, donor then recipient order. The overall best ``k`` are always
+        among the per-donor best ``k``, which are merged here.
+        """
+        recipient_ids, words = self.search.prepare(recipients)
+        k = self.search.k
+        donor_ids = []
+        heap: list[tuple[int, int, int]] = []
+        for entries, ranked in self._ranked_batches(donors, words):
+            for donor_id, form in entries:
+                negative_donor = -len(donor_ids)
+                donor_ids.append(donor_id)
+                for recipient_index, score in ranked[form]:
+                    entry = (score, negative_donor, -recipient_index)
+                    if len(heap) < k:
+                        heapq.heappush(heap, entry)
+                    elif entry > heap[0]:
+                        heapq.heapreplace(heap, entry)
+        return [
+            (donor_ids[-negative_donor], recipient_ids[-negative_index], score)
+            for score, negative_donor, negative_index in sorted(heap, reverse=True)
+        ]
@@ -0,0 +1,219 @@
+"""Column-projecting CSV readers for large CLDF tables."""
+
+from __future__ import annotations
+
+import codecs
+import csv
+import mmap
+from collections.abc import Iterable, Iterator, Sequence
+from itertools import islice, repeat
+from operator import itemgetter, length_hint
+from os import PathLike
+
+#: Bytes decoded per step when reading through :mod:`mmap`.
+MMAP_BLOCK = 1 << 22
+
+
+def _mmap_lines(path: str | PathLike, encoding: str) -> Iterator[str]:
+    """Yield decoded lines (with line endings) from a memory-mapped file."""
+    with open(path, "rb") as file:
+        try:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            return
+        with mapped:
+            decoder = codecs.getincrementaldecoder(encoding)()
+            pending = ""
+            for start in range(0, len(mapped), MMAP_BLOCK):
+                text = pending + decoder.decode(mapped[start : start + MMAP_BLOCK])
+                # Split on "\n" only: str.splitlines would also break at
+                # characters such as U+2028 that may occur inside fields.
+                *lines, pending = text.split("\n")
+                for line in lines:
+                    yield line + "\n"
+            pending += decoder.decode(b"", final=True)
+            if pending:
+                yield pending
+
+
+def _split_chunks(
+    lines: Iterable[str], delimiter: str, chunk_size: int
+) -> Iterator[list[list[str]]]:
+    """Split CSV lines into field lists, about ``chunk_size`` records at a time.
+
+    The first chunk holds only the header. Chunks without a quote character
+    are split with :meth:`str.split`, about twice as fast as :mod:`csv`; the
+    others go through one persistent :func:`csv.reader`, which may read past
+    the chunk to finish a quoted field spanning several lines. Blank lines
+    become empty lists.
+    """
+    lines = iter(lines)
+    current: list[Iterator[str]] = [iter(())]
+
+    def source() -> Iterator[str]:
+        while True:
+            line = next(current[0], None)
+            if line is None:
+                line = next(lines, None)
+                if line is None:
+                    return
+            yield line
+
+    reader = csv.reader(source(), delimiter=delimiter)
+    header = next(reader, None)
+    if header is None:
+        return
+    yield [header]
+    while chunk := list(islice(lines, chunk_size)):
+        if '"' not in "".join(chunk):
+            stripped = map(str.rstrip, chunk, repeat("\r\n"))
+            rows = list(map(str.split, stripped, repeat(delimiter)))
+            if [""] in rows:
+                rows = [row if row != [""] else [] for row in rows]
+        else:
+            current[0] = remaining = iter(chunk)
+            rows = []
+            # Each record takes at least one line, so this never stalls.
+            while count := length_hint(remaining):
+                rows.extend(islice(reader, count))
+        yield rows
+
+
+def iter_chunks(
+    path: str | PathLike,
+    columns: Sequence[str],
+    chunk_size: int = 10_000,
+    use_mmap: bool = False,
+    delimiter: str = ",",
+    encoding: str = "utf-8-sig",
+) -> Iterator[list[tuple[str, ...]]]:
+    """Stream a CSV file as chunks of projected row tuples.
+
+    Only the requested ``columns`` are kept, in the order given. Lines
+    without quotes are split with :meth:`str.split` and every chunk is
+    projected with one :func:`operator.itemgetter` ``map``, so no per-row
+    dict is built; quoted fields, including multi-line ones, are parsed by
+    :func:`csv.reader`.
+
+    Parameters
+    ----------
+    path:
+        CSV file with a header row.
+    columns:
+        Header names to keep.
+    chunk_size:
+        Rows per yielded list.
+    use_mmap:
+        Read the file through :mod:`mmap` instead of buffered I/O, decoding it
+        block by block.
+    delimiter:
+        Field delimiter.
+    encoding:
+        Text encoding; the default also strips a UTF-8 byte-order mark.
+
+    Yields
+    ------
+    list[tuple[str, ...]]
+        Up to ``chunk_size`` row tuples. Blank lines are skipped and missing
+        trailing fields read as ``""``.
+
+    Raises
+    ------
+    ValueError
+        If ``columns`` is empty or a column is not in the header.
+
+    Examples
+    --------
+    ::
+
+        for chunk in iter_chunks("cognates.csv", ["Language_ID", "Uralign"]):
+            for language, alignment in chunk:
+                ...
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    if not columns:
+        raise ValueError("at least one column is required")
+    if use_mmap:
+        lines: Iterable[str] = _mmap_lines(path, encoding)
+        file = None
+    else:
+        file = open(path, encoding=encoding, newline="")
+        lines = file
+    try:
+        chunks = _split_chunks(lines, delimiter, chunk_size)
+        header = next(chunks, [[]])[0]
+        missing = [name for name in columns if name not in header]
+        if missing:
+            raise ValueError(f"columns not in header: {', '.join(missing)}")
+        indices = [header.index(name) for name in columns]
+        width = max(indices) + 1
+        if len(indices) == 1:
+            (index,) = indices
+
+            def project(row: list[str]) -> tuple[str]:
+                return (row[index],)
+
+        else:
+            project = itemgetter(*indices)
+        for chunk in chunks:
+            if [] not in chunk:
+                try:
+                    yield list(map(project, chunk))
+                    continue
+                except IndexError:
+                    pass
+            yield [
+                project(row + [""] * (width - len(row)))
+                for row in chunk
+                if row
+            ]
+    finally:
+        if file is not None:
+            file.close()
+
+
+def iter_rows(
+    path: str | PathLike,
+    columns: Sequence[str],
+    chunk_size: int = 10_000,
+    use_mmap: bool = False,
+    delimiter: str = ",",
+    encoding: str = "utf-8-sig",
+) -> Iterator[tuple[str, ...]]:
+    """Stream projected row tuples one at a time; see :func:`iter_chunks`."""
+    for chunk in iter_chunks(
+        path, columns, chunk_size, use_mmap, delimiter, encoding
+    ):
+        yield from chunk
+
+
+def read_table(
+    path: str | PathLike,
+    columns: Sequence[str],
+    use_mmap: bool = False,
+    delimiter: str = ",",
+    encoding: str = "utf-8-sig",
+) -> list[dict[str, str]]:
+    """Load a CSV file as row dicts holding only ``columns``.
+
+    A lean drop-in for ``list(csv.DictReader(file))`` where the rows are
+    passed to :func:`~loanpy.correspondences.get_sound_correspondences` or
+    :func:`~loanpy.evaluation.get_held_out_scores`.
+
+    Examples
+    --------
+    ::
+
+        rows = read_table(
+            "cognates.csv", ["Language_ID", "Cognateset_ID", "Uralign"]
+        )
+        stats = get_sound_correspondences(rows, "Uralign")
+    """
+    columns = list(columns)
+    return [
+        dict(zip(columns, row))
+        for row in iter_rows(
+            path, columns, use_mmap=use_mmap, delimiter=delimiter, encoding=encoding
+        )
+    ]
@@ -0,0 +1,160 @@
+"""Compiled, integer-indexed correspondence scorer."""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable, Mapping, Sequence
+from itertools import repeat
+from operator import getitem
+
+from loanpy.uralign import PRUNED
+
+PENALTY = -1000
+
+
+class Scorer:
+    """Dense weight matrix compiled from an ``AbsoluteFrequency`` mapping.
+
+    Descendant and ancestor segments are interned to integer ids that index
+    the rows and columns of :attr:`weights`. Each cell holds the weight
+    :meth:`~loanpy.uralign.Uralign.get_score` would add for that pair, with
+    ``freq_filter`` and the ``-1000`` penalty already applied, so scoring an
+    encoded alignment is array indexing plus a sum. Id ``0`` on both axes is
+    reserved for segments the scorer has never seen.
+
+    Parameters
+    ----------
+    absolute_frequency:
+        Mapping from ``(desc, anc)`` to a weight, usually
+        ``get_sound_correspondences(...)["AbsoluteFrequency"]``.
+    freq_filter:
+        Minimum weight for a pair to count positively.
+
+    Examples
+    --------
+    Compile once, then score many alignments::
+
+        scorer = Scorer(stats["AbsoluteFrequency"], freq_filter=2)
+        ids_d, ids_a = scorer.encode(alm_d, alm_a)
+        score = scorer.get_score(ids_d, ids_a)
+
+    String alignments are scored with one lookup per position::
+
+        scores = [scorer.score(alm_d, alm_a) for alm_d, alm_a in alignments]
+
+    :attr:`flat_weights` holds the same matrix as one row-major list, for
+    callers such as :class:`~loanpy.search.LoanwordSearch` that encode each
+    word into row or column offsets once and add them per pair.
+
+    Notes
+    -----
+    Results equal ``Uralign.get_score(seqA, seqB, absolute_frequency,
+    freq_filter)``. Integer weights are stored in ``array("q")`` rows; any
+    other numbers are kept as-is in lists so that sums stay bit-identical.
+
+    There is no batch API over ragged or padded alignment buffers: building
+    the buffer costs one lookup per position, the same as :meth:`score`, so
+    encoding plus a batched sum was slower end to end than scoring each pair.
+    """
+
+    def __init__(
+        self,
+        absolute_frequency: Mapping[tuple[str, str], float],
+        freq_filter: int = 2,
+    ) -> None:
+        self.freq_filter = freq_filter
+        self.descendants: list[str] = [""]
+        self.ancestors: list[str] = [""]
+        self.descendant_ids: dict[str, int] = {}
+        self.ancestor_ids: dict[str, int] = {}
+        for desc, anc in absolute_frequency:
+            if desc not in self.descendant_ids:
+                self.descendant_ids[desc] = len(self.descendants)
+                self.descendants.append(desc)
+            if anc not in self.ancestor_ids:
+                self.ancestor_ids[anc] = len(self.ancestors)
+                self.ancestors.append(anc)
+
+        n_ancestors = len(self.ancestors)
+        values = list(absolute_frequency.values())
+        if all(type(value) is int for value in values):
+            row = array("q", [PENALTY]) * n_ancestors
+        else:
+            row = [PENALTY] * n_ancestors
+        self.weights: list[Sequence] = [row[:] for _ in self.descendants]
+        self.max_weight = PENALTY
+        for (desc, anc), value in zip(absolute_frequency, values):
+            if value >= freq_filter:
+                self.weights[self.descendant_ids[desc]][self.ancestor_ids[anc]] = value
+                self.max_weight = max(self.max_weight, value)
+        self._integral = isinstance(row, array)
+        self.flat_weights = [value for row in self.weights for value in row]
+        self._index_pairs()
+
+    def _index_pairs(self) -> None:
+        """Map every pair with a non-penalty weight straight to its weight.
+
+        All other pairs, unattested, below ``freq_filter`` or with an unknown
+        segment, fall back to the penalty, so :meth:`score` needs one lookup
+        per position.
+        """
+        self._pair_weights: dict[tuple[str, str], float] = {
+            (desc, anc): self.weights[row][column]
+            for desc, row in self.descendant_ids.items()
+            for anc, column in self.ancestor_ids.items()
+            if self.weights[row][column] != PENALTY
+        }
+
+    def encode(
+        self, seqA: Iterable[str], seqB: Iterable[str]
+    ) -> tuple[list[int], list[int]]:
+        """Map aligned descendant and ancestor tokens to row and column ids."""
+        return (
+            [self.descendant_ids.get(seg, 0) for seg in seqA],
+            [self.ancestor_ids.get(seg, 0) for seg in seqB],
+        )
+
+    def get_score(
+        self,
+        ids_a: Sequence[int],
+        ids_b: Sequence[int],
+        min_score: float | None = None,
+    ) -> int | float:
+        """Sum the weights of an encoded alignment.
+
+        Parameters
+        ----------
+        ids_a, ids_b:
+            Parallel row and column ids from :meth:`encode`. As with ``zip``,
+            the longer sequence is truncated.
+        min_score:
+            Optional threshold; as in :meth:`~loanpy.uralign.Uralign.get_score`,
+            scoring stops once :attr:`max_weight` per remaining position can no
+            longer reach it.
+
+        Returns
+        -------
+        int or float
+            Aggregate alignment score, a float if the weights are floats. If
+            ``min_score`` is given and cannot be reached, the sentinel
+            :data:`~loanpy.uralign.PRUNED` (``float("-inf")``) instead; test
+            for it with ``score == PRUNED`` or ``score < min_score``.
+        """
+        weights = map(getitem, map(self.weights.__getitem__, ids_a), ids_b)
+        if min_score is None:
+            return sum(weights)
+        best_step = max(self.max_weight, PENALTY)
+        remaining = min(len(ids_a), len(ids_b))
+        if remaining * best_step < min_score:
+            return PRUNED
+        score = 0
+        for weight in weights:
+            score += weight
+            remaining -= 1
+            if score + remaining * best_step < min_score:
+                return PRUNED
+        return score
+
+    def score(self, seqA: Iterable[str], seqB: Iterable[str]) -> int | float:
+        """Score a string alignment with one lookup per aligned pair."""
+        return sum(map(self._pair_weights.get, zip(seqA, seqB), repeat(PENALTY)))
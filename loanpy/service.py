@@ -0,0 +1,384 @@
+"""Local asyncio scoring service that coalesces concurrent requests."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections import deque
+from collections.abc import Iterable, Sequence
+from http import HTTPStatus
+from statistics import mean, quantiles
+from typing import Any
+
+from loanpy.search import LoanwordSearch, Word
+
+#: A donor form as the service keys it: ``(segments, cv_profile)`` tuples.
+Form = tuple[tuple[str, ...], tuple[str, ...]]
+
+
+def _form(segments: Sequence[str], cv_profile: Sequence[str]) -> Form:
+    """Validated, hashable key of one donor form.
+
+    Raises
+    ------
+    ValueError
+        If ``segments`` or ``cv_profile`` is not a list of strings, or
+        their lengths differ.
+    """
+    form = []
+    for name, value in (("segments", segments), ("cv_profile", cv_profile)):
+        if isinstance(value, (str, bytes)) or not isinstance(value, Sequence):
+            raise ValueError(f"{name} must be a list of strings")
+        value = tuple(value)
+        if not all(isinstance(item, str) for item in value):
+            raise ValueError(f"{name} must be a list of strings")
+        form.append(value)
+    if len(form[0]) != len(form[1]):
+        raise ValueError(
+            f"segments and cv_profile differ in length: "
+            f"{len(form[0])} != {len(form[1])}"
+        )
+    return form[0], form[1]
+
+
+class ScoringService:
+    """Serve "score this donor form against the lexicon" over HTTP.
+
+    The recipient lexicon is prepared with
+    :meth:`~loanpy.search.LoanwordSearch.prepare`, and the optional blocking
+    index built, once at construction; the compiled scorer and
+    :class:`~loanpy.adapt.Adapt` live in ``search``. Concurrent requests are
+    queued and coalesced into groups of up to ``max_batch`` forms, waiting at
+    most ``max_delay`` seconds for a group to fill. Each group is handed to a
+    worker thread in one call, so the event loop keeps accepting requests
+    meanwhile, and there each distinct form is adapted and ranked once.
+
+    Parameters
+    ----------
+    search:
+        Configured :class:`~loanpy.search.LoanwordSearch`; its ``k``,
+        ``min_score`` and ``blocking`` settings apply to every request.
+    recipients:
+        ``(word_id, segments, cv_profile)`` lexicon entries. Word ids must be
+        JSON-serialisable to be returned over HTTP.
+    max_batch:
+        Largest number of requests scored together.
+    max_delay:
+        Seconds a batch waits for more requests after the first arrives.
+    latency_window:
+        Number of recent request latencies kept for :meth:`stats`.
+
+    Examples
+    --------
+    Serve on a local port::
+
+        service = ScoringService(LoanwordSearch(freq, adapt, templates), lexicon)
+        asyncio.run(service.serve_forever(port=8765))
+
+    then, from any tool::
+
+        curl -d '{"segments": "k a t", "cv_profile": "CVC"}' localhost:8765/score
+
+    Notes
+    -----
+    Endpoints:
+
+    * ``POST /score`` — body ``{"segments": [...], "cv_profile": [...]}``
+      (lists, or strings such as ``"k a t"`` and ``"CVC"``); answers
+      ``{"matches": [[recipient_id, score], ...]}`` ranked as in
+      :meth:`~loanpy.search.LoanwordSearch.search`. Bodies that are not
+      two equally long lists of strings get 400; a failure while scoring
+      gets 500 and counts as an error.
+    * ``GET /stats`` — the counters of :meth:`stats`.
+
+    Connections are kept alive between requests unless the client sends
+    ``Connection: close``.
+
+    This is request coalescing, not batched scoring: every distinct form of
+    a group is still ranked on its own with
+    :meth:`~loanpy.search.LoanwordSearch.rank`, which already scores the
+    whole lexicon per call. Scoring one long vector for a whole group was
+    measured slower than that. Coalescing saves the per-request thread
+    hand-off and the work on repeated forms, not scorer calls.
+    """
+
+    def __init__(
+        self,
+        search: LoanwordSearch,
+        recipients: Iterable[Word],
+        max_batch: int = 32,
+        max_delay: float = 0.002,
+        latency_window: int = 1024,
+    ) -> None:
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+        self.search = search
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._recipient_ids, self._words = search.prepare(recipients)
+        self._index = search.build_index(self._words)
+        self._queue: asyncio.Queue | None = None
+        self._batcher: asyncio.Task | None = None
+        self._started = time.monotonic()
+        self._requests = 0
+        self._errors = 0
+        self._batches = 0
+        self._batched = 0
+        self._busy = 0.0
+        self._latencies: deque[float] = deque(maxlen=latency_window)
+
+    def _rank_each(self, forms: Sequence[Form]) -> dict[Form, list[tuple[Any, int]]]:
+        """Adapt and rank distinct forms one by one; runs in a worker thread."""
+        search, ids = self.search, self._recipient_ids
+        ranked = {}
+        for form in forms:
+            segments, cv_profile = search.adapt_word(*form)
+            ranked[form] = [
+                (ids[recipient_index], score)
+                for recipient_index, score in search.rank(
+                    segments, cv_profile, self._words, self._index
+                )
+            ]
+        return ranked
+
+    async def _run_batches(self) -> None:
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            try:
+                await self._run_batch(loop, queue, batch)
+            except asyncio.CancelledError:  # taken off the queue, never answered
+                for _, future in batch:
+                    future.cancel()
+                raise
+
+    async def _run_batch(
+        self, loop: asyncio.AbstractEventLoop, queue: asyncio.Queue, batch: list
+    ) -> None:
+        """Fill ``batch`` from ``queue`` for up to ``max_delay``, then answer it."""
+        deadline = loop.time() + self.max_delay
+        while len(batch) < self.max_batch:
+            if not queue.empty():
+                batch.append(queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        start = time.perf_counter()
+        try:
+            forms = list(dict.fromkeys(form for form, _ in batch))
+            ranked = await loop.run_in_executor(None, self._rank_each, forms)
+            results = [ranked[form] for form, _ in batch]
+        except Exception as error:  # reported to every waiting request
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        finally:
+            self._busy += time.perf_counter() - start
+            self._batches += 1
+            self._batched += len(batch)
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def _ensure_batcher(self) -> None:
+        """Start, or restart, the batching task on the one request queue.
+
+        The queue is only replaced by :meth:`close`, after it has cancelled
+        every request left in it, so a restarted task still answers requests
+        queued before its predecessor stopped.
+        """
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._batcher is None or self._batcher.done():
+            self._batcher = asyncio.get_running_loop().create_task(
+                self._run_batches()
+            )
+
+    async def score(
+        self, segments: Sequence[str], cv_profile: Sequence[str]
+    ) -> list[tuple[Any, int]]:
+        """Rank the lexicon against one donor form, batched with concurrent calls.
+
+        Returns
+        -------
+        list[tuple]
+            ``(recipient_id, score)`` pairs, best first.
+
+        Raises
+        ------
+        ValueError
+            If the form is not two equally long lists of strings.
+        """
+        form = _form(segments, cv_profile)
+        self._ensure_batcher()
+        start = time.perf_counter()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((form, future))
+        try:
+            return await future
+        except Exception:
+            self._errors += 1
+            raise
+        finally:
+            self._requests += 1
+            self._latencies.append(time.perf_counter() - start)
+
+    def stats(self) -> dict[str, Any]:
+        """Throughput and latency counters.
+
+        Returns
+        -------
+        dict
+            ``requests``, ``errors``, ``batches``, ``mean_batch_size``,
+            ``uptime_s``, ``busy_s`` (time spent scoring), ``requests_per_s``
+            over the uptime and ``latency_ms`` (``mean``, ``p50``, ``p95``
+            and ``max`` over the last ``latency_window`` requests).
+        """
+        uptime = time.monotonic() - self._started
+        latencies = [1000 * latency for latency in self._latencies]
+        if len(latencies) > 1:
+            cuts = quantiles(latencies, n=20, method="inclusive")
+            p50, p95 = cuts[9], cuts[18]
+        else:
+            p50 = p95 = latencies[0] if latencies else 0.0
+        return {
+            "requests": self._requests,
+            "errors": self._errors,
+            "batches": self._batches,
+            "mean_batch_size": self._batched / self._batches if self._batches else 0,
+            "uptime_s": uptime,
+            "busy_s": self._busy,
+            "requests_per_s": self._requests / uptime if uptime else 0.0,
+            "latency_ms": {
+                "mean": mean(latencies) if latencies else 0.0,
+                "p50": p50,
+                "p95": p95,
+                "max": max(latencies, default=0.0),
+            },
+        }
+
+    async def _dispatch(self, method: str, path: str, body: bytes) -> tuple[int, Any]:
+        if path == "/stats":
+            if method != "GET":
+                return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "use GET"}
+            return HTTPStatus.OK, self.stats()
+        if path != "/score":
+            return HTTPStatus.NOT_FOUND, {"error": f"no endpoint {path}"}
+        if method != "POST":
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "use POST"}
+        try:
+            request = json.loads(body)
+            segments, cv_profile = request["segments"], request["cv_profile"]
+        except (ValueError, TypeError, KeyError) as error:
+            return HTTPStatus.BAD_REQUEST, {"error": f"bad request body: {error}"}
+        if isinstance(segments, str):
+            segments = segments.split()
+        if isinstance(cv_profile, str):
+            cv_profile = list("".join(cv_profile.split()))
+        try:
+            _form(segments, cv_profile)
+        except ValueError as error:
+            return HTTPStatus.BAD_REQUEST, {"error": f"bad request body: {error}"}
+        try:
+            matches = await self.score(segments, cv_profile)
+        except Exception as error:  # already counted by score
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": repr(error)}
+        return HTTPStatus.OK, {"matches": matches}
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Answer HTTP/1.1 requests on one connection until it closes."""
+        try:
+            while request_line := await reader.readline():
+                headers = {}
+                while (line := await reader.readline()).strip():
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                    body = await reader.readexactly(
+                        int(headers.get("content-length", 0))
+                    )
+                except ValueError:
+                    status, payload = HTTPStatus.BAD_REQUEST, {"error": "bad request"}
+                    version, keep_alive = "HTTP/1.0", False
+                else:
+                    try:
+                        status, payload = await self._dispatch(
+                            method, target.partition("?")[0], body
+                        )
+                    except Exception as error:
+                        self._errors += 1
+                        status = HTTPStatus.INTERNAL_SERVER_ERROR
+                        payload = {"error": repr(error)}
+                    keep_alive = (
+                        version == "HTTP/1.1"
+                        and headers.get("connection", "").lower() != "close"
+                    )
+                data = json.dumps(payload).encode()
+                writer.write(
+                    (
+                        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                        "Content-Type: application/json\r\n"
+                        f"Content-Length: {len(data)}\r\n"
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+                        "\r\n"
+                    ).encode("latin-1")
+                    + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(
+        self, host: str = "127.0.0.1", port: int = 0, path: str | None = None
+    ) -> asyncio.AbstractServer:
+        """Start listening on ``host:port``, or on the Unix socket ``path``.
+
+        ``port=0`` picks a free port; read it from
+        ``server.sockets[0].getsockname()``. Close the returned server and
+        call :meth:`close` to stop.
+        """
+        self._ensure_batcher()
+        if path is not None:
+            return await asyncio.start_unix_server(self._handle, path)
+        return await asyncio.start_server(self._handle, host, port)
+
+    async def serve_forever(
+        self, host: str = "127.0.0.1", port: int = 8765, path: str | None = None
+    ) -> None:
+        """Run :meth:`start` and serve until cancelled."""
+        server = await self.start(host, port, path)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        """Stop the batching task; queued and unanswered requests are cancelled."""
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+            self._batcher = None
+        while self._queue is not None and not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            future.cancel()
+        # The next request may come from another event loop.
+        self._queue = None
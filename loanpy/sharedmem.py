@@ -0,0 +1,271 @@
+"""Publish compiled scorers and encoded wordlists in shared memory.
+
+When loanword scoring fans out over many worker processes, each worker would
+otherwise unpickle its own copy of the scorer and both wordlists. The classes
+here write them once into :mod:`multiprocessing.shared_memory` blocks that
+workers attach to by name; attached objects are zero-copy views, so memory per
+worker stays near-constant.
+
+Block layout: an 8-byte length, a small pickled header (string tables and the
+position of every array), then the arrays themselves, 8-byte aligned.
+
+Examples
+--------
+::
+
+    with SharedScorer.publish(scorer) as shared:
+        with Pool(32, initializer=init_worker, initargs=(shared.name,)) as pool:
+            ...
+
+    def init_worker(name):
+        global SHARED, SCORER
+        SHARED = SharedScorer.attach(name)
+        atexit.register(SHARED.close)
+        SCORER = SHARED.scorer
+
+Keep the attached handle for as long as its views are used, and close it
+when done. A dropped handle, as in ``SharedScorer.attach(name).scorer``,
+leaves views exported that nothing can release, so the block can never be
+closed and garbage collection reports a ``BufferError``.
+"""
+
+from __future__ import annotations
+
+import atexit
+import pickle
+import struct
+from array import array
+from collections.abc import Iterable, Sequence
+from multiprocessing import shared_memory
+from typing import Any
+
+from loanpy.scorer import Scorer
+
+_LENGTH = struct.Struct("<Q")
+
+#: Blocks created by this process and not yet unlinked, by name.
+_PUBLISHED: dict[str, SharedBlock] = {}
+
+
+def cleanup() -> None:
+    """Close and unlink every block this process published and still owns.
+
+    Registered with :mod:`atexit`, so blocks are not leaked if a program exits
+    without calling :meth:`SharedBlock.unlink`.
+    """
+    for block in list(_PUBLISHED.values()):
+        block.close()
+        block.unlink()
+
+
+atexit.register(cleanup)
+
+
+class SharedBlock:
+    """A named shared-memory block holding a header and typed arrays.
+
+    Use :meth:`attach` in workers. The publishing process owns the block:
+    leaving its ``with`` statement closes *and* unlinks it, while attached
+    handles only close. Arrays are exposed as :class:`memoryview` objects that
+    become invalid once the handle is closed; keep the handle referenced
+    while they, or a :attr:`SharedScorer.scorer` built on them, are in use.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool) -> None:
+        self._shm = shm
+        self.owner = owner
+        self._views: list[memoryview] = []
+        (length,) = _LENGTH.unpack_from(shm.buf)
+        self.header: dict[str, Any] = pickle.loads(shm.buf[8 : 8 + length])
+        self.arrays: dict[str, memoryview] = {
+            key: self._view(typecode, start, size)
+            for key, (typecode, start, size) in self.header.pop("_arrays").items()
+        }
+
+    def _view(self, typecode: str, start: int, size: int) -> memoryview:
+        raw = self._shm.buf[start : start + size * array(typecode).itemsize]
+        view = raw.cast(typecode)
+        self._views += [raw, view]
+        return view
+
+    @classmethod
+    def _create(
+        cls, header: dict[str, Any], arrays: dict[str, array], name: str | None
+    ) -> SharedBlock:
+        # The header records array positions, which depend on its own size:
+        # lay the arrays out after ``reserved`` header bytes and grow the
+        # reservation until the pickled header fits in it.
+        reserved, header_bytes = -1, b""
+        while len(header_bytes) > reserved:
+            reserved = len(header_bytes)
+            position = 8 + reserved
+            layout = {}
+            for key, values in arrays.items():
+                position += -position % 8
+                layout[key] = (values.typecode, position, len(values))
+                position += len(values) * values.itemsize
+            header_bytes = pickle.dumps({**header, "_arrays": layout})
+        assert all(8 + len(header_bytes) <= start for _, start, _ in layout.values())
+        shm = shared_memory.SharedMemory(name=name, create=True, size=max(position, 1))
+        try:
+            _LENGTH.pack_into(shm.buf, 0, len(header_bytes))
+            shm.buf[8 : 8 + len(header_bytes)] = header_bytes
+            for key, values in arrays.items():
+                _, start, _ = layout[key]
+                stop = start + len(values) * values.itemsize
+                shm.buf[start:stop] = values.tobytes()
+            block = cls(shm, owner=True)
+        except BaseException:
+            shm.close()
+            shm.unlink()
+            raise
+        _PUBLISHED[shm.name] = block
+        return block
+
+    @classmethod
+    def attach(cls, name: str) -> SharedBlock:
+        """Attach to a block published by another process."""
+        return cls(shared_memory.SharedMemory(name=name), owner=False)
+
+    @property
+    def name(self) -> str:
+        """Name for :meth:`attach`."""
+        return self._shm.name
+
+    def close(self) -> None:
+        """Release all views and detach from the block; safe to call twice."""
+        for view in reversed(self._views):
+            view.release()
+        self._views.clear()
+        self.arrays.clear()
+        self._shm.close()
+
+    def unlink(self) -> None:
+        """Free the block; only the owner should call this."""
+        _PUBLISHED.pop(self._shm.name, None)
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+        if self.owner:
+            self.unlink()
+
+
+class SharedScorer(SharedBlock):
+    """A compiled :class:`~loanpy.scorer.Scorer` in shared memory.
+
+    :attr:`scorer` is a :class:`~loanpy.scorer.Scorer` whose weight rows and
+    flat weights are views of the shared block; only the segment tables and
+    the pair index of :meth:`~loanpy.scorer.Scorer.score` are built in each
+    worker.
+    """
+
+    @classmethod
+    def publish(cls, scorer: Scorer, name: str | None = None) -> SharedScorer:
+        """Copy ``scorer`` into a new block."""
+        typecode = "q" if scorer._integral else "d"
+        header = {
+            "descendants": scorer.descendants,
+            "ancestors": scorer.ancestors,
+            "freq_filter": scorer.freq_filter,
+            "max_weight": scorer.max_weight,
+            "integral": scorer._integral,
+        }
+        return cls._create(
+            header, {"weights": array(typecode, scorer.flat_weights)}, name
+        )
+
+    @property
+    def scorer(self) -> Scorer:
+        """Zero-copy :class:`~loanpy.scorer.Scorer` over the shared weights."""
+        if not hasattr(self, "_scorer"):
+            header = self.header
+            flat = self.arrays["weights"]
+            n_ancestors = len(header["ancestors"])
+            scorer = Scorer.__new__(Scorer)
+            scorer.freq_filter = header["freq_filter"]
+            scorer.descendants = header["descendants"]
+            scorer.ancestors = header["ancestors"]
+            scorer.descendant_ids = {s: i for i, s in enumerate(scorer.descendants)}
+            scorer.ancestor_ids = {s: i for i, s in enumerate(scorer.ancestors)}
+            del scorer.descendant_ids[""], scorer.ancestor_ids[""]
+            scorer.max_weight = header["max_weight"]
+            scorer._integral = header["integral"]
+            scorer.weights = [
+                flat[row * n_ancestors : (row + 1) * n_ancestors]
+                for row in range(len(scorer.descendants))
+            ]
+            self._views += scorer.weights
+            scorer.flat_weights = flat
+            scorer._index_pairs()
+            self._scorer = scorer
+        return self._scorer
+
+    def close(self) -> None:
+        self.__dict__.pop("_scorer", None)
+        super().close()
+
+
+class SharedLexicon(SharedBlock):
+    """An integer-encoded wordlist in shared memory.
+
+    Segments are interned into a table stored in the header; the words are a
+    flat ``int32`` id array with ``int64`` offsets and a parallel one-byte
+    C/V array. ``lexicon[i]`` decodes word ``i`` on demand.
+    """
+
+    @classmethod
+    def publish(
+        cls,
+        words: Iterable[tuple[Sequence[str], Sequence[str]]],
+        name: str | None = None,
+    ) -> SharedLexicon:
+        """Encode ``(segments, cv_profile)`` pairs into a new block."""
+        segments_table: list[str] = []
+        segment_ids: dict[str, int] = {}
+        ids, offsets, cv = array("i"), array("q", [0]), array("b")
+        for index, (segments, cv_profile) in enumerate(words):
+            profile = "".join(cv_profile).encode("ascii")
+            if len(profile) != len(segments):
+                raise ValueError(
+                    f"word {index}: segments and cv_profile must have the same "
+                    "length"
+                )
+            for segment in segments:
+                if segment not in segment_ids:
+                    segment_ids[segment] = len(segments_table)
+                    segments_table.append(segment)
+                ids.append(segment_ids[segment])
+            cv.frombytes(profile)
+            offsets.append(len(ids))
+        return cls._create(
+            {"segments": segments_table},
+            {"ids": ids, "offsets": offsets, "cv": cv},
+            name,
+        )
+
+    def __len__(self) -> int:
+        return len(self.arrays["offsets"]) - 1
+
+    def ids(self, index: int) -> memoryview:
+        """Zero-copy view of the segment ids of word ``index``."""
+        offsets = self.arrays["offsets"]
+        return self.arrays["ids"][offsets[index] : offsets[index + 1]]
+
+    def __getitem__(self, index: int) -> tuple[list[str], list[str]]:
+        """Decoded ``(segments, cv_profile)`` of word ``index``."""
+        if not -len(self) <= index < len(self):
+            raise IndexError("lexicon index out of range")
+        index %= len(self)
+        offsets = self.arrays["offsets"]
+        start, stop = offsets[index], offsets[index + 1]
+        table = self.header["segments"]
+        segments = [table[i] for i in self.arrays["ids"][start:stop]]
+        cv_profile = [chr(c) for c in self.arrays["cv"][start:stop]]
+        return segments, cv_profile
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
@@ -0,0 +1,158 @@
+"""Permutation significance tests for donor/recipient alignment scores."""
+
+from __future__ import annotations
+
+import random
+from collections.abc import Mapping, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from itertools import starmap
+from operator import add, ge, getitem
+
+from loanpy.scorer import Scorer
+from loanpy.uralign import Uralign
+
+_MATRIX: Sequence[Sequence[int]] = ()
+
+
+def score_matrix(
+    recipients: Sequence[tuple[Sequence[str], Sequence[str]]],
+    donors: Sequence[tuple[Sequence[str], Sequence[str]]],
+    scorer: Scorer | Mapping[tuple[str, str], float],
+    freq_filter: int = 2,
+    initial_gap: bool = True,
+    final_gap: bool = True,
+) -> list[list[int]]:
+    """Score every donor against every recipient once.
+
+    Each donor row is aligned with :meth:`~loanpy.uralign.Uralign.hu_many`
+    and scored pair by pair with :meth:`~loanpy.scorer.Scorer.score`.
+
+    Parameters
+    ----------
+    recipients, donors:
+        ``(segments, cv_profile)`` pairs. Donors should already be adapted
+        (see :meth:`~loanpy.search.LoanwordSearch.adapt_word`).
+    scorer:
+        Compiled :class:`~loanpy.scorer.Scorer`, or an ``AbsoluteFrequency``
+        mapping compiled with ``freq_filter``.
+    initial_gap, final_gap:
+        Passed to :meth:`~loanpy.uralign.Uralign.hu_many`.
+
+    Returns
+    -------
+    list[list[int]]
+        ``matrix[i][j]`` is the score of donor ``i`` against recipient ``j``
+        (recipient as descendant, donor as ancestor).
+    """
+    if not isinstance(scorer, Scorer):
+        scorer = Scorer(scorer, freq_filter)
+    prepared = [
+        (tuple(segments), cv_profile[0] if cv_profile else "")
+        for segments, cv_profile in recipients
+    ]
+    matrix = []
+    for segments, cv_profile in donors:
+        segments = tuple(segments)
+        cv0 = cv_profile[0] if cv_profile else ""
+        alignments = Uralign.hu_many(
+            (
+                (rec_segments, segments, rec_cv0, cv0)
+                for rec_segments, rec_cv0 in prepared
+            ),
+            initial_gap,
+            final_gap,
+        )
+        matrix.append(list(starmap(scorer.score, alignments)))
+    return matrix
+
+
+def _init_worker(matrix: Sequence[Sequence[int]]) -> None:
+    global _MATRIX
+    _MATRIX = matrix
+
+
+def _count_block(
+    n_permutations: int, seed: int, matrix: Sequence[Sequence[int]] | None = None
+) -> list[int]:
+    """Count, per pair, permutations scoring at least the observed score."""
+    if matrix is None:
+        matrix = _MATRIX
+    rng = random.Random(seed)
+    observed = [row[i] for i, row in enumerate(matrix)]
+    counts = [0] * len(matrix)
+    permutation = list(range(len(matrix)))
+    for _ in range(n_permutations):
+        rng.shuffle(permutation)
+        permuted = map(getitem, matrix, permutation)
+        counts = list(map(add, counts, map(ge, permuted, observed)))
+    return counts
+
+
+def permutation_pvalues(
+    matrix: Sequence[Sequence[int]],
+    n_permutations: int = 1000,
+    seed: int = 0,
+    processes: int | None = 1,
+    block_size: int = 100,
+) -> list[float]:
+    """Empirical p-values for the paired scores on the diagonal of ``matrix``.
+
+    Pair ``i`` is donor ``i`` with recipient ``i``. Shuffling recipient words
+    and rescoring is equivalent to drawing, for each donor, the precomputed
+    score against a permuted recipient, so every permutation is a single
+    gather over :func:`score_matrix` instead of a round of alignments.
+
+    Parameters
+    ----------
+    matrix:
+        Square output of :func:`score_matrix`.
+    n_permutations:
+        Number of recipient permutations.
+    seed:
+        Seed of the random generator. Permutations are split into blocks of
+        ``block_size``, each seeded from ``seed``, so results do not depend on
+        ``processes``.
+    processes:
+        Worker processes for permutation blocks; ``1`` runs in-process and
+        ``None`` uses all CPUs.
+    block_size:
+        Permutations per block.
+
+    Returns
+    -------
+    list[float]
+        ``(1 + #{permuted >= observed}) / (1 + n_permutations)`` per pair.
+
+    Raises
+    ------
+    ValueError
+        If ``matrix`` is not square.
+
+    Examples
+    --------
+    ::
+
+        matrix = score_matrix(recipients, adapted_donors, scorer)
+        pvalues = permutation_pvalues(matrix, n_permutations=10_000, processes=8)
+    """
+    if any(len(row) != len(matrix) for row in matrix):
+        raise ValueError("matrix must be square (one recipient per donor)")
+    block_rng = random.Random(seed)
+    blocks = []
+    for start in range(0, n_permutations, block_size):
+        size = min(block_size, n_permutations - start)
+        blocks.append((size, block_rng.getrandbits(64)))
+
+    counts = [0] * len(matrix)
+    if processes == 1 or not blocks:
+        results = [
+            _count_block(size, block_seed, matrix) for size, block_seed in blocks
+        ]
+    else:
+        with ProcessPoolExecutor(
+            processes, initializer=_init_worker, initargs=(matrix,)
+        ) as executor:
+            results = list(executor.map(_count_block, *zip(*blocks)))
+    for block_counts in results:
+        counts = list(map(add, counts, block_counts))
+    return [(1 + count) / (1 + n_permutations) for count in counts]
@@ -0,0 +1,513 @@
+"""Persistent SQLite store for lexicons, correspondences and match scores."""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+from collections.abc import Iterable, Mapping, Sequence
+from typing import Any
+
+from loanpy.cache import content_hash
+from loanpy.correspondences import get_sound_correspondences
+from loanpy.scorer import Scorer
+from loanpy.search import LoanwordSearch, Word
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS words (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    lexicon TEXT NOT NULL,
+    word_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    segments TEXT NOT NULL,
+    cv_profile TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    UNIQUE (lexicon, word_id)
+);
+CREATE INDEX IF NOT EXISTS words_by_hash ON words (lexicon, hash);
+CREATE INDEX IF NOT EXISTS words_by_position ON words (lexicon, position);
+CREATE TABLE IF NOT EXISTS correspondence_sets (
+    name TEXT PRIMARY KEY,
+    source_hash TEXT NOT NULL,
+    sound TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS correspondences (
+    name TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    descendant TEXT NOT NULL,
+    ancestor TEXT NOT NULL,
+    frequency NOT NULL,
+    cognateset_ids TEXT NOT NULL,
+    examples TEXT NOT NULL,
+    PRIMARY KEY (name, descendant, ancestor)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS adapted (
+    config TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    segments TEXT NOT NULL,
+    cv_profile TEXT NOT NULL,
+    PRIMARY KEY (config, hash)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS progress (
+    config TEXT NOT NULL,
+    recipients TEXT NOT NULL,
+    donor_hash TEXT NOT NULL,
+    scored_upto INTEGER NOT NULL,
+    PRIMARY KEY (config, recipients, donor_hash)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS scores (
+    config TEXT NOT NULL,
+    donor_hash TEXT NOT NULL,
+    recipient_hash TEXT NOT NULL,
+    score NOT NULL,
+    PRIMARY KEY (config, donor_hash, recipient_hash)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS scores_by_rank ON scores (config, donor_hash, score DESC);
+"""
+
+
+def _form_hash(segments: Sequence[str], cv_profile: Sequence[str]) -> str:
+    return content_hash(list(segments), list(cv_profile))
+
+
+_last_scorer_hash: tuple | None = None
+
+
+def _scorer_hash(scorer: Scorer) -> str:
+    """:func:`content_hash` of ``scorer``'s segments and weights, memoised.
+
+    Hashing the full weight matrix dominates small ``update_scores`` and
+    ``top_matches`` calls, and a run passes the same scorer to every call.
+    The hash is kept for the last scorer seen, so a scorer whose weights are
+    changed in place needs a new instance.
+    """
+    global _last_scorer_hash
+    last = _last_scorer_hash
+    if last is not None and last[0] is scorer:
+        return last[1]
+    digest = content_hash(scorer.descendants, scorer.ancestors, scorer.weights)
+    _last_scorer_hash = (scorer, digest)
+    return digest
+
+
+def _search_config(search: LoanwordSearch) -> tuple[str, str]:
+    """Hashes of the adaptation settings and of everything that sets a score."""
+    adapt = content_hash(
+        search.adapt.substitutions if search.adapt is not None else None,
+        search.phonotactic_inventory,
+    )
+    score = content_hash(
+        adapt,
+        _scorer_hash(search.scorer),
+        search.initial_gap,
+        search.final_gap,
+        search.min_score,
+        # Only blocking searches add parts, so other hashes stay unchanged.
+        *((search.blocking, search.max_length_diff) if search.blocking else ()),
+    )
+    return adapt, score
+
+
+class CorpusStore:
+    """SQLite persistence for repeated loanword-detection runs.
+
+    Stores recipient and donor lexicons, mined correspondence tables, adapted
+    donor forms and donor × recipient scores. Words and forms are keyed by a
+    :func:`content_hash` of their segments and C/V profile, and the settings
+    of a :class:`~loanpy.search.LoanwordSearch` by a hash of its scorer,
+    adaptation, gap rules, ``min_score`` and blocking, so a later run only
+    adapts and scores forms that are new or changed since the last run.
+
+    Parameters
+    ----------
+    path:
+        Database file; ``":memory:"`` for a temporary store.
+    commit_every:
+        Donor forms scored per transaction in :meth:`update_scores`; an
+        interrupted run keeps the donors committed so far.
+
+    Examples
+    --------
+    ::
+
+        with CorpusStore("loanpy.sqlite") as store:
+            stats = store.mine_correspondences("uralic", rows, "Uralign")
+            store.sync_lexicon("hungarian", recipients)
+            store.sync_lexicon("gothic", donors)
+            search = LoanwordSearch(
+                stats["AbsoluteFrequency"], adapt, templates, k=10, min_score=0
+            )
+            store.update_scores(search, "gothic", "hungarian")
+            matches = store.top_matches(search, "gothic", "hungarian")
+
+    Notes
+    -----
+    Each word row gets an ever-increasing sequence number when it is added
+    or its content changes. For every donor form, the store records the
+    highest recipient sequence number it has been scored against, so
+    :meth:`update_scores` only aligns the recipients added since. Only scores
+    of at least ``min_score`` are stored; without ``min_score`` every pair
+    is, which grows with donors × recipients.
+    """
+
+    def __init__(
+        self, path: str | os.PathLike = ":memory:", commit_every: int = 100
+    ) -> None:
+        self.commit_every = commit_every
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.connection.close()
+
+    def __enter__(self) -> CorpusStore:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def sync_lexicon(self, name: str, words: Iterable[Word]) -> dict[str, int]:
+        """Make the stored lexicon ``name`` equal to ``words``.
+
+        Rows whose segments and profile are unchanged keep their sequence
+        number, so nothing derived from them is recomputed.
+
+        Parameters
+        ----------
+        name:
+            Lexicon name, e.g. a language id.
+        words:
+            ``(word_id, segments, cv_profile)`` entries in lexicon order.
+            Word ids must be JSON-serialisable and unique.
+
+        Returns
+        -------
+        dict[str, int]
+            Counts of ``added``, ``changed``, ``removed`` and ``unchanged``
+            rows.
+
+        Raises
+        ------
+        ValueError
+            If a word id occurs twice.
+        """
+        existing = {
+            word_id: (seq, form_hash)
+            for seq, word_id, form_hash in self.connection.execute(
+                "SELECT seq, word_id, hash FROM words WHERE lexicon = ?", (name,)
+            )
+        }
+        seen = set()
+        moved, inserted, replaced = [], [], []
+        for position, (word_id, segments, cv_profile) in enumerate(words):
+            key = json.dumps(word_id)
+            if key in seen:
+                raise ValueError(f"duplicate word id {word_id!r} in {name}")
+            seen.add(key)
+            form_hash = _form_hash(segments, cv_profile)
+            if key in existing and existing[key][1] == form_hash:
+                moved.append((position, existing[key][0]))
+                continue
+            if key in existing:
+                replaced.append((existing[key][0],))
+            inserted.append(
+                (
+                    name,
+                    key,
+                    position,
+                    " ".join(segments),
+                    " ".join(cv_profile),
+                    form_hash,
+                )
+            )
+        removed = [(seq,) for key, (seq, _) in existing.items() if key not in seen]
+        with self.connection:
+            self.connection.executemany("DELETE FROM words WHERE seq = ?", removed)
+            self.connection.executemany("DELETE FROM words WHERE seq = ?", replaced)
+            self.connection.executemany(
+                "UPDATE words SET position = ? WHERE seq = ?", moved
+            )
+            self.connection.executemany(
+                "INSERT INTO words (lexicon, word_id, position, segments, cv_profile,"
+                " hash) VALUES (?, ?, ?, ?, ?, ?)",
+                inserted,
+            )
+        return {
+            "added": len(inserted) - len(replaced),
+            "changed": len(replaced),
+            "removed": len(removed),
+            "unchanged": len(moved),
+        }
+
+    def lexicon(self, name: str) -> list[Word]:
+        """The stored lexicon ``name`` as ``(word_id, segments, cv_profile)``."""
+        return [
+            (json.loads(word_id), segments.split(), cv_profile.split())
+            for word_id, segments, cv_profile in self.connection.execute(
+                "SELECT word_id, segments, cv_profile FROM words"
+                " WHERE lexicon = ? ORDER BY position",
+                (name,),
+            )
+        ]
+
+    def save_correspondences(
+        self, name: str, correspondences: Mapping[str, Mapping], source_hash: str = ""
+    ) -> None:
+        """Store :func:`~loanpy.correspondences.get_sound_correspondences` output.
+
+        Pair keys must be ``(descendant, ancestor)`` string tuples, i.e. mined
+        without a ``vocabulary``. ``source_hash`` identifies the input, see
+        :meth:`mine_correspondences`.
+        """
+        cognates = correspondences.get("Cognateset_IDs", {})
+        examples = correspondences.get("Examples", {})
+        rows = [
+            (
+                name,
+                rank,
+                descendant,
+                ancestor,
+                frequency,
+                json.dumps(cognates.get((descendant, ancestor), [])),
+                json.dumps(examples.get((descendant, ancestor), [])),
+            )
+            for rank, ((descendant, ancestor), frequency) in enumerate(
+                correspondences["AbsoluteFrequency"].items()
+            )
+        ]
+        sound = json.dumps(correspondences.get("SoundCorrespondences", {}))
+        with self.connection:
+            self.connection.execute(
+                "DELETE FROM correspondences WHERE name = ?", (name,)
+            )
+            self.connection.execute(
+                "INSERT OR REPLACE INTO correspondence_sets VALUES (?, ?, ?)",
+                (name, source_hash, sound),
+            )
+            self.connection.executemany(
+                "INSERT INTO correspondences VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+
+    def load_correspondences(self, name: str) -> dict[str, dict] | None:
+        """Stored correspondences ``name`` in the layout they were saved in.
+
+        Returns None if nothing is stored under ``name``.
+        """
+        found = self.connection.execute(
+            "SELECT sound FROM correspondence_sets WHERE name = ?", (name,)
+        ).fetchone()
+        if found is None:
+            return None
+        result: dict[str, dict] = {
+            "SoundCorrespondences": json.loads(found[0]),
+            "AbsoluteFrequency": {},
+            "Cognateset_IDs": {},
+            "Examples": {},
+        }
+        for descendant, ancestor, frequency, cognates, examples in (
+            self.connection.execute(
+                "SELECT descendant, ancestor, frequency, cognateset_ids, examples"
+                " FROM correspondences WHERE name = ? ORDER BY rank",
+                (name,),
+            )
+        ):
+            pair = (descendant, ancestor)
+            result["AbsoluteFrequency"][pair] = frequency
+            result["Cognateset_IDs"][pair] = json.loads(cognates)
+            result["Examples"][pair] = json.loads(examples)
+        return result
+
+    def mine_correspondences(
+        self,
+        name: str,
+        table: Sequence[Mapping[str, str]],
+        aligned_col: str,
+        prefix_descendant: str = "",
+        prefix_ancestor: str = "",
+    ) -> dict[str, dict]:
+        """:func:`~loanpy.correspondences.get_sound_correspondences`, stored.
+
+        The aligned and ``Cognateset_ID`` values of ``table`` and the
+        prefixes are hashed; if the hash matches the stored one, the stored
+        result is returned without mining.
+        """
+        source_hash = content_hash(
+            [[row[aligned_col], row["Cognateset_ID"]] for row in table],
+            prefix_descendant,
+            prefix_ancestor,
+        )
+        stored = self.connection.execute(
+            "SELECT source_hash FROM correspondence_sets WHERE name = ?", (name,)
+        ).fetchone()
+        if stored is not None and stored[0] == source_hash:
+            return self.load_correspondences(name)
+        correspondences = get_sound_correspondences(
+            table, aligned_col, prefix_descendant, prefix_ancestor
+        )
+        self.save_correspondences(name, correspondences, source_hash)
+        return correspondences
+
+    def _adapt(self, search: LoanwordSearch, config: str, donors: str) -> dict:
+        """Adapted ``(segments, cv_profile)`` per distinct donor form hash."""
+        missing = self.connection.execute(
+            "SELECT DISTINCT w.hash, w.segments, w.cv_profile FROM words w"
+            " LEFT JOIN adapted a ON a.config = ? AND a.hash = w.hash"
+            " WHERE w.lexicon = ? AND a.hash IS NULL",
+            (config, donors),
+        ).fetchall()
+        rows = []
+        for form_hash, segments, cv_profile in missing:
+            segments, cv_profile = search.adapt_word(
+                segments.split(), cv_profile.split()
+            )
+            rows.append((config, form_hash, " ".join(segments), " ".join(cv_profile)))
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO adapted VALUES (?, ?, ?, ?)", rows
+            )
+        return {
+            form_hash: (segments.split(), cv_profile.split())
+            for form_hash, segments, cv_profile in self.connection.execute(
+                "SELECT DISTINCT a.hash, a.segments, a.cv_profile FROM adapted a"
+                " JOIN words w ON w.lexicon = ? AND w.hash = a.hash"
+                " WHERE a.config = ?",
+                (donors, config),
+            )
+        }
+
+    def _save_scores(self, score_rows: list, progress_rows: list) -> None:
+        """Commit scores together with the progress they complete, then clear."""
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?)", score_rows
+            )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO progress VALUES (?, ?, ?, ?)", progress_rows
+            )
+        score_rows.clear()
+        progress_rows.clear()
+
+    def update_scores(
+        self, search: LoanwordSearch, donors: str, recipients: str
+    ) -> int:
+        """Adapt and score whatever is new since the last run.
+
+        Parameters
+        ----------
+        search:
+            Search whose scorer, adaptation, gap rules and ``min_score``
+            define the scores. With ``blocking``, only the recipients its
+            :class:`~loanpy.blocking.BlockingIndex` keeps for a donor form are
+            scored and stored, as in
+            :meth:`~loanpy.search.LoanwordSearch.search`.
+        donors, recipients:
+            Names of stored lexicons.
+
+        Returns
+        -------
+        int
+            Number of donor/recipient form pairs aligned and scored.
+        """
+        adapt_config, config = _search_config(search)
+        adapted = self._adapt(search, adapt_config, donors)
+        recipient_rows = self.connection.execute(
+            "SELECT seq, hash, segments, cv_profile FROM words"
+            " WHERE lexicon = ? ORDER BY seq",
+            (recipients,),
+        ).fetchall()
+        if not recipient_rows:
+            return 0
+        newest = recipient_rows[-1][0]
+        progress = dict(
+            self.connection.execute(
+                "SELECT donor_hash, scored_upto FROM progress"
+                " WHERE config = ? AND recipients = ?",
+                (config, recipients),
+            )
+        )
+        scored = 0
+        min_score = search.min_score
+        pending_by_upto: dict[int, tuple[list, list, Any]] = {}
+        score_rows, progress_rows = [], []
+        for donor_hash, (segments, cv_profile) in adapted.items():
+            upto = progress.get(donor_hash, 0)
+            if upto >= newest:
+                continue
+            if upto not in pending_by_upto:
+                pending = {}
+                for seq, form_hash, rec_segments, rec_profile in recipient_rows:
+                    if seq > upto and form_hash not in pending:
+                        pending[form_hash] = (rec_segments.split(), rec_profile.split())
+                hashes, words = search.prepare(
+                    (form_hash, rec_segments, rec_profile)
+                    for form_hash, (rec_segments, rec_profile) in pending.items()
+                )
+                pending_by_upto[upto] = (hashes, words, search.build_index(words))
+            hashes, words, index = pending_by_upto[upto]
+            for chunk, scores in search.scored_chunks(
+                segments, cv_profile, words, index
+            ):
+                score_rows.extend(
+                    (config, donor_hash, hashes[position], score)
+                    for position, score in zip(chunk, scores)
+                    if min_score is None or score >= min_score
+                )
+                scored += len(chunk)
+            progress_rows.append((config, recipients, donor_hash, newest))
+            if len(progress_rows) >= self.commit_every:
+                self._save_scores(score_rows, progress_rows)
+        self._save_scores(score_rows, progress_rows)
+        return scored
+
+    def top_matches(
+        self,
+        search: LoanwordSearch,
+        donors: str,
+        recipients: str,
+        k: int | None = None,
+    ) -> list[tuple[Any, list[tuple[Any, Any]]]]:
+        """Best stored recipient matches per donor word, without rescoring.
+
+        Run :meth:`update_scores` first. After it, the result equals
+        ``list(search.search(store.lexicon(donors), store.lexicon(recipients)))``
+        when ``k`` is the search's ``k``.
+
+        Parameters
+        ----------
+        k:
+            Matches per donor; defaults to ``search.k``.
+
+        Returns
+        -------
+        list[tuple]
+            ``(donor_id, [(recipient_id, score), ...])`` in donor order, with
+            matches sorted by descending score and, on ties, recipient order.
+        """
+        _, config = _search_config(search)
+        k = search.k if k is None else k
+        results: dict[str, list] = {}
+        donor_order = [
+            word_id
+            for (word_id,) in self.connection.execute(
+                "SELECT word_id FROM words WHERE lexicon = ? ORDER BY position",
+                (donors,),
+            )
+        ]
+        for donor_id, recipient_id, score in self.connection.execute(
+            "SELECT donor_id, recipient_id, score FROM ("
+            " SELECT d.word_id AS donor_id, r.word_id AS recipient_id, s.score,"
+            "  ROW_NUMBER() OVER (PARTITION BY d.seq"
+            "   ORDER BY s.score DESC, r.position) AS place"
+            " FROM words d"
+            " JOIN scores s ON s.config = ? AND s.donor_hash = d.hash"
+            " JOIN words r ON r.lexicon = ? AND r.hash = s.recipient_hash"
+            " WHERE d.lexicon = ?"
+            ") WHERE place <= ? ORDER BY donor_id, place",
+            (config, recipients, donors, k),
+        ):
+            results.setdefault(donor_id, []).append((json.loads(recipient_id), score))
+        return [
+            (json.loads(donor_id), results.get(donor_id, []))
+            for donor_id in donor_order
+        ]
@@ -0,0 +1,302 @@
+"""Columnar storage of whole wordlists as interned segment ids."""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_right
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from os import PathLike
+
+from loanpy.adapt import Adapt
+from loanpy.cluster import Cluster
+from loanpy.reader import iter_rows
+from loanpy.uralign import Uralign
+from loanpy.vocabulary import SegmentVocabulary
+
+
+class SegmentTable:
+    """A wordlist stored column-wise: one flat id array plus offsets.
+
+    Word ``i`` is ``ids[offsets[i]:offsets[i + 1]]``, with segments interned in
+    :attr:`vocabulary`. The C/V profile is kept as one parallel string and
+    any further CSV columns as plain lists. Segment strings are split exactly
+    once, when the table is built; :meth:`segments` then hands out zero-copy
+    :class:`memoryview` slices that the ``*_ids`` batch APIs of
+    :class:`~loanpy.cluster.Cluster`, :class:`~loanpy.adapt.Adapt` and
+    :class:`~loanpy.uralign.Uralign` accept directly.
+
+    Parameters
+    ----------
+    vocabulary:
+        Vocabulary to intern into. Share one between tables whose words are
+        aligned or scored against each other.
+
+    Examples
+    --------
+    ::
+
+        vocab = SegmentVocabulary()
+        donors = SegmentTable.from_csv("donor.csv", "Segments", "CV", ["ID"], vocab)
+        recipients = SegmentTable.from_csv("rec.csv", "Segments", "CV", ["ID"], vocab)
+        adapted = donors.substitute(adapt).cluster_cv()
+        alignments = recipients.cluster_cv().hu_many(adapted)
+
+    Notes
+    -----
+    Appending while a :meth:`segments` view is alive raises
+    :class:`BufferError`, because the id array cannot be resized under it.
+    """
+
+    def __init__(self, vocabulary: SegmentVocabulary | None = None) -> None:
+        self.vocabulary = vocabulary if vocabulary is not None else SegmentVocabulary()
+        self.ids = array("i")
+        self.offsets = array("q", [0])
+        self._cv = ""
+        self._cv_parts: list[str] = []
+        self.columns: dict[str, list] = {}
+
+    def append(
+        self,
+        segments: Iterable[str] | str,
+        cv_profile: Sequence[str] | str = "",
+        **metadata,
+    ) -> None:
+        """Add one word.
+
+        Parameters
+        ----------
+        segments:
+            Segment list, or a space-separated segment string.
+        cv_profile:
+            Parallel ``"C"`` / ``"V"`` labels as a list, a string such as
+            ``"CVC"`` or a space-separated string. If empty, every segment is
+            labelled ``"?"``, which :meth:`cluster_cv` rejects.
+        **metadata:
+            Values for the metadata :attr:`columns`.
+
+        Raises
+        ------
+        ValueError
+            If a non-empty ``cv_profile`` does not match the segment count.
+        """
+        if isinstance(segments, str):
+            segments = segments.split()
+        ids = self.vocabulary.encode(segments)
+        if isinstance(cv_profile, str):
+            cv_profile = cv_profile.split()
+        profile = "".join(cv_profile)
+        if profile and len(profile) != len(ids):
+            raise ValueError("segments and cv_profile must have the same length")
+        for name, values in self.columns.items():
+            values.append(metadata.pop(name, None))
+        for name, value in metadata.items():
+            self.columns[name] = [None] * len(self) + [value]
+        self.ids.extend(ids)
+        self.offsets.append(len(self.ids))
+        self._cv_parts.append(profile or "?" * len(ids))
+
+    def _freeze(self) -> None:
+        if self._cv_parts:
+            self._cv += "".join(self._cv_parts)
+            self._cv_parts.clear()
+
+    @property
+    def cv(self) -> str:
+        """C/V labels of all words, parallel to :attr:`ids`."""
+        self._freeze()
+        return self._cv
+
+    @cv.setter
+    def cv(self, value: str) -> None:
+        self._cv_parts.clear()
+        self._cv = value
+
+    @classmethod
+    def from_rows(
+        cls,
+        rows: Iterable[Mapping[str, str]],
+        segments_col: str,
+        cv_col: str | None = None,
+        columns: Iterable[str] = (),
+        vocabulary: SegmentVocabulary | None = None,
+    ) -> SegmentTable:
+        """Build a table from row dicts such as those of :class:`csv.DictReader`.
+
+        Parameters
+        ----------
+        rows:
+            Wordlist rows; consumed in one pass.
+        segments_col:
+            Column with space-separated segments.
+        cv_col:
+            Optional column with the C/V profile. Without it, or where it is
+            empty, segments are labelled ``"?"`` and :meth:`cluster_cv` raises.
+        columns:
+            Metadata columns to keep, e.g. ``["ID", "Cognateset_ID"]``.
+        vocabulary:
+            Vocabulary to intern into.
+        """
+        table = cls(vocabulary)
+        columns = list(columns)
+        table.columns = {name: [] for name in columns}
+        for row in rows:
+            table.append(
+                row[segments_col],
+                row[cv_col] if cv_col is not None else "",
+                **{name: row[name] for name in columns},
+            )
+        table._freeze()
+        return table
+
+    @classmethod
+    def from_csv(
+        cls,
+        path: str | PathLike,
+        segments_col: str,
+        cv_col: str | None = None,
+        columns: Iterable[str] = (),
+        vocabulary: SegmentVocabulary | None = None,
+        delimiter: str = ",",
+        encoding: str = "utf-8-sig",
+        use_mmap: bool = False,
+    ) -> SegmentTable:
+        """Build a table from a CSV file in a single streaming pass.
+
+        Only the needed columns are read, via :func:`~loanpy.reader.iter_rows`.
+        See :meth:`from_rows` for the column parameters.
+        """
+        columns = list(columns)
+        names = [segments_col, *([cv_col] if cv_col is not None else []), *columns]
+        table = cls(vocabulary)
+        table.columns = {name: [] for name in columns}
+        append = table.append
+        for row in iter_rows(
+            path, names, use_mmap=use_mmap, delimiter=delimiter, encoding=encoding
+        ):
+            segments, *rest = row
+            cv_profile = rest.pop(0) if cv_col is not None else ""
+            append(segments, cv_profile, **dict(zip(columns, rest)))
+        table._freeze()
+        return table
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def segments(self, index: int) -> memoryview:
+        """Zero-copy view of the segment ids of word ``index``."""
+        return memoryview(self.ids)[self.offsets[index] : self.offsets[index + 1]]
+
+    def cv_profile(self, index: int) -> str:
+        """C/V profile of word ``index`` as a string such as ``"CVC"``."""
+        return self.cv[self.offsets[index] : self.offsets[index + 1]]
+
+    def __getitem__(self, index: int) -> tuple[memoryview, str]:
+        """``(segment ids, cv_profile)`` of word ``index``."""
+        return self.segments(index), self.cv_profile(index)
+
+    def __iter__(self) -> Iterator[tuple[memoryview, str]]:
+        view, cv, offsets = memoryview(self.ids), self.cv, self.offsets
+        for start, stop in zip(offsets, offsets[1:]):
+            yield view[start:stop], cv[start:stop]
+
+    def decode(self, index: int) -> tuple[list[str], list[str]]:
+        """``(segments, cv_profile)`` of word ``index`` as string lists."""
+        return (
+            self.vocabulary.decode(self.segments(index)),
+            list(self.cv_profile(index)),
+        )
+
+    def _derive(self, words: Iterable[tuple[Sequence[int], str]]) -> SegmentTable:
+        table = SegmentTable(self.vocabulary)
+        for ids, profile in words:
+            table.ids.extend(ids)
+            table.offsets.append(len(table.ids))
+            table._cv_parts.append(profile)
+        table._freeze()
+        table.columns = {name: list(values) for name, values in self.columns.items()}
+        return table
+
+    def cluster_cv(self) -> SegmentTable:
+        """New table with C/V runs joined by :meth:`~loanpy.cluster.Cluster.cv_many`.
+
+        Each cluster keeps the single label of its run.
+
+        Raises
+        ------
+        ValueError
+            If a word has no C/V profile; its ``"?"`` labels would otherwise
+            join all of its segments into one cluster.
+        """
+        unlabelled = self.cv.find("?")
+        if unlabelled >= 0:
+            word = bisect_right(self.offsets, unlabelled) - 1
+            raise ValueError(f"word {word} has no C/V profile to cluster by")
+        table = SegmentTable(self.vocabulary)
+        table.ids, table.cv, table.offsets = Cluster.cv_many(
+            self.ids, self.cv, self.offsets, self.vocabulary
+        )
+        table.columns = {name: list(values) for name, values in self.columns.items()}
+        return table
+
+    def substitute(self, adapt: Adapt) -> SegmentTable:
+        """New table with :meth:`~loanpy.adapt.Adapt.substitute_ids` applied.
+
+        Segments substituted by ``""`` are dropped with their profile label.
+        """
+        vocabulary = self.vocabulary
+        segments = vocabulary.segments
+        substitutions = adapt.substitutions
+        return self._derive(
+            (
+                adapt.substitute_ids(ids, vocabulary),
+                "".join(
+                    label
+                    for segment_id, label in zip(ids, profile)
+                    if substitutions.get(segments[segment_id], segments[segment_id])
+                ),
+            )
+            for ids, profile in self
+        )
+
+    def hu_many(
+        self,
+        ancestors: SegmentTable,
+        pairs: Iterable[tuple[int, int]] | None = None,
+        initial_gap: bool = True,
+        final_gap: bool = True,
+    ) -> list[tuple[tuple[int, ...], tuple[int, ...]]]:
+        """Align words of this table (``seqHU``) with words of ``ancestors``.
+
+        Parameters
+        ----------
+        ancestors:
+            Table sharing this table's vocabulary.
+        pairs:
+            ``(index_here, index_there)`` pairs; row-wise ``zip`` of the two
+            tables if None.
+        initial_gap, final_gap:
+            Passed to :meth:`~loanpy.uralign.Uralign.hu_many_ids`.
+
+        Raises
+        ------
+        ValueError
+            If the tables use different vocabularies.
+        """
+        if ancestors.vocabulary is not self.vocabulary:
+            raise ValueError("tables must share one SegmentVocabulary")
+        if pairs is None:
+            pairs = zip(range(len(self)), range(len(ancestors)))
+        return Uralign.hu_many_ids(
+            (
+                (
+                    self.segments(i),
+                    ancestors.segments(j),
+                    self.cv_profile(i)[:1],
+                    ancestors.cv_profile(j)[:1],
+                )
+                for i, j in pairs
+            ),
+            self.vocabulary,
+            initial_gap,
+            final_gap,
+        )
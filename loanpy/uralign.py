@@ -1,5 +1,38 @@
 """Descendant–ancestor alignment and correspondence-based scoring."""
 
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping, Sequence
+
+from loanpy.vocabulary import SegmentVocabulary
+
+#: Returned by :meth:`Uralign.get_score` when ``min_score`` cannot be reached.
+PRUNED = float("-inf")
+
+# ``(scorer, freq_filter, len(scorer), max_weight)`` of the last mapping that
+# :meth:`Uralign.get_score` had to scan; candidates are scored against one
+# table at a time, so a single slot spares every later call the scan.
+_last_max_weight: tuple | None = None
+
+
+def _max_weight(scorer: Mapping[tuple[str, str], float], freq_filter: float) -> float:
+    """Largest weight of ``scorer`` at or above ``freq_filter``, memoised."""
+    global _last_max_weight
+    last = _last_max_weight
+    if (
+        last is not None
+        and last[0] is scorer
+        and last[1] == freq_filter
+        and last[2] == len(scorer)
+    ):
+        return last[3]
+    max_weight = max(
+        (weight for weight in scorer.values() if weight >= freq_filter),
+        default=-1000,
+    )
+    _last_max_weight = (scorer, freq_filter, len(scorer), max_weight)
+    return max_weight
+
 
 class Uralign:
     """Sequential alignment and scoring for etymological comparison.
@@ -76,43 +109,176 @@ class Uralign:
             seqHU, seqPU = seqHU[:n], seqPU[:n]
         return seqHU, seqPU
 
+    @staticmethod
+    def hu_many(
+        words: Iterable[tuple[Sequence[str], Sequence[str], str, str]],
+        initial_gap: bool = True,
+        final_gap: bool = True,
+    ) -> list[tuple[tuple[str, ...], tuple[str, ...]]]:
+        """Align many word pairs like :meth:`hu` without mutating the inputs.
+
+        Parameters
+        ----------
+        words:
+            ``(seqHU, seqPU, seqHU_cv0, seqPU_cv0)`` tuples, i.e. the positional
+            arguments of :meth:`hu`. Segment sequences may be lists, tuples or
+            any other sequence and are left untouched, so no ``.copy()`` is
+            needed.
+        initial_gap, final_gap:
+            As in :meth:`hu`.
+
+        Returns
+        -------
+        list[tuple[tuple[str, ...], tuple[str, ...]]]
+            Aligned pairs in input order, as tuples. Element-wise equal to the
+            lists returned by :meth:`hu`.
+
+        Examples
+        --------
+        Align and score a whole wordlist::
+
+            alignments = Uralign.hu_many(zip(segs_d, segs_a, cv0_d, cv0_a))
+            scores = [scorer.score(alm_d, alm_a) for alm_d, alm_a in alignments]
+        """
+        aligned = []
+        append = aligned.append
+        for seqHU, seqPU, seqHU_cv0, seqPU_cv0 in words:
+            seqHU, seqPU = tuple(seqHU), tuple(seqPU)
+            if initial_gap and seqHU_cv0 == "V":
+                seqHU = ("#-",) + seqHU
+                if seqPU_cv0 == "V":
+                    seqPU = ("-",) + seqPU
+            len_hu, len_pu = len(seqHU), len(seqPU)
+            if not final_gap:
+                n = min(len_hu, len_pu)
+                append((seqHU[:n], seqPU[:n]))
+            elif len_hu < len_pu:
+                cut = len_hu - len_pu
+                append((seqHU + ("-#",), seqPU[:cut] + (".".join(seqPU[cut:]),)))
+            elif len_hu > len_pu:
+                cut = len_pu - len_hu
+                append((seqHU[:cut] + ("+", ".".join(seqHU[cut:])), seqPU))
+            else:
+                append((seqHU, seqPU))
+        return aligned
+
+    @staticmethod
+    def hu_many_ids(
+        words: Iterable[tuple[Sequence[int], Sequence[int], str, str]],
+        vocabulary: SegmentVocabulary,
+        initial_gap: bool = True,
+        final_gap: bool = True,
+    ) -> list[tuple[tuple[int, ...], tuple[int, ...]]]:
+        """Id-based :meth:`hu_many` over ``vocabulary`` ids.
+
+        Gap markers and joined word-final clusters are interned in
+        ``vocabulary``. Score the result with :meth:`get_score` and a scorer
+        re-keyed by :meth:`~loanpy.vocabulary.SegmentVocabulary.encode_pairs`.
+        """
+        initial_hu = (vocabulary.intern("#-"),)
+        initial_pu = (vocabulary.intern("-"),)
+        final_hu = (vocabulary.intern("-#"),)
+        plus = vocabulary.intern("+")
+        join = vocabulary.join
+        aligned = []
+        append = aligned.append
+        for seqHU, seqPU, seqHU_cv0, seqPU_cv0 in words:
+            seqHU, seqPU = tuple(seqHU), tuple(seqPU)
+            if initial_gap and seqHU_cv0 == "V":
+                seqHU = initial_hu + seqHU
+                if seqPU_cv0 == "V":
+                    seqPU = initial_pu + seqPU
+            len_hu, len_pu = len(seqHU), len(seqPU)
+            if not final_gap:
+                n = min(len_hu, len_pu)
+                append((seqHU[:n], seqPU[:n]))
+            elif len_hu < len_pu:
+                cut = len_hu - len_pu
+                append((seqHU + final_hu, seqPU[:cut] + (join(seqPU[cut:]),)))
+            elif len_hu > len_pu:
+                cut = len_pu - len_hu
+                append((seqHU[:cut] + (plus, join(seqHU[cut:])), seqPU))
+            else:
+                append((seqHU, seqPU))
+        return aligned
+
     @staticmethod
     def get_score(
         seqA: list[str],
         seqB: list[str],
         scorer: dict[tuple[str, str], float],
         freq_filter: int = 2,
-    ) -> int:
+        min_score: float | None = None,
+        max_weight: float | None = None,
+    ) -> int | float:
         """Sum correspondence scores along an alignment.
 
         For each aligned pair ``(a, b)`` the key ``(a, b)`` is looked up in
         ``scorer``. Pairs below ``freq_filter`` incur a large penalty.
 
+        With ``min_score`` set, scoring stops as soon as the running score plus
+        ``max_weight`` for every remaining position falls below the threshold,
+        and :data:`PRUNED` is returned instead. Since one unattested pair costs
+        ``-1000``, most hopeless candidates are rejected after a position or two.
+
         Parameters
         ----------
         seqA, seqB:
-            Parallel aligned token lists.
+            Parallel aligned token lists, or id lists from :meth:`hu_many_ids`
+            when ``scorer`` is keyed by id pairs.
         scorer:
             Mapping from correspondence keys to weights (often absolute
             frequencies from :func:`~loanpy.correspondences.get_sound_correspondences`).
         freq_filter:
             Minimum score for a pair to count positively.
+        min_score:
+            Optional threshold for branch-and-bound early termination.
+        max_weight:
+            Largest weight any position can add. When omitted it is computed
+            from ``scorer`` once and reused while the same mapping, by
+            identity and size, is scored with the same ``freq_filter``. Pass
+            it (e.g. :attr:`~loanpy.scorer.Scorer.max_weight`) after changing
+            weights of that mapping in place.
 
         Returns
         -------
-        int
-            Aggregate alignment score.
+        int or float
+            Aggregate alignment score, a float if ``scorer`` holds float
+            weights. If ``min_score`` is given and cannot be reached, the
+            sentinel :data:`PRUNED` (``float("-inf")``) instead; test for it
+            with ``score == PRUNED`` or ``score < min_score``.
 
         Notes
         -----
         Used in **make_results.py** together with scores from
-        :func:`~loanpy.correspondences.get_sound_correspondences`.
+        :func:`~loanpy.correspondences.get_sound_correspondences`. For repeated
+        scoring against the same table, :class:`~loanpy.scorer.Scorer` compiles
+        ``scorer`` and ``freq_filter`` into an integer-indexed weight matrix
+        with identical results.
         """
         score = 0
+        if min_score is None:
+            for a, b in zip(seqA, seqB):
+                local_score = scorer.get((a, b), -1000)
+                if local_score >= freq_filter:
+                    score += local_score
+                else:
+                    score -= 1000
+            return score
+
+        if max_weight is None:
+            max_weight = _max_weight(scorer, freq_filter)
+        best_step = max(max_weight, -1000)
+        remaining = min(len(seqA), len(seqB))
+        if remaining * best_step < min_score:
+            return PRUNED
         for a, b in zip(seqA, seqB):
             local_score = scorer.get((a, b), -1000)
             if local_score >= freq_filter:
                 score += local_score
             else:
                 score -= 1000
+            remaining -= 1
+            if score + remaining * best_step < min_score:
+                return PRUNED
         return score
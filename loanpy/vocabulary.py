@@ -0,0 +1,121 @@
+"""Interned segment vocabulary for integer-encoded pipelines."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping, Sequence
+
+
+class _Joins(dict):
+    """Memo of ``"."``-joins keyed by id tuple; misses are interned."""
+
+    def __init__(self, vocabulary: SegmentVocabulary) -> None:
+        super().__init__()
+        self.vocabulary = vocabulary
+
+    def __missing__(self, key: tuple[int, ...]) -> int:
+        segments = self.vocabulary.segments
+        joined = self[key] = self.vocabulary.intern(
+            ".".join([segments[segment_id] for segment_id in key])
+        )
+        return joined
+
+
+class SegmentVocabulary:
+    """Map segments and clustered segments to compact integer ids.
+
+    Every string a pipeline produces — plain segments, ``"."``-joined clusters
+    and alignment markers such as ``"-"``, ``"#-"``, ``"-#"`` and ``"+"`` — is
+    interned once and then handled as a small int. The ``*_ids`` code paths of
+    :class:`~loanpy.cluster.Cluster`, :meth:`~loanpy.adapt.Adapt.substitute_ids`,
+    :meth:`~loanpy.uralign.Uralign.hu_many_ids` and
+    :func:`~loanpy.correspondences.get_sound_correspondences` share one
+    vocabulary, so strings only reappear when :meth:`decode` is called at
+    output.
+
+    Parameters
+    ----------
+    segments:
+        Optional segments to intern up front, in id order.
+
+    Examples
+    --------
+    Run alignment and scoring on ids and decode only the result::
+
+        vocab = SegmentVocabulary()
+        stats = get_sound_correspondences(rows, "Uralign", vocabulary=vocab)
+        ids_d = Cluster.cv_ids(vocab.encode(seg_d), cv_d, vocab)
+        ids_a = Cluster.cv_ids(vocab.encode(seg_a), cv_a, vocab)
+        [(alm_d, alm_a)] = Uralign.hu_many_ids([(ids_d, ids_a, "C", "C")], vocab)
+        score = Uralign.get_score(alm_d, alm_a, stats["AbsoluteFrequency"])
+        print(vocab.decode(alm_d), vocab.decode(alm_a), score)
+
+    Notes
+    -----
+    Ids are assigned in first-seen order and never change, so encoded data
+    stays valid while the vocabulary grows. :meth:`join` is memoised per id
+    tuple; the join of a cluster with further segments is the id of the fully
+    flattened string, exactly as repeated ``"."``-joins of strings would give.
+    """
+
+    def __init__(self, segments: Iterable[str] = ()) -> None:
+        self.segments: list[str] = []
+        self.ids: dict[str, int] = {}
+        self._joins = _Joins(self)
+        for segment in segments:
+            self.intern(segment)
+
+    def __len__(self) -> int:
+        return len(self.segments)
+
+    def __contains__(self, segment: str) -> bool:
+        return segment in self.ids
+
+    def __getitem__(self, segment_id: int) -> str:
+        return self.segments[segment_id]
+
+    def intern(self, segment: str) -> int:
+        """Return the id of ``segment``, adding it if unseen."""
+        segment_id = self.ids.get(segment)
+        if segment_id is None:
+            segment_id = self.ids[segment] = len(self.segments)
+            self.segments.append(segment)
+        return segment_id
+
+    def encode(self, segments: Iterable[str]) -> list[int]:
+        """Intern a segment list."""
+        intern = self.intern
+        return [intern(segment) for segment in segments]
+
+    def decode(self, ids: Iterable[int]) -> list[str]:
+        """Map ids back to strings."""
+        return list(map(self.segments.__getitem__, ids))
+
+    def join(self, ids: Sequence[int], sep: str = ".") -> int:
+        """Id of the ``sep``-joined cluster of ``ids``."""
+        if sep == ".":
+            return self._joins[tuple(ids)]
+        segments = self.segments
+        return self.intern(sep.join([segments[segment_id] for segment_id in ids]))
+
+    def join_many(self, runs: Iterable[Sequence[int]]) -> list[int]:
+        """:meth:`join` for many runs at once; a one-id run maps to itself."""
+        return list(map(self._joins.__getitem__, map(tuple, runs)))
+
+    def encode_pairs(
+        self, mapping: Mapping[tuple[str, str], float]
+    ) -> dict[tuple[int, int], float]:
+        """Re-key a ``(descendant, ancestor)`` mapping such as ``AbsoluteFrequency``.
+
+        The result can be passed as ``scorer`` to
+        :meth:`~loanpy.uralign.Uralign.get_score` or
+        :class:`~loanpy.scorer.Scorer` together with id alignments.
+        """
+        intern = self.intern
+        return {(intern(a), intern(b)): value for (a, b), value in mapping.items()}
+
+    def decode_pairs(
+        self, mapping: Mapping[tuple[int, int], float]
+    ) -> dict[tuple[str, str], float]:
+        """Inverse of :meth:`encode_pairs`."""
+        segments = self.segments
+        return {(segments[a], segments[b]): value for (a, b), value in mapping.items()}
@@ -0,0 +1,16 @@
+"""Test data factories shared across test modules."""
+
+
+def cognate_row(lang, aligned, cog_id="cs1"):
+    """One row of an aligned cognate table."""
+    return {"Language_ID": lang, "Uralign": aligned, "Cognateset_ID": cog_id}
+
+
+def random_words(rng, n, inventory, prefix):
+    """``n`` random ``(id, segments, cv_profile)`` words, one to four segments long."""
+    words = []
+    for i in range(n):
+        segments = [rng.choice(inventory) for _ in range(rng.randint(1, 4))]
+        profile = ["V" if seg in "aoieu" else "C" for seg in segments]
+        words.append((f"{prefix}{i}", segments, profile))
+    return words
@@ -1,6 +1,6 @@
 """Tests for loanpy.adapt."""
 
-from loanpy import Adapt
+from loanpy import Adapt, SegmentVocabulary
 
 
 def _hamming(a: str, b: str) -> float:
@@ -48,6 +48,21 @@ class TestAdaptSubstitute:
         ad.substitutions = {}
         assert ad.substitute([]) == []
 
+    def test_substitute_ids_matches_substitute(self):
+        ad = Adapt()
+        ad.substitutions = {"p": "b", "ʔ": ""}
+        vocab = SegmentVocabulary()
+        segments = ["p", "ʔ", "a", "p"]
+        ids = ad.substitute_ids(vocab.encode(segments), vocab)
+        assert vocab.decode(ids) == ad.substitute(segments) == ["b", "a", "b"]
+        ad.substitutions = {"p": "f"}
+        assert vocab.decode(ad.substitute_ids(vocab.encode(segments), vocab)) == [
+            "f",
+            "ʔ",
+            "a",
+            "f",
+        ]
+
 
 class TestAdaptRepair:
     def test_repair_inserts_placeholder_segments(self):
@@ -0,0 +1,106 @@
+"""Smoke tests for the benchmarks suite at a tiny size."""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import loanpy
+from benchmarks import generators
+from benchmarks.cases import CASES
+from benchmarks.runner import compare, main, parse_size, run_benchmarks, select
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _results(times, size=100):
+    return {
+        "meta": {"format": 1, "size": size, "seed": 0},
+        "results": {name: {"min_s": value} for name, value in times.items()},
+    }
+
+
+class TestGenerators:
+    def test_are_seeded(self):
+        rng = generators.random.Random
+        ancestor = generators.Inventory.sample(rng(1))
+        descendant = generators.Inventory.sample(rng(2))
+        first = generators.cognate_table(rng(3), ancestor, descendant, 20)
+        again = generators.cognate_table(rng(3), ancestor, descendant, 20)
+        assert first == again
+        assert [row["Language_ID"] for row in first[:2]] == ["desc", "anc"]
+        for row in first:
+            assert len(row["Segments"].split()) == len(row["CV"])
+            assert set(row["CV"]) <= {"C", "V"}
+
+    def test_cognates_mine_correspondences(self):
+        rng = generators.random.Random(0)
+        ancestor = generators.Inventory.sample(rng)
+        descendant = generators.Inventory.sample(rng)
+        rows = generators.cognate_table(rng, ancestor, descendant, 50)
+        stats = loanpy.get_sound_correspondences(rows, "Uralign")
+        assert sum(stats["AbsoluteFrequency"].values()) == sum(
+            len(row["Uralign"].split()) for row in rows[::2]
+        )
+
+
+class TestRunner:
+    def test_every_public_callable_is_benchmarked(self):
+        covered = {name for case in CASES.values() for name in case.covers}
+        public = {
+            name
+            for name in loanpy.__all__
+            if callable(getattr(loanpy, name)) and name != "PRUNED"
+        }
+        assert public <= covered
+
+    def test_all_cases_run(self):
+        results = run_benchmarks(60, repeat=1)
+        assert set(results["results"]) == set(CASES)
+        assert results["meta"]["size"] == 60
+        for result in results["results"].values():
+            assert result["min_s"] <= result["median_s"] <= result["max_s"]
+            assert result["items"] > 0
+        json.dumps(results)
+
+    def test_compare_flags_changes(self):
+        baseline = _results({"a": 1.0, "b": 1.0, "c": 1.0, "gone": 1.0})
+        current = _results({"a": 1.05, "b": 1.5, "c": 0.5, "added": 1.0}, size=200)
+        comparison = compare(baseline, current, threshold=0.1)
+        assert comparison["regressions"] == ["b"]
+        assert comparison["improvements"] == ["c"]
+        assert comparison["cases"]["a"]["status"] == "same"
+        assert (comparison["missing"], comparison["new"]) == (["gone"], ["added"])
+        assert any("size" in warning for warning in comparison["warnings"])
+
+    def test_sizes_and_selection(self):
+        assert parse_size("100k") == 100_000
+        assert parse_size("1M") == 1_000_000
+        assert parse_size("250") == 250
+        with pytest.raises(ValueError, match="unknown size"):
+            parse_size("huge")
+        assert select(["uralign.*"]) == [n for n in CASES if n.startswith("uralign")]
+        with pytest.raises(ValueError, match="no benchmark"):
+            select(["nothing*"])
+
+    def test_compare_command(self, tmp_path, capsys):
+        baseline, current = tmp_path / "base.json", tmp_path / "current.json"
+        baseline.write_text(json.dumps(_results({"a": 1.0})))
+        current.write_text(json.dumps(_results({"a": 2.0})))
+        assert main(["compare", str(baseline), str(baseline)]) == 0
+        assert main(["compare", str(baseline), str(current)]) == 1
+        assert "SLOWER" in capsys.readouterr().out
+
+    def test_module_entry_point(self, tmp_path):
+        output = tmp_path / "results.json"
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks", "run", "--size", "20"]
+            + ["--repeat", "1", "-k", "cluster.*", "-o", str(output)],
+            check=True,
+            cwd=ROOT,
+            capture_output=True,
+        )
+        results = json.loads(output.read_text())
+        assert set(results["results"]) == set(select(["cluster.*"]))
@@ -0,0 +1,92 @@
+"""Tests for loanpy.binary."""
+
+import pytest
+from conftest import cognate_row
+
+from loanpy import (
+    MappedCorrespondences,
+    Uralign,
+    add_separator,
+    dump_binary,
+    get_sound_correspondences,
+    load_binary,
+)
+
+
+@pytest.fixture
+def stats():
+    table = [
+        cognate_row("hun", "ɟ ŋ", "1"),
+        cognate_row("pu", "j ŋ", "1"),
+        cognate_row("hun", "k a", "2"),
+        cognate_row("pu", "k o", "2"),
+        cognate_row("hun", "k a t", "3"),
+        cognate_row("pu", "k o t", "3"),
+    ]
+    return get_sound_correspondences(table, "Uralign")
+
+
+class TestRoundTrip:
+    def test_dict_roundtrip(self, stats, tmp_path):
+        path = tmp_path / "scorer.bin"
+        dump_binary(stats, path)
+        loaded = load_binary(path)
+        assert loaded == stats
+        assert list(loaded["AbsoluteFrequency"]) == list(stats["AbsoluteFrequency"])
+
+    def test_toml_shape_roundtrip(self, stats, tmp_path):
+        path = tmp_path / "scorer.bin"
+        dump_binary(add_separator(stats), path)
+        assert add_separator(load_binary(path)) == add_separator(stats)
+
+    def test_missing_sections_stay_missing(self, tmp_path):
+        path = tmp_path / "scorer.bin"
+        dump_binary({"AbsoluteFrequency": {("a", "b"): 3}}, path)
+        assert load_binary(path) == {"AbsoluteFrequency": {("a", "b"): 3}}
+
+    def test_string_key_without_separator_raises(self, tmp_path):
+        with pytest.raises(ValueError, match="separator"):
+            dump_binary({"AbsoluteFrequency": {"a-b": 1}}, tmp_path / "x.bin")
+
+    def test_examples_without_frequency_raise(self, tmp_path):
+        bad = {"AbsoluteFrequency": {}, "Examples": {("a", "b"): ["a < b"]}}
+        with pytest.raises(ValueError, match="Examples"):
+            dump_binary(bad, tmp_path / "x.bin")
+
+
+class TestMappedCorrespondences:
+    def test_lazy_lookups(self, stats, tmp_path):
+        path = tmp_path / "scorer.bin"
+        dump_binary(stats, path)
+        with MappedCorrespondences(path) as mapped:
+            assert mapped[("k", "k")] == 2
+            assert ("ɟ", "j") in mapped
+            assert ("ɟ", "x") not in mapped
+            assert ("zz", "j") not in mapped
+            assert mapped.get(("a", "a"), -1000) == -1000
+            assert mapped.cognateset_ids(("k", "k")) == ["2", "3"]
+            assert mapped.examples(("t", "t")) == ["k a t < k o t"]
+            assert len(mapped) == len(stats["AbsoluteFrequency"])
+
+    def test_usable_as_uralign_scorer(self, stats, tmp_path):
+        path = tmp_path / "scorer.bin"
+        dump_binary(stats, path)
+        scorer = stats["AbsoluteFrequency"]
+        with MappedCorrespondences(path) as mapped:
+            for seq_a, seq_b in (["k", "a"], ["k", "o"]), (["ɟ", "ŋ"], ["j", "ŋ"]):
+                assert Uralign.get_score(seq_a, seq_b, mapped, 1) == (
+                    Uralign.get_score(seq_a, seq_b, scorer, 1)
+                )
+
+    def test_missing_pair_raises_key_error(self, stats, tmp_path):
+        path = tmp_path / "scorer.bin"
+        dump_binary(stats, path)
+        with MappedCorrespondences(path) as mapped:
+            with pytest.raises(KeyError):
+                mapped.examples(("q", "q"))
+
+    def test_rejects_foreign_file(self, tmp_path):
+        path = tmp_path / "scorer.toml"
+        path.write_bytes(b"[AbsoluteFrequency]\n" * 10)
+        with pytest.raises(ValueError, match="not a loanpy"):
+            MappedCorrespondences(path)
@@ -0,0 +1,146 @@
+"""Tests for loanpy.blocking."""
+
+import random
+
+import pytest
+
+from loanpy import BlockingIndex, LoanwordSearch, Scorer, Uralign
+
+FREQ = {
+    ("k", "k"): 4,
+    ("k", "g"): 1,
+    ("a", "a"): 6,
+    ("t", "t"): 5,
+    ("#-", "-"): 3,
+    ("#-", "k"): 2,
+    ("-#", "t.a"): 2,
+}
+SCORER = Scorer(FREQ, freq_filter=2)
+
+
+def _word(segments):
+    return segments, ["V" if seg in "aoie" else "C" for seg in segments]
+
+
+RECIPIENTS = [
+    _word(["k", "a"]),
+    _word(["t", "a"]),
+    _word(["a", "t"]),
+    _word([]),
+    _word(["k", "a", "t", "a"]),
+]
+
+
+class TestBlockingIndex:
+    def test_first_segment_blocks(self):
+        index = BlockingIndex(RECIPIENTS, SCORER)
+        # (k, k) and (#-, k) attested; (t, k) not
+        assert index.candidates(*_word(["k", "o"])) == [0, 2, 3, 4]
+
+    def test_later_positions_block(self):
+        index = BlockingIndex(RECIPIENTS, SCORER)
+        assert index.candidates(*_word(["p", "e", "t"])) == [2, 3, 4]
+
+    def test_below_freq_filter_is_not_viable(self):
+        index = BlockingIndex(RECIPIENTS, SCORER)
+        assert index.candidates(*_word(["g", "o"])) == [3]
+
+    def test_vowel_initial_donor_pairs_with_gap(self):
+        index = BlockingIndex(RECIPIENTS, SCORER)
+        assert index.candidates(*_word(["a", "k"])) == [2, 3]
+
+    def test_without_initial_gap_uses_segment(self):
+        index = BlockingIndex(RECIPIENTS, SCORER, initial_gap=False)
+        assert index.candidates(*_word(["a", "k"])) == [2, 3]
+        assert index.candidates(*_word(["t"])) == [1, 3]
+
+    def test_final_gap_blocks_by_length(self):
+        donor = _word(["p", "e", "t", "a"])
+        # (-#, t.a) is attested for recipients two segments long.
+        assert BlockingIndex(RECIPIENTS, SCORER).candidates(*donor) == [0, 1, 2, 3, 4]
+        index = BlockingIndex(RECIPIENTS, SCORER, final_gap=False)
+        assert index.candidates(*donor) == [2, 3, 4]
+
+    def test_length_filter(self):
+        index = BlockingIndex(RECIPIENTS, SCORER, max_length_diff=0)
+        assert index.candidates(*_word(["k", "o"])) == [0, 2, 3]
+
+    def test_empty_donor_is_never_pruned(self):
+        index = BlockingIndex(RECIPIENTS, SCORER)
+        assert index.candidates([], []) == [0, 1, 2, 3, 4]
+
+    @pytest.mark.parametrize("final_gap", [True, False])
+    def test_candidates_are_pairs_with_an_attested_position(self, final_gap):
+        rng = random.Random(5)
+        words = [
+            _word([rng.choice("ktag") for _ in range(rng.randint(1, 4))])
+            for _ in range(60)
+        ]
+        index = BlockingIndex(words, SCORER, final_gap=final_gap)
+        for segments, profile in words:
+            kept = set(index.candidates(segments, profile))
+            for i, (rec_segments, rec_profile) in enumerate(words):
+                alm_r, alm_d = Uralign.hu(
+                    rec_segments.copy(),
+                    segments.copy(),
+                    rec_profile[0],
+                    profile[0],
+                    final_gap=final_gap,
+                )
+                attested = any(
+                    FREQ.get(pair, 0) >= 2 for pair in zip(alm_r, alm_d)
+                )
+                assert (i in kept) == attested
+
+
+class TestBlockingRecall:
+    def test_recall_report(self):
+        index = BlockingIndex(RECIPIENTS, SCORER)
+        report = index.recall([_word(["k", "a"]), _word(["a", "k"])], min_score=0)
+        assert report["Pairs"] == 10
+        assert report["Candidates"] == 7
+        assert report["Recall"] == 1.0
+        assert report["Found"] == report["Relevant"] > 0
+
+    def test_recall_counts_missed_pairs(self):
+        index = BlockingIndex(RECIPIENTS, SCORER)
+        report = index.recall([_word(["g", "o"])], min_score=-2000)
+        assert report["Relevant"] == 5
+        assert report["Found"] == 1
+        assert report["Recall"] == 0.2
+
+    def test_minimum_recall_with_large_weights(self):
+        rng = random.Random(33)
+        inventory = "ptkbdgaeiou"
+        freq = {
+            (desc, anc): rng.choice([1, 3, 40, 900, 2500])
+            for desc in inventory
+            for anc in inventory
+            if rng.random() < 0.15
+        }
+        words = [
+            _word([rng.choice(inventory) for _ in range(rng.randint(1, 6))])
+            for _ in range(300)
+        ]
+        index = BlockingIndex(words, Scorer(freq))
+        report = index.recall(words[:30], min_score=-999)
+        assert report["Relevant"] > 0
+        assert report["Recall"] >= 1.0
+        assert report["Candidates"] < report["Pairs"] / 2
+
+    def test_large_weights_outweigh_an_unattested_first_pair(self):
+        # The unattested first pair costs 1000, the second position earns 2000.
+        freq = {("k", "k"): 4, ("a", "a"): 2000}
+        donors = [("d", ["g", "a"], ["C", "V"])]
+        recipients = [("r", ["k", "a"], ["C", "V"])]
+        blocked = LoanwordSearch(freq, min_score=0, blocking=True)
+        assert list(blocked.search(donors, recipients)) == [("d", [("r", 1000)])]
+
+    def test_pairs_without_attested_positions_are_dropped(self):
+        freq = {("k", "k"): 4, ("a", "a"): 6}
+        donors = [("d", ["g", "o"], ["C", "V"])]
+        recipients = [("r", ["k", "a"], ["C", "V"])]
+        exhaustive = LoanwordSearch(freq)
+        blocked = LoanwordSearch(freq, blocking=True)
+        assert list(exhaustive.search(donors, recipients)) == [("d", [("r", -2000)])]
+        assert list(blocked.search(donors, recipients)) == [("d", [])]
@@ -0,0 +1,60 @@
+"""Tests for loanpy.bloom."""
+
+import pickle
+import random
+
+import pytest
+
+from loanpy import PairFilter, Uralign
+
+FREQ = {("k", "k"): 5, ("a", "a"): 6, ("t", "t"): 4, ("a", "o"): 1, ("#-", "-"): 2}
+
+
+class TestPairFilter:
+    def test_attested_pairs_only(self):
+        attested = PairFilter(FREQ)
+        assert attested.count == 4
+        for pair in [("k", "k"), ("a", "a"), ("t", "t"), ("#-", "-")]:
+            assert pair in attested
+        assert attested.all_attested(["#-", "k", "a"], ["-", "k", "a"])
+        assert not attested.all_attested(["k", "a"], ["k", "o"])
+        assert attested.all_attested([], [])
+        assert attested.filter([("ka", "ka"), ("ka", "ko"), ("t", "t")]) == [0, 2]
+
+    def test_rejection_implies_penalty(self):
+        rng = random.Random(1)
+        attested = PairFilter(FREQ, false_positive_rate=0.001)
+        for _ in range(200):
+            length = rng.randint(1, 4)
+            seqA = [rng.choice("kat") for _ in range(length)]
+            seqB = [rng.choice("kato") for _ in range(length)]
+            penalised = any(FREQ.get(pair, 0) < 2 for pair in zip(seqA, seqB))
+            assert attested.all_attested(seqA, seqB) == (not penalised)
+            if not penalised:
+                assert Uralign.get_score(seqA, seqB, FREQ) > 0
+
+    def test_false_positive_rate(self):
+        rng = random.Random(0)
+        freq = {(f"d{i}", f"a{rng.randrange(1000)}"): 3 for i in range(2000)}
+        attested = PairFilter(freq, false_positive_rate=0.02)
+        assert all(pair in attested for pair in freq)
+        trials = 20000
+        false_positives = sum((f"x{i}", "y") in attested for i in range(trials))
+        assert false_positives / trials < 0.03
+        assert attested.false_positive_rate == pytest.approx(0.02, rel=0.25)
+        tighter = PairFilter(freq, false_positive_rate=0.001)
+        assert len(tighter.bits) > len(attested.bits)
+
+    def test_pickle_and_add(self):
+        attested = PairFilter(FREQ)
+        assert not attested.all_attested(["a"], ["o"])
+        attested.add("a", "o")
+        assert attested.all_attested(["a"], ["o"])
+        restored = pickle.loads(pickle.dumps(attested))
+        assert restored.all_attested(["a", "k"], ["o", "k"])
+
+    def test_empty_and_invalid(self):
+        assert PairFilter({}).false_positive_rate == 0.0
+        assert ("k", "k") not in PairFilter({})
+        with pytest.raises(ValueError):
+            PairFilter(FREQ, false_positive_rate=1)
@@ -0,0 +1,146 @@
+"""Tests for loanpy.cache."""
+
+import os
+
+import pytest
+
+from loanpy import (
+    Adapt,
+    ResultCache,
+    content_hash,
+    expand_phonotactics,
+    get_sound_correspondences,
+)
+from loanpy.cache import CACHE_FORMAT, DirectoryBackend
+from loanpy.vocabulary import SegmentVocabulary
+
+ROWS = [
+    {"Language_ID": "H", "Cognateset_ID": "1", "Uralign": "k a t"},
+    {"Language_ID": "U", "Cognateset_ID": "1", "Uralign": "k o t"},
+    {"Language_ID": "H", "Cognateset_ID": "2", "Uralign": "t a"},
+    {"Language_ID": "U", "Cognateset_ID": "2", "Uralign": "d a"},
+]
+
+
+def distance(a, b):
+    return abs(ord(a) - ord(b))
+
+
+def other_distance(a, b):
+    return -abs(ord(a) - ord(b))
+
+
+class TestContentHash:
+    def test_is_order_independent_for_mappings_and_sets(self):
+        assert content_hash({"a": 1, "b": 2}) == content_hash({"b": 2, "a": 1})
+        assert content_hash({("a", "b"): 1}) == content_hash({("a", "b"): 1})
+        assert content_hash({"x", "y"}) == content_hash({"y", "x"})
+        assert content_hash([1, 2]) != content_hash([2, 1])
+        assert content_hash({"a": 1}) != content_hash([["a", 1]])
+
+    def test_callables_are_hashed_by_name(self):
+        assert content_hash(distance) == content_hash(distance)
+        assert content_hash(distance) != content_hash(other_distance)
+        assert content_hash(distance) != content_hash("tests.test_cache.distance")
+        with pytest.raises(TypeError, match="module level"):
+            content_hash(lambda a, b: 0)
+
+    def test_rejects_unknown_types(self):
+        with pytest.raises(TypeError, match="object"):
+            content_hash(object())
+
+
+class TestResultCache:
+    def test_hits_skip_computation(self, tmp_path):
+        cache = ResultCache(tmp_path)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return {"x": [1, 2]}
+
+        assert cache.call("stage", ("a",), compute) == {"x": [1, 2]}
+        assert cache.call("stage", ("a",), compute) == {"x": [1, 2]}
+        assert cache.call("other", ("a",), compute) == {"x": [1, 2]}
+        assert len(calls) == 2
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 2, 2)
+        assert stats["stages"]["stage"]["hits"] == 1
+        assert stats["bytes"] > 0
+        assert cache.stage_stats("stage") == stats["stages"]["stage"]
+
+    def test_persists_across_instances(self, tmp_path):
+        ResultCache(tmp_path).call("stage", (1,), lambda: "value")
+        cache = ResultCache(tmp_path)
+        assert cache.stats()["entries"] == 1
+        assert cache.call("stage", (1,), lambda: pytest.fail("recomputed")) == "value"
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        backend = DirectoryBackend(tmp_path)
+        cache = ResultCache(backend, max_bytes=None)
+        for i, last_used in ((0, 200), (1, 100)):
+            cache.call("stage", (i,), lambda: "x" * 1000)
+            key = content_hash("stage", CACHE_FORMAT, i)
+            os.utime(backend._file(key), (last_used, last_used))
+        size = cache.stats()["bytes"] // 2
+        cache = ResultCache(backend, max_bytes=2 * size + 10)
+        cache.call("stage", (2,), lambda: "x" * 1000)
+        stats = cache.stats()
+        assert (stats["evictions"], stats["entries"]) == (1, 2)
+        assert cache.call("stage", (0,), str) == "x" * 1000
+        assert cache.call("stage", (1,), str) == ""
+
+    def test_unreadable_entries_are_recomputed(self, tmp_path):
+        backend = DirectoryBackend(tmp_path)
+        cache = ResultCache(backend)
+        cache.call("stage", (), lambda: 1)
+        for key, _, _ in backend.entries():
+            backend.write(key, b"not a pickle")
+        assert cache.call("stage", (), lambda: 2) == 2
+        assert cache.call("stage", (), lambda: 3) == 2
+
+    def test_invalid_parameters(self, tmp_path):
+        with pytest.raises(ValueError, match="max_bytes"):
+            ResultCache(tmp_path, max_bytes=-1)
+
+
+class TestCachedStages:
+    def test_sound_correspondences(self, tmp_path):
+        cache = ResultCache(tmp_path)
+        expected = get_sound_correspondences(ROWS, "Uralign")
+        assert get_sound_correspondences(ROWS, "Uralign", cache=cache) == expected
+        assert get_sound_correspondences(ROWS, "Uralign", cache=cache) == expected
+        changed = [dict(ROWS[0], Uralign="k a"), *ROWS[1:]]
+        get_sound_correspondences(changed, "Uralign", cache=cache)
+        get_sound_correspondences(ROWS, "Uralign", "H_", cache=cache)
+        assert cache.stats()["stages"]["get_sound_correspondences"]["hits"] == 1
+        assert cache.stats()["misses"] == 3
+
+    def test_sound_correspondences_reject_vocabulary(self, tmp_path):
+        with pytest.raises(ValueError, match="vocabulary"):
+            get_sound_correspondences(
+                ROWS,
+                "Uralign",
+                vocabulary=SegmentVocabulary(),
+                cache=ResultCache(tmp_path),
+            )
+
+    def test_substitutions(self, tmp_path):
+        cache = ResultCache(tmp_path)
+        plain, cached = Adapt(), Adapt()
+        donor, recipient = {"a", "b", "x"}, {"a", "c", "y"}
+        plain.get_substitutions(donor, recipient, distance, {"q": "r"})
+        for _ in range(2):
+            cached.get_substitutions(donor, recipient, distance, {"q": "r"}, cache)
+            assert cached.substitutions == plain.substitutions
+        cached.get_substitutions(donor, recipient, other_distance, {}, cache)
+        assert cached.substitutions != plain.substitutions
+        counters = cache.stats()["stages"]["Adapt.get_substitutions"]
+        assert (counters["hits"], counters["misses"]) == (1, 2)
+
+    def test_expand_phonotactics(self, tmp_path):
+        cache = ResultCache(tmp_path)
+        formula = "(C)V(C)+CV(C)+CV"
+        assert expand_phonotactics(formula, cache) == expand_phonotactics(formula)
+        assert expand_phonotactics(formula, cache) == expand_phonotactics(formula)
+        assert cache.stats()["hits"] == 1
@@ -1,8 +1,11 @@
 """Tests for loanpy.cluster."""
 
+import itertools
+import random
+
 import pytest
 
-from loanpy import Cluster
+from loanpy import Cluster, Clusterer, SegmentTable, SegmentVocabulary
 
 
 class TestClusterCv:
@@ -85,3 +88,179 @@ class TestClusterGaps:
         a2, b2 = Cluster.gaps(seq_a, seq_b)
         assert a2 == ["a", "+", "b"]
         assert b2 == ["x"]
+
+    def test_empty_pair(self):
+        assert Cluster.gaps([], []) == ([], [])
+        assert Cluster.gaps_ids([], [], SegmentVocabulary()) == ([], [])
+
+
+def _reference_gaps(seqA, seqB):
+    seqA_new, seqB_new = [], []
+    for idx, (tokA, tokB) in enumerate(zip(seqA, seqB)):
+        if idx != 0 and tokB == "-" and seqB_new[-1] == "-":
+            seqA_new[-1] += f".{tokA}"
+        else:
+            seqA_new.append(tokA)
+            seqB_new.append(tokB)
+    if seqB_new[-1] == "-":
+        seqA_new.insert(-1, "+")
+        seqB_new.pop(-1)
+    return seqA_new, seqB_new
+
+
+class TestClusterGapsMany:
+    def test_matches_original_gaps_on_random_alignments(self):
+        rng = random.Random(43)
+        pairs = []
+        for _ in range(500):
+            n = rng.randint(1, 8)
+            pairs.append(
+                (
+                    [rng.choice("abc-") for _ in range(n)],
+                    [rng.choice("xy--") for _ in range(n)],
+                )
+            )
+        out = list(Cluster.gaps_many(iter(pairs)))
+        assert out == [_reference_gaps(a, b) for a, b in pairs]
+        assert out == [Cluster.gaps(a, b) for a, b in pairs]
+
+    def test_empty_pairs_do_not_raise(self):
+        pairs = [([], []), (["a", "b"], ["x", "-"]), ([], [])]
+        assert list(Cluster.gaps_many(pairs)) == [
+            ([], []),
+            (["a", "+", "b"], ["x"]),
+            ([], []),
+        ]
+
+    def test_is_lazy_and_yields_independent_lists(self):
+        def pairs():
+            yield ["a", "b"], ["x", "y"]
+            raise AssertionError("read past the first pair")
+
+        stream = Cluster.gaps_many(pairs())
+        first = next(stream)
+        assert first == (["a", "b"], ["x", "y"])
+        second = next(Cluster.gaps_many([(["a"], ["x"])]))
+        assert first[0] is not second[0]
+
+
+class TestClusterIds:
+    CASES = [
+        (["f", "l", "a", "w", "a", "ʊ"], ["C", "C", "V", "C", "V", "V"]),
+        (["l", "d", "a", "ɣ", "e", "l", "t͡ʃ"], ["C", "C", "V", "C", "V", "C", "C"]),
+        (["a", "v", "a", "w", "o", "k"], ["V", "C", "V", "C", "V", "C"]),
+        ([], []),
+    ]
+
+    @pytest.mark.parametrize("segments, cv", CASES)
+    def test_cv_and_glides_match_string_versions(self, segments, cv):
+        vocab = SegmentVocabulary()
+        ids = vocab.encode(segments)
+        assert vocab.decode(Cluster.cv_ids(ids, cv, vocab)) == Cluster.cv(
+            segments, cv
+        )
+        assert vocab.decode(Cluster.glides_ids(ids, cv, vocab)) == Cluster.glides(
+            segments, cv
+        )
+
+    def test_glides_ids_match_glides_on_random_words(self):
+        rng = random.Random(38)
+        vocab = SegmentVocabulary()
+        alphabet = [*"alwvdeɣo", "t͡ʃ", "x.w"]
+        settings = [(("ɣ", "w", "v"), ("t͡ʃ", "d")), (("w", "l.d"), ("l",))]
+        for between, after_l in settings:
+            for _ in range(300):
+                segments = [rng.choice(alphabet) for _ in range(rng.randint(0, 8))]
+                cv = ["V" if seg in "aeo" else "C" for seg in segments]
+                ids = vocab.encode(segments)
+                assert vocab.decode(
+                    Cluster.glides_ids(ids, cv, vocab, between, after_l)
+                ) == Cluster.glides(segments, cv, between, after_l)
+
+    def test_glides_ids_length_mismatch_raises(self):
+        with pytest.raises(ValueError, match="same length"):
+            Cluster.glides_ids([0], ["C", "V"], SegmentVocabulary())
+
+    def test_gaps_match_string_version(self):
+        seqA, seqB = ["k", "a", "t", "a", "s"], ["k", "-", "-", "a", "-"]
+        vocab = SegmentVocabulary()
+        outA, outB = Cluster.gaps_ids(vocab.encode(seqA), vocab.encode(seqB), vocab)
+        assert (vocab.decode(outA), vocab.decode(outB)) == Cluster.gaps(seqA, seqB)
+
+
+class TestClusterer:
+    CASES = [
+        (["a", "w", "a", "w", "e", "k"], "VCVCVC", ("w",), (), ["a.w", "a.w.e", "k"]),
+        (["a", "x.w", "e", "l", "d"], "VCVCC", ("x.w",), ("d",), ["a.x.w.e", "l.d"]),
+        (["e", "wa", "o"], "VCV", ("w",), (), ["e", "wa", "o"]),
+        (
+            ["l", "d", "a", "v", "i", "o"],
+            "CCVCVV",
+            ("ɣ", "w", "v"),
+            ("t͡ʃ", "d"),
+            ["l.d", "a.v.i.o"],
+        ),
+    ]
+
+    @pytest.mark.parametrize("segments, cv, between, after_l, expected", CASES)
+    def test_matches_cluster_glides(self, segments, cv, between, after_l, expected):
+        clusterer = Clusterer(between, after_l)
+        assert clusterer.glides(segments, list(cv)) == expected
+        assert Cluster.glides(segments, list(cv), between, after_l) == expected
+
+    def test_glides_many_and_reuse(self):
+        clusterer = Clusterer(("w",), ())
+        words = [(case[0], list(case[1])) for case in self.CASES[:3]] * 2
+        assert clusterer.glides_many(words) == [
+            clusterer.glides(segments, cv) for segments, cv in words
+        ]
+        assert clusterer.glides_many([]) == []
+
+    def test_length_mismatch_raises(self):
+        with pytest.raises(ValueError, match="same length"):
+            Clusterer().glides(["a"], ["C", "V"])
+
+
+class TestClusterCvMany:
+    @pytest.fixture
+    def corpus(self):
+        rng = random.Random(0)
+        words = []
+        for _ in range(300):
+            segments = [rng.choice("aeiktlsw") for _ in range(rng.randint(0, 7))]
+            words.append((segments, ["V" if s in "aei" else "C" for s in segments]))
+        return words
+
+    def test_matches_cv_word_by_word(self, corpus):
+        table = SegmentTable()
+        for segments, cv in corpus:
+            table.append(segments, cv)
+        vocab = table.vocabulary
+        ids, labels, offsets = Cluster.cv_many(
+            table.ids, table.cv, table.offsets, vocab
+        )
+        strings = Cluster.cv_many(
+            table.ids, table.cv, table.offsets, vocab, as_strings=True
+        )
+        assert len(offsets) == len(corpus) + 1 and len(labels) == len(ids)
+        for i, (segments, cv) in enumerate(corpus):
+            expected = Cluster.cv(segments, cv)
+            assert strings[i] == expected
+            assert vocab.decode(ids[offsets[i] : offsets[i + 1]]) == expected
+            assert labels[offsets[i] : offsets[i + 1]] == "".join(
+                label for label, _ in itertools.groupby(cv)
+            )
+
+    def test_bit_and_byte_profiles(self):
+        vocab = SegmentVocabulary()
+        ids = vocab.encode(["f", "l", "a", "k", "a", "ʊ"])
+        offsets = [0, 3, 3, 6]
+        for cv in ([0, 0, 1, 0, 1, 1], b"CCVCVV"):
+            out_ids, labels, out_offsets = Cluster.cv_many(ids, cv, offsets, vocab)
+            assert vocab.decode(out_ids) == ["f.l", "a", "k", "a.ʊ"]
+            assert list(out_offsets) == [0, 2, 2, 4]
+            assert type(labels) is type(cv) and len(labels) == 4
+
+    def test_empty_corpus(self):
+        ids, labels, offsets = Cluster.cv_many([], "", [0], SegmentVocabulary())
+        assert (list(ids), labels, list(offsets)) == ([], "", [0])
@@ -0,0 +1,213 @@
+"""Tests for loanpy.convert and ``python -m loanpy``."""
+
+import csv
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import loanpy
+
+from loanpy.cluster import Cluster
+from loanpy.convert import KINDS, convert_csv, convert_rows, main
+from loanpy.uralign import Uralign
+
+COGNATES = [
+    {"ID": "1", "Language_ID": "H", "Segments": "f l a w a", "CV": "C C V C V"},
+    {"ID": "2", "Language_ID": "U", "Segments": "p a l a", "CV": "CVCV"},
+    {"ID": "3", "Language_ID": "H", "Segments": "a l d a", "CV": "V C C V"},
+    {"ID": "4", "Language_ID": "U", "Segments": "a l", "CV": "V C"},
+    {"ID": "5", "Language_ID": "H", "Segments": "k e z", "CV": "C V C"},
+    {"ID": "6", "Language_ID": "U", "Segments": "k ä t e", "CV": "C V C V"},
+]
+
+
+def _write(path, rows):
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def _read(path):
+    with open(path, encoding="utf-8", newline="") as file:
+        return list(csv.DictReader(file))
+
+
+def _expected(rows):
+    words = [
+        (row["Segments"].split(), list(row["CV"].replace(" ", ""))) for row in rows
+    ]
+    cv = [Cluster.cv(segments, profile) for segments, profile in words]
+    glides = [Cluster.glides(segments, profile) for segments, profile in words]
+    uralign = []
+    for (hu, cv_hu), (pu, cv_pu) in zip(
+        zip(cv[0::2], words[0::2]), zip(cv[1::2], words[1::2])
+    ):
+        uralign.extend(Uralign.hu(list(hu), list(pu), cv_hu[1][0], cv_pu[1][0]))
+    return [
+        {
+            "Cluster_cv": " ".join(c),
+            "Cluster_glide": " ".join(g),
+            "Uralign": " ".join(u),
+        }
+        for c, g, u in zip(cv, glides, uralign)
+    ]
+
+
+class TestConvertRows:
+    def test_matches_per_word_apis(self):
+        rows = [(row["Segments"], row["CV"]) for row in COGNATES]
+        out = convert_rows(rows, ["cv", "glides", "uralign"])
+        assert [
+            dict(zip(["Cluster_cv", "Cluster_glide", "Uralign"], values))
+            for values in out
+        ] == _expected(COGNATES)
+
+    def test_uralign_needs_pairs(self):
+        with pytest.raises(ValueError, match="odd number"):
+            convert_rows([("a", "V")], ["uralign"])
+
+    def test_profile_length_mismatch(self):
+        with pytest.raises(ValueError, match="same length"):
+            convert_rows([("a b", "V")], ["cv"])
+
+    def test_unknown_kind(self):
+        with pytest.raises(ValueError, match="unknown kind"):
+            convert_rows([("a", "V")], ["sonority"])
+
+    def test_no_kinds(self):
+        assert convert_rows([("a", "V"), ("b", "C")], []) == [(), ()]
+
+
+class TestConvertCsv:
+    DERIVED = {"Cluster_cv": "cv", "Cluster_glide": "glides", "Uralign": "uralign"}
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 4, 100])
+    def test_streams_in_chunks(self, tmp_path, chunk_size):
+        _write(tmp_path / "in.csv", COGNATES)
+        written = convert_csv(
+            tmp_path / "in.csv",
+            tmp_path / "out.csv",
+            self.DERIVED,
+            chunk_size=chunk_size,
+        )
+        assert written == len(COGNATES)
+        out = _read(tmp_path / "out.csv")
+        assert list(out[0]) == [*COGNATES[0], *self.DERIVED]
+        assert out == [row | new for row, new in zip(COGNATES, _expected(COGNATES))]
+
+    def test_worker_pool_preserves_order(self, tmp_path):
+        rows = [dict(row, ID=str(i)) for i in range(20) for row in COGNATES]
+        _write(tmp_path / "in.csv", rows)
+        convert_csv(
+            tmp_path / "in.csv",
+            tmp_path / "out.csv",
+            self.DERIVED,
+            chunk_size=4,
+            processes=2,
+        )
+        assert _read(tmp_path / "out.csv") == [
+            row | new for row, new in zip(rows, _expected(rows))
+        ]
+
+    def test_existing_column_is_overwritten_in_place(self, tmp_path):
+        rows = [{"Cluster_cv": "old", **row} for row in COGNATES[:2]]
+        _write(tmp_path / "in.csv", rows)
+        convert_csv(tmp_path / "in.csv", tmp_path / "out.csv", {"Cluster_cv": "cv"})
+        out = _read(tmp_path / "out.csv")
+        assert list(out[0]) == list(rows[0])
+        assert [row["Cluster_cv"] for row in out] == ["f.l a w a", "p a l a"]
+
+    def test_blank_line_keeps_uralign_pairs(self, tmp_path):
+        rows = COGNATES + COGNATES[:2]
+        _write(tmp_path / "in.csv", rows)
+        lines = (tmp_path / "in.csv").read_text(encoding="utf-8").splitlines()
+        lines.insert(4, "")
+        (tmp_path / "in.csv").write_text("\n".join(lines) + "\n", encoding="utf-8")
+        written = convert_csv(
+            tmp_path / "in.csv", tmp_path / "out.csv", self.DERIVED, chunk_size=4
+        )
+        assert written == len(rows)
+        assert _read(tmp_path / "out.csv") == [
+            row | new for row, new in zip(rows, _expected(rows))
+        ]
+
+    def test_odd_rows_with_uralign_raise(self, tmp_path):
+        _write(tmp_path / "in.csv", COGNATES[:3])
+        with pytest.raises(ValueError, match="odd number"):
+            convert_csv(tmp_path / "in.csv", tmp_path / "out.csv", {"U": "uralign"})
+
+    def test_validation(self, tmp_path):
+        _write(tmp_path / "in.csv", COGNATES)
+        with pytest.raises(ValueError, match="unknown kinds"):
+            convert_csv(tmp_path / "in.csv", tmp_path / "out.csv", {"X": "foo"})
+        with pytest.raises(ValueError, match="Profile"):
+            convert_csv(
+                tmp_path / "in.csv",
+                tmp_path / "out.csv",
+                {"X": "cv"},
+                cv_col="Profile",
+            )
+        assert not (tmp_path / "out.csv").exists()
+        (tmp_path / "empty.csv").write_text("")
+        with pytest.raises(ValueError, match="no header"):
+            convert_csv(tmp_path / "empty.csv", tmp_path / "out.csv", {"X": "cv"})
+
+
+class TestMain:
+    def test_convert_subcommand(self, tmp_path, capsys):
+        _write(tmp_path / "in.csv", COGNATES)
+        code = main(
+            [
+                "convert",
+                str(tmp_path / "in.csv"),
+                str(tmp_path / "out.csv"),
+                "--add",
+                "Cluster_cv=cv",
+                "--add",
+                "Uralign=uralign",
+                "--chunk-size",
+                "3",
+            ]
+        )
+        assert code == 0
+        assert "wrote 6 rows" in capsys.readouterr().out
+        out = _read(tmp_path / "out.csv")
+        assert [(row["Cluster_cv"], row["Uralign"]) for row in out] == [
+            (row["Cluster_cv"], row["Uralign"]) for row in _expected(COGNATES)
+        ]
+
+    def test_bad_spec_and_missing_file(self, tmp_path, capsys):
+        with pytest.raises(SystemExit) as exc:
+            main(["convert", "in.csv", "out.csv", "--add", "X=sonority"])
+        assert exc.value.code == 2
+        err = capsys.readouterr().err
+        assert all(kind in err for kind in KINDS)
+        with pytest.raises(SystemExit) as exc:
+            main(["convert", str(tmp_path / "nope.csv"), "out.csv", "--add", "X=cv"])
+        assert exc.value.code == 1
+        assert "nope.csv" in capsys.readouterr().err
+
+    def test_python_dash_m(self, tmp_path):
+        _write(tmp_path / "in.csv", COGNATES[:2])
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "loanpy",
+                "convert",
+                str(tmp_path / "in.csv"),
+                str(tmp_path / "out.csv"),
+                "--add",
+                "Cluster_glide=glides",
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+            env={**os.environ, "PYTHONPATH": str(Path(loanpy.__file__).parents[1])},
+        )
+        assert "wrote 2 rows" in result.stdout
+        assert _read(tmp_path / "out.csv")[0]["Cluster_glide"] == "f l a.w.a"
@@ -2,6 +2,9 @@
 
 import logging
 
+from conftest import cognate_row
+
+from loanpy import SegmentVocabulary
 from loanpy.correspondences import (
     _is_alternating_language_sequence,
     add_separator,
@@ -9,38 +12,30 @@ from loanpy.correspondences import (
 )
 
 
-def _row(lang, aligned, cog_id="cs1"):
-    return {
-        "Language_ID": lang,
-        "Uralign": aligned,
-        "Cognateset_ID": cog_id,
-    }
-
-
 class TestAlternatingLanguageSequence:
     def test_valid_two_row_table(self):
-        table = [_row("hun", "a b"), _row("pu", "a c")]
+        table = [cognate_row("hun", "a b"), cognate_row("pu", "a c")]
         assert _is_alternating_language_sequence(table, {"hun"}, {"pu"})
 
     def test_valid_four_rows(self):
         table = [
-            _row("d", "x"),
-            _row("a", "y"),
-            _row("d", "x"),
-            _row("a", "z"),
+            cognate_row("d", "x"),
+            cognate_row("a", "y"),
+            cognate_row("d", "x"),
+            cognate_row("a", "z"),
         ]
         assert _is_alternating_language_sequence(table, {"d"}, {"a"})
 
     def test_odd_length_returns_false(self, caplog):
         with caplog.at_level(logging.INFO):
             ok = _is_alternating_language_sequence(
-                [_row("hun", "a")], {"hun"}, {"pu"}
+                [cognate_row("hun", "a")], {"hun"}, {"pu"}
             )
         assert ok is False
         assert "Odd number" in caplog.text
 
     def test_wrong_language_on_even_row(self, caplog):
-        table = [_row("hun", "a"), _row("hun", "b")]
+        table = [cognate_row("hun", "a"), cognate_row("hun", "b")]
         with caplog.at_level(logging.INFO):
             ok = _is_alternating_language_sequence(table, {"hun"}, {"pu"})
         assert ok is False
@@ -68,8 +63,8 @@ class TestAddSeparator:
 class TestGetSoundCorrespondences:
     def test_segment_pair_frequencies_and_examples(self):
         table = [
-            _row("desc", "ɟ ŋ", "1"),
-            _row("anc", "j ŋ", "1"),
+            cognate_row("desc", "ɟ ŋ", "1"),
+            cognate_row("anc", "j ŋ", "1"),
         ]
         result = get_sound_correspondences(
             table, "Uralign", prefix_descendant="H:", prefix_ancestor="P:"
@@ -81,12 +76,12 @@ class TestGetSoundCorrespondences:
 
     def test_duplicate_ancestor_ranking_by_frequency(self):
         table = [
-            _row("d", "a", "1"),
-            _row("a", "x", "1"),
-            _row("d", "a", "2"),
-            _row("a", "y", "2"),
-            _row("d", "a", "3"),
-            _row("a", "x", "3"),
+            cognate_row("d", "a", "1"),
+            cognate_row("a", "x", "1"),
+            cognate_row("d", "a", "2"),
+            cognate_row("a", "y", "2"),
+            cognate_row("d", "a", "3"),
+            cognate_row("a", "x", "3"),
         ]
         sc = get_sound_correspondences(table, "Uralign")["SoundCorrespondences"]
         assert sc["a"][0] == "x"
@@ -94,14 +89,14 @@ class TestGetSoundCorrespondences:
 
     def test_absolute_frequency_sorted_descending(self):
         table = [
-            _row("d", "x", "1"),
-            _row("a", "p", "1"),
-            _row("d", "x", "2"),
-            _row("a", "p", "2"),
-            _row("d", "x", "3"),
-            _row("a", "p", "3"),
-            _row("d", "y", "4"),
-            _row("a", "q", "4"),
+            cognate_row("d", "x", "1"),
+            cognate_row("a", "p", "1"),
+            cognate_row("d", "x", "2"),
+            cognate_row("a", "p", "2"),
+            cognate_row("d", "x", "3"),
+            cognate_row("a", "p", "3"),
+            cognate_row("d", "y", "4"),
+            cognate_row("a", "q", "4"),
         ]
         freq = get_sound_correspondences(table, "Uralign")["AbsoluteFrequency"]
         counts = list(freq.values())
@@ -111,10 +106,10 @@ class TestGetSoundCorrespondences:
 
     def test_cognateset_ids_deduplicated(self):
         table = [
-            _row("d", "a", "1"),
-            _row("a", "b", "1"),
-            _row("d", "a", "1"),
-            _row("a", "b", "1"),
+            cognate_row("d", "a", "1"),
+            cognate_row("a", "b", "1"),
+            cognate_row("d", "a", "1"),
+            cognate_row("a", "b", "1"),
         ]
         ids = get_sound_correspondences(table, "Uralign")["Cognateset_IDs"]
         assert ids[("a", "b")] == ["1"]
@@ -126,3 +121,23 @@ class TestGetSoundCorrespondences:
         ]
         result = get_sound_correspondences(table, "Alignment")
         assert ("k", "k") in result["AbsoluteFrequency"]
+
+    def test_vocabulary_ids(self):
+        table = [
+            cognate_row("desc", "ɟ ŋ", "1"),
+            cognate_row("anc", "j ŋ", "1"),
+            cognate_row("desc", "ɟ a", "2"),
+            cognate_row("anc", "j a", "2"),
+        ]
+        vocab = SegmentVocabulary()
+        result = get_sound_correspondences(
+            table, "Uralign", "H:", "P:", vocabulary=vocab
+        )
+        expected = get_sound_correspondences(table, "Uralign", "H:", "P:")
+        assert vocab.decode_pairs(result["AbsoluteFrequency"]) == expected[
+            "AbsoluteFrequency"
+        ]
+        key = (vocab.ids["H:ɟ"], vocab.ids["P:j"])
+        assert result["Cognateset_IDs"][key] == ["1", "2"]
+        assert result["Examples"][key] == expected["Examples"][("H:ɟ", "P:j")]
+        assert result["SoundCorrespondences"][vocab.ids["ɟ"]] == [vocab.ids["j"]]
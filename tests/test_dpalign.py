@@ -0,0 +1,120 @@
+"""Tests for loanpy.dpalign."""
+
+import random
+
+import pytest
+
+from loanpy import Cluster, DPAlign, Scorer
+
+FREQ = {
+    ("k", "k"): 5,
+    ("a", "a"): 6,
+    ("a", "o"): 3,
+    ("t", "t"): 4,
+    ("t", "-"): 2,
+    ("-", "n"): 2,
+    ("a", "-"): 2,
+}
+SCORER = Scorer(FREQ, freq_filter=2)
+
+
+def _all_alignments(seq_a, seq_b):
+    if not seq_a and not seq_b:
+        yield [], []
+        return
+    if seq_a and seq_b:
+        for a, b in _all_alignments(seq_a[1:], seq_b[1:]):
+            yield [seq_a[0]] + a, [seq_b[0]] + b
+    if seq_a:
+        for a, b in _all_alignments(seq_a[1:], seq_b):
+            yield [seq_a[0]] + a, ["-"] + b
+    if seq_b:
+        for a, b in _all_alignments(seq_a, seq_b[1:]):
+            yield ["-"] + a, [seq_b[0]] + b
+
+
+class TestDPAlign:
+    def test_finds_optimal_score(self):
+        rng = random.Random(11)
+        aligner = DPAlign(SCORER)
+        for _ in range(100):
+            seq_a = [rng.choice("kat") for _ in range(rng.randint(0, 4))]
+            seq_b = [rng.choice("kaotn") for _ in range(rng.randint(0, 4))]
+            best = max(SCORER.score(a, b) for a, b in _all_alignments(seq_a, seq_b))
+            alm_a, alm_b = aligner.align(seq_a, seq_b)
+            assert [s for s in alm_a if s != "-"] == seq_a
+            assert [s for s in alm_b if s != "-"] == seq_b
+            assert SCORER.score(alm_a, alm_b) == best
+
+    def test_internal_gap(self):
+        alm_a, alm_b = DPAlign(SCORER).align(["k", "a", "t", "a"], ["k", "a", "a"])
+        assert alm_a == ["k", "a", "t", "a"]
+        assert alm_b == ["k", "a", "-", "a"]
+
+    def test_wide_band_equals_unbanded(self):
+        rng = random.Random(12)
+        full, banded = DPAlign(SCORER), DPAlign(SCORER, band=6)
+        for _ in range(50):
+            seq_a = [rng.choice("kat") for _ in range(rng.randint(0, 6))]
+            seq_b = [rng.choice("kaotn") for _ in range(rng.randint(0, 6))]
+            assert banded.align(seq_a, seq_b) == full.align(seq_a, seq_b)
+
+    def test_narrow_band_stays_valid(self):
+        rng = random.Random(13)
+        aligner = DPAlign(SCORER, band=0)
+        for _ in range(50):
+            seq_a = [rng.choice("kat") for _ in range(rng.randint(0, 6))]
+            seq_b = [rng.choice("kaotn") for _ in range(rng.randint(0, 6))]
+            alm_a, alm_b = aligner.align(seq_a, seq_b)
+            assert len(alm_a) == len(alm_b) >= max(len(seq_a), len(seq_b))
+            assert [s for s in alm_a if s != "-"] == seq_a
+            assert [s for s in alm_b if s != "-"] == seq_b
+            offsets, i, j = [], 0, 0
+            for a, b in zip(alm_a, alm_b):
+                i, j = i + (a != "-"), j + (b != "-")
+                offsets.append(j - i)
+            span = len(seq_b) - len(seq_a)
+            assert all(min(0, span) <= d <= max(0, span) for d in offsets)
+
+    def test_ids_path_scores_like_strings(self):
+        aligner = DPAlign(SCORER)
+        seq_a, seq_b = ["k", "a", "t"], ["k", "o"]
+        ids_a, ids_b = aligner.align_ids(*SCORER.encode(seq_a, seq_b))
+        alm_a, alm_b = aligner.align(seq_a, seq_b)
+        assert SCORER.get_score(ids_a, ids_b) == SCORER.score(alm_a, alm_b)
+
+    def test_output_feeds_cluster_gaps(self):
+        aligner = DPAlign(SCORER)
+        assert aligner.align(["a"], ["a"]) == (["a"], ["a"])
+        alm_a, alm_b = Cluster.gaps(*aligner.align(["k", "a", "t", "a"], ["k", "a"]))
+        assert "-" not in alm_b[-1:]
+
+    @pytest.mark.parametrize("band", [None, 0, 2])
+    def test_batch_reuses_tables_without_leaking_scores(self, band):
+        rng = random.Random(13)
+        aligner = DPAlign(SCORER, band=band)
+        pairs = [
+            (
+                [rng.choice("katq") for _ in range(rng.randint(0, 7))],
+                [rng.choice("kaotn") for _ in range(rng.randint(0, 7))],
+            )
+            for _ in range(300)
+        ]
+        # Long pairs first leave stale cells behind for the shorter ones.
+        pairs.sort(key=lambda pair: -len(pair[0]) - len(pair[1]))
+        expected = [aligner.align(a, b) for a, b in pairs]
+        assert aligner.align_many(pairs) == expected
+        encoded = [SCORER.encode(a, b) for a, b in pairs]
+        assert aligner.align_many_ids(encoded) == [
+            aligner.align_ids(a, b) for a, b in encoded
+        ]
+        assert aligner.align_many([]) == []
+
+    def test_does_not_mutate_inputs(self):
+        seq_a, seq_b = ["k", "a"], ["k", "a", "n"]
+        DPAlign(SCORER).align(seq_a, seq_b)
+        assert seq_a == ["k", "a"] and seq_b == ["k", "a", "n"]
+
+    def test_negative_band_raises(self):
+        with pytest.raises(ValueError, match="band"):
+            DPAlign(SCORER, band=-1)
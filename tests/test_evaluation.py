@@ -0,0 +1,71 @@
+"""Tests for loanpy.evaluation."""
+
+from conftest import cognate_row
+
+from loanpy import Uralign, get_held_out_scores, get_sound_correspondences
+
+
+TABLE = [
+    cognate_row("d", "k a t", "1"),
+    cognate_row("a", "k o t", "1"),
+    cognate_row("d", "k a", "2"),
+    cognate_row("a", "k o", "2"),
+    cognate_row("d", "k a p", "3"),
+    cognate_row("a", "k o p", "3"),
+    cognate_row("d", "t a", "3"),
+    cognate_row("a", "t o", "3"),
+    cognate_row("d", "m a", "4"),
+    cognate_row("a", "m o", "4"),
+]
+
+
+def _rerun_scores(table, freq_filter):
+    """Reference: mine without each cognate set, then score its pairs."""
+    out = []
+    for index in range(0, len(table) - 1, 2):
+        cog_id = table[index + 1]["Cognateset_ID"]
+        rest = [
+            row
+            for i in range(0, len(table) - 1, 2)
+            if table[i + 1]["Cognateset_ID"] != cog_id
+            for row in (table[i], table[i + 1])
+        ]
+        scorer = get_sound_correspondences(rest, "Uralign")["AbsoluteFrequency"]
+        out.append(
+            Uralign.get_score(
+                table[index]["Uralign"].split(),
+                table[index + 1]["Uralign"].split(),
+                scorer,
+                freq_filter,
+            )
+        )
+    return out
+
+
+class TestGetHeldOutScores:
+    def test_matches_full_reruns(self):
+        for freq_filter in (0, 1, 2, 3):
+            out = get_held_out_scores(TABLE, "Uralign", freq_filter)
+            scores = [row["Score"] for row in out]
+            assert scores == _rerun_scores(TABLE, freq_filter)
+
+    def test_output_rows_in_table_order(self):
+        out = get_held_out_scores(TABLE, "Uralign")
+        assert [row["Cognateset_ID"] for row in out] == ["1", "2", "3", "3", "4"]
+        assert out[0]["Descendant"] == "k a t"
+        assert out[0]["Ancestor"] == "k o t"
+
+    def test_pair_only_in_own_set_is_penalised(self):
+        out = get_held_out_scores(TABLE, "Uralign", freq_filter=1)
+        # "m < m" is attested only in set 4
+        assert out[-1]["Score"] == -1000 + 4
+
+    def test_prefixes_do_not_change_scores(self):
+        plain = get_held_out_scores(TABLE, "Uralign")
+        prefixed = get_held_out_scores(
+            TABLE, "Uralign", prefix_descendant="H:", prefix_ancestor="P:"
+        )
+        assert [r["Score"] for r in plain] == [r["Score"] for r in prefixed]
+
+    def test_empty_table(self):
+        assert get_held_out_scores([], "Uralign") == []
@@ -0,0 +1,143 @@
+"""Tests for loanpy.instrument."""
+
+import json
+
+import pytest
+
+import loanpy.adapt
+import loanpy.edit
+from loanpy import (
+    Adapt,
+    Instrumentation,
+    LoanwordSearch,
+    ResultCache,
+    Uralign,
+    apply_edit,
+    expand_phonotactics,
+)
+
+FREQ = {
+    ("k", "k"): 4,
+    ("a", "a"): 6,
+    ("a", "o"): 3,
+    ("t", "t"): 5,
+    ("t", "d"): 2,
+}
+TEMPLATES = ["C V", "C V C", "C V C V", "V C V"]
+DONORS = [
+    ("d0", ["k", "o", "d"], ["C", "V", "C"]),
+    ("d1", ["d", "o", "k"], ["C", "V", "C"]),
+    ("d2", ["o", "k"], ["V", "C"]),
+]
+RECIPIENTS = [
+    ("r0", ["k", "a", "t"], ["C", "V", "C"]),
+    ("r1", ["t", "a"], ["C", "V"]),
+]
+
+
+def _adapt():
+    adapt = Adapt()
+    adapt.substitutions = {"d": "t"}
+    return adapt
+
+
+def _originals():
+    return (
+        loanpy.adapt.get_closest_phonotactics,
+        loanpy.edit.apply_edit,
+        Adapt.__dict__["repair"],
+        Uralign.__dict__["get_score"],
+    )
+
+
+class TestInstrumentation:
+    def test_counts_nested_stages(self):
+        adapt = _adapt()
+        with Instrumentation() as stats:
+            adapt.repair(["k", "o", "t", "a", "k"], list("CVCVC"), TEMPLATES)
+        functions = stats.to_dict()["functions"]
+        for label in (
+            "Adapt.repair",
+            "get_closest_phonotactics",
+            "edit_distance_matrix",
+            "shortest_edit_path",
+            "path_to_edit_operations",
+            "substitute_operations",
+            "apply_edit",
+        ):
+            assert functions[label]["calls"] == 1
+        assert functions["edit_distance_with2ops"]["calls"] == len(TEMPLATES)
+        repair = functions["Adapt.repair"]
+        assert 0 <= repair["self_s"] < repair["total_s"]
+        closest = functions["get_closest_phonotactics"]
+        assert repair["total_s"] >= closest["total_s"] >= closest["self_s"]
+
+    def test_disabled_leaves_no_wrappers(self):
+        before = _originals()
+        stats = Instrumentation()
+        with stats:
+            assert _originals() != before
+            assert loanpy.apply_edit is not before[1]
+            # Modules outside the package keep what they imported.
+            assert apply_edit is before[1]
+        assert _originals() == before
+        assert loanpy.apply_edit is before[1]
+        _adapt().repair(["k", "o"], ["C", "V"], TEMPLATES)
+        assert stats.to_dict()["functions"] == {}
+
+    def test_search_and_profile_cache(self):
+        search = LoanwordSearch(FREQ, _adapt(), TEMPLATES, k=2)
+        plain = LoanwordSearch(FREQ, _adapt(), TEMPLATES, k=2)
+        expected = list(plain.search(DONORS, RECIPIENTS))
+        with Instrumentation() as stats:
+            assert list(search.search(DONORS, RECIPIENTS)) == expected
+        data = stats.to_dict()
+        assert data["functions"]["LoanwordSearch.adapt_word"]["calls"] == 3
+        assert data["functions"]["PreparedRecipients.scores"]["calls"] == 3
+        # d0 and d1 share the C V C profile; d2 needs its own repair.
+        assert data["caches"]["LoanwordSearch.repaired_profiles"] == {
+            "hits": 1,
+            "misses": 2,
+            "hit_rate": pytest.approx(1 / 3),
+        }
+        assert (search.profile_hits, search.profile_misses) == (1, 2)
+
+    def test_result_cache_hits(self, tmp_path):
+        cache = ResultCache(tmp_path)
+        with Instrumentation() as stats:
+            for _ in range(3):
+                expand_phonotactics("(C)V+CV", cache)
+        assert stats.to_dict()["caches"]["ResultCache.expand_phonotactics"] == {
+            "hits": 2,
+            "misses": 1,
+            "hit_rate": pytest.approx(2 / 3),
+        }
+
+    def test_static_methods_and_extra_targets(self):
+        with Instrumentation(extra=["loanpy.cluster.Cluster.cv"]) as stats:
+            Uralign.get_score(["k", "a"], ["k", "a"], FREQ)
+            loanpy.Cluster.cv(["k", "a"], ["C", "V"])
+        functions = stats.to_dict()["functions"]
+        assert functions["Uralign.get_score"]["calls"] == 1
+        assert functions["Cluster.cv"]["calls"] == 1
+
+    def test_export_and_reset(self):
+        stats = Instrumentation()
+        with stats:
+            _adapt().substitute(["d", "a"])
+        data = json.loads(stats.to_json())
+        assert data["functions"]["Adapt.substitute"]["calls"] == 1
+        assert data["elapsed_s"] > 0
+        stats.reset()
+        assert stats.to_dict() == {"elapsed_s": 0.0, "functions": {}, "caches": {}}
+        with stats:
+            _adapt().substitute(["d", "a"])
+        assert stats.to_dict()["functions"]["Adapt.substitute"]["calls"] == 1
+
+    def test_one_instance_at_a_time(self):
+        with Instrumentation():
+            with pytest.raises(RuntimeError, match="already enabled"):
+                Instrumentation().enable()
+        with pytest.raises(ValueError, match="not found"):
+            Instrumentation(extra=["loanpy.edit.no_such_function"]).enable()
+        assert _originals()[1] is loanpy.edit.apply_edit
@@ -0,0 +1,105 @@
+"""Tests for loanpy.pipeline."""
+
+import random
+
+import pytest
+from conftest import random_words
+
+from loanpy import Adapt, LoanwordPipeline, LoanwordSearch
+
+FREQ = {
+    ("k", "k"): 4,
+    ("a", "a"): 6,
+    ("a", "o"): 3,
+    ("t", "t"): 5,
+    ("t", "d"): 2,
+    ("#-", "-"): 3,
+    ("i", "i"): 2,
+    ("-#", "a"): 2,
+}
+TEMPLATES = ["C V", "C V C", "C V C V", "V C V"]
+
+
+class CountingAdapt(Adapt):
+    def __init__(self):
+        self.substitutions = {"d": "t", "h": ""}
+        self.calls = 0
+
+    def substitute(self, segments):
+        self.calls += 1
+        return super().substitute(segments)
+
+
+@pytest.fixture
+def wordlists():
+    rng = random.Random(45)
+    donors = random_words(rng, 30, "kathdo", "d")
+    donors += [
+        (f"dup{i}", segments, profile)
+        for i, (_, segments, profile) in enumerate(donors[:10])
+    ]
+    rng.shuffle(donors)
+    recipients = random_words(rng, 40, "katoi", "r")
+    return donors, recipients
+
+
+class TestLoanwordPipeline:
+    @pytest.mark.parametrize("processes", [1, 2])
+    def test_matches_loanword_search(self, wordlists, processes):
+        donors, recipients = wordlists
+        search = LoanwordSearch(FREQ, CountingAdapt(), TEMPLATES, k=3, chunk_size=7)
+        pipeline = LoanwordPipeline(
+            FREQ,
+            CountingAdapt(),
+            TEMPLATES,
+            processes=processes,
+            donor_chunk_size=4,
+            k=3,
+            chunk_size=7,
+        )
+        assert list(pipeline.run(iter(donors), recipients)) == list(
+            search.search(donors, recipients)
+        )
+        assert pipeline.run_global(donors, recipients) == search.search_global(
+            donors, recipients
+        )
+
+    def test_identical_donor_forms_are_adapted_once(self, wordlists):
+        donors, recipients = wordlists
+        adapt = CountingAdapt()
+        pipeline = LoanwordPipeline(FREQ, adapt, TEMPLATES, donor_chunk_size=3)
+        results = list(pipeline.run(donors, recipients))
+        distinct = {(tuple(seg), tuple(cv)) for _, seg, cv in donors}
+        assert adapt.calls == len(distinct) < len(donors)
+        assert [donor_id for donor_id, _ in results] == [d for d, _, _ in donors]
+
+    def test_streams_donors_in_chunks(self, wordlists):
+        donors, recipients = wordlists
+        consumed = []
+
+        def stream():
+            for donor in donors:
+                consumed.append(donor[0])
+                yield donor
+
+        pipeline = LoanwordPipeline(FREQ, donor_chunk_size=5, k=1)
+        donor_id, matches = next(pipeline.run(stream(), recipients))
+        assert donor_id == donors[0][0]
+        assert len(matches) == 1
+        assert len(consumed) == 5
+
+    def test_blocking_and_min_score_are_passed_on(self, wordlists):
+        donors, recipients = wordlists
+        search = LoanwordSearch(FREQ, min_score=0, blocking=True, k=5)
+        pipeline = LoanwordPipeline(
+            FREQ, processes=2, min_score=0, blocking=True, k=5
+        )
+        assert list(pipeline.run(donors, recipients)) == list(
+            search.search(donors, recipients)
+        )
+
+    def test_invalid_parameters(self):
+        with pytest.raises(ValueError, match="donor_chunk_size"):
+            LoanwordPipeline(FREQ, donor_chunk_size=0)
+        with pytest.raises(ValueError, match="k must"):
+            LoanwordPipeline(FREQ, k=0)
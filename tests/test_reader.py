@@ -0,0 +1,76 @@
+"""Tests for loanpy.reader."""
+
+import csv
+import io
+import random
+
+import pytest
+
+from loanpy import get_sound_correspondences, iter_chunks, iter_rows, read_table
+
+
+def _write(tmp_path, text, name="t.csv", encoding="utf-8"):
+    path = tmp_path / name
+    path.write_bytes(text.encode(encoding))
+    return path
+
+
+class TestReader:
+    @pytest.mark.parametrize("use_mmap", [False, True])
+    def test_matches_dictreader_on_quoted_and_ragged_rows(self, tmp_path, use_mmap):
+        rng = random.Random(0)
+        fields = ["x", "y z", 'q"t', "m\nn", "p,r", "", "u\r\nv"]
+        for _ in range(50):
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(["a", "b", "c", "d"])
+            for _ in range(rng.randint(0, 30)):
+                if rng.random() < 0.1:
+                    buffer.write("\n")
+                else:
+                    writer.writerow(
+                        [rng.choice(fields) for _ in range(rng.randint(0, 4))]
+                    )
+            text = buffer.getvalue()
+            path = _write(tmp_path, text)
+            expected = [
+                (row["d"] or "", row["b"] or "")
+                for row in csv.DictReader(io.StringIO(text, newline=""))
+            ]
+            for chunk_size in (1, 3, 100):
+                rows = iter_rows(path, ["d", "b"], chunk_size, use_mmap)
+                assert list(rows) == expected
+
+    def test_chunks_and_single_column(self, tmp_path):
+        text = "ID,Form\r\n" + "".join(f"{i},f{i}\r\n" for i in range(5))
+        path = _write(tmp_path, text)
+        chunks = list(iter_chunks(path, ["Form"], chunk_size=2))
+        assert chunks == [[("f0",), ("f1",)], [("f2",), ("f3",)], [("f4",)]]
+
+    def test_bom_delimiter_and_errors(self, tmp_path):
+        path = _write(tmp_path, "\ufeffID\tForm\n1\tka\n", encoding="utf-8")
+        assert list(iter_rows(path, ["ID", "Form"], delimiter="\t")) == [("1", "ka")]
+        with pytest.raises(ValueError, match="Gloss"):
+            list(iter_rows(path, ["Gloss"], delimiter="\t"))
+        with pytest.raises(ValueError):
+            list(iter_rows(path, []))
+        empty = _write(tmp_path, "", name="empty.csv")
+        for use_mmap in (False, True):
+            with pytest.raises(ValueError):
+                list(iter_rows(empty, ["ID"], use_mmap=use_mmap))
+
+    def test_read_table_feeds_correspondences(self, tmp_path):
+        rows = [
+            {"ID": "1", "Language_ID": "H", "Cognateset_ID": "c1", "Uralign": "k a"},
+            {"ID": "2", "Language_ID": "U", "Cognateset_ID": "c1", "Uralign": "k o"},
+        ]
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+        path = _write(tmp_path, buffer.getvalue())
+        table = read_table(path, ["Language_ID", "Cognateset_ID", "Uralign"])
+        assert table[0] == {"Language_ID": "H", "Cognateset_ID": "c1", "Uralign": "k a"}
+        assert get_sound_correspondences(table, "Uralign") == (
+            get_sound_correspondences(rows, "Uralign")
+        )
@@ -0,0 +1,107 @@
+"""Tests for loanpy.scorer."""
+
+import random
+from collections import defaultdict
+
+from loanpy import PRUNED, Scorer, Uralign
+
+FREQ = {("a", "x"): 5, ("b", "y"): 3, ("a", "y"): 1, ("c", "z"): 2}
+
+
+class TestScorer:
+    def test_matches_dict_path_on_random_alignments(self):
+        rng = random.Random(1)
+        for freq_filter in (0, 1, 2, 3, 6):
+            scorer = Scorer(FREQ, freq_filter)
+            for _ in range(200):
+                n = rng.randint(0, 6)
+                seq_a = [rng.choice("abcq") for _ in range(n)]
+                seq_b = [rng.choice("xyzq") for _ in range(n)]
+                expected = Uralign.get_score(seq_a, seq_b, FREQ, freq_filter)
+                assert scorer.score(seq_a, seq_b) == expected
+
+    def test_get_score_takes_id_arrays(self):
+        scorer = Scorer(FREQ, freq_filter=2)
+        ids_a, ids_b = scorer.encode(["a", "b"], ["x", "y"])
+        assert all(isinstance(i, int) for i in ids_a + ids_b)
+        assert scorer.get_score(ids_a, ids_b) == 8
+
+    def test_unknown_segments_map_to_penalty_id(self):
+        scorer = Scorer(FREQ)
+        ids_a, ids_b = scorer.encode(["q"], ["x"])
+        assert ids_a == [0]
+        assert scorer.get_score(ids_a, ids_b) == -1000
+
+    def test_below_threshold_baked_in(self):
+        assert Scorer(FREQ, freq_filter=2).score(["a"], ["y"]) == -1000
+        assert Scorer(FREQ, freq_filter=1).score(["a"], ["y"]) == 1
+
+    def test_max_weight(self):
+        assert Scorer(FREQ, freq_filter=2).max_weight == 5
+        assert Scorer({}, freq_filter=2).max_weight == -1000
+
+    def test_float_weights_identical(self):
+        freq = {("a", "x"): 0.5, ("b", "y"): 2.25}
+        seq_a, seq_b = ["a", "b", "b"], ["x", "y", "y"]
+        expected = Uralign.get_score(seq_a, seq_b, freq, freq_filter=0.1)
+        assert Scorer(freq, freq_filter=0.1).score(seq_a, seq_b) == expected
+
+    def test_accepts_defaultdict_scorer(self):
+        freq = defaultdict(lambda: -1000, FREQ)
+        assert Scorer(freq).score(["a", "c"], ["x", "z"]) == 7
+
+    def test_empty_alignment_zero(self):
+        assert Scorer(FREQ).get_score([], []) == 0
+
+
+class TestScorerScore:
+    def test_matches_uralign_on_hu_alignments(self):
+        rng = random.Random(2)
+        words = [
+            (
+                [rng.choice("abcq") for _ in range(rng.randint(0, 7))],
+                [rng.choice("xyzq") for _ in range(rng.randint(0, 7))],
+                rng.choice("CV"),
+                rng.choice("CV"),
+            )
+            for _ in range(300)
+        ]
+        for freq in (FREQ, {pair: weight / 4 for pair, weight in FREQ.items()}):
+            scorer = Scorer(freq, freq_filter=1)
+            for seq_a, seq_b in Uralign.hu_many(words):
+                expected = Uralign.get_score(seq_a, seq_b, freq, 1)
+                assert scorer.score(seq_a, seq_b) == expected
+
+    def test_one_lookup_per_pair(self):
+        scorer = Scorer(FREQ, freq_filter=2)
+        # Pairs without a weight of their own all fall back to the penalty.
+        assert scorer._pair_weights == {("a", "x"): 5, ("b", "y"): 3, ("c", "z"): 2}
+        assert scorer.score(["a", "b", "+"], ["x"]) == 5
+        assert scorer.score([], []) == 0
+
+
+class TestScorerMinScore:
+    def test_matches_uralign_bounded_scores(self):
+        rng = random.Random(3)
+        scorer = Scorer(FREQ, freq_filter=2)
+        for _ in range(200):
+            n = rng.randint(0, 5)
+            seq_a = [rng.choice("abc") for _ in range(n)]
+            seq_b = [rng.choice("xyz") for _ in range(n)]
+            for min_score in (-2000, 0, 5):
+                expected = Uralign.get_score(seq_a, seq_b, FREQ, 2, min_score=min_score)
+                ids_a, ids_b = scorer.encode(seq_a, seq_b)
+                assert scorer.get_score(ids_a, ids_b, min_score=min_score) == expected
+
+    def test_sentinel(self):
+        scorer = Scorer(FREQ, freq_filter=2)
+        ids_a, ids_b = scorer.encode(["q", "a"], ["q", "x"])
+        assert scorer.get_score(ids_a, ids_b, min_score=0) == PRUNED
+
+    def test_float_weights_and_pruned_are_floats(self):
+        scorer = Scorer({pair: weight / 2 for pair, weight in FREQ.items()}, 1)
+        ids_a, ids_b = scorer.encode(["a", "b"], ["x", "y"])
+        assert scorer.get_score(ids_a, ids_b) == 4.0
+        assert isinstance(scorer.get_score(ids_a, ids_b), float)
+        pruned = scorer.get_score(ids_a, ids_b, min_score=10)
+        assert pruned == PRUNED and isinstance(pruned, float)
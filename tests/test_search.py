@@ -0,0 +1,172 @@
+"""Tests for loanpy.search."""
+
+import random
+
+import pytest
+from conftest import random_words
+
+from loanpy import Adapt, LoanwordSearch, Scorer, Uralign
+
+FREQ = {
+    ("k", "k"): 4,
+    ("a", "a"): 6,
+    ("a", "o"): 3,
+    ("t", "t"): 5,
+    ("t", "d"): 2,
+    ("#-", "-"): 3,
+    ("i", "i"): 2,
+    ("-#", "a"): 2,
+}
+TEMPLATES = ["C V", "C V C", "C V C V", "V C V"]
+
+
+def _adapt():
+    ad = Adapt()
+    ad.substitutions = {"d": "t", "h": ""}
+    return ad
+
+
+def _brute_force(donors, recipients, ad, templates):
+    table = []
+    for donor_id, segments, profile in donors:
+        kept = [
+            cv for seg, cv in zip(segments, profile) if ad.substitutions.get(seg, seg)
+        ]
+        adapted = ad.substitute(segments)
+        if adapted:
+            repaired_profile = ad.repair(kept, kept, templates)
+            adapted = ad.repair(adapted, kept, templates)
+        else:
+            repaired_profile = kept
+        for recipient_id, rec_segments, rec_profile in recipients:
+            alm_r, alm_d = Uralign.hu(
+                rec_segments.copy(),
+                adapted.copy(),
+                rec_profile[0],
+                repaired_profile[0] if repaired_profile else "",
+            )
+            score = Uralign.get_score(alm_r, alm_d, FREQ)
+            table.append((donor_id, recipient_id, score))
+    return table
+
+
+@pytest.fixture
+def wordlists():
+    rng = random.Random(7)
+    donors = random_words(rng, 15, "kathdo", "d")
+    recipients = random_words(rng, 40, "katoi", "r")
+    return donors, recipients
+
+
+class TestLoanwordSearch:
+    def test_per_donor_top_k_matches_brute_force(self, wordlists):
+        donors, recipients = wordlists
+        table = _brute_force(donors, recipients, _adapt(), TEMPLATES)
+        search = LoanwordSearch(FREQ, _adapt(), TEMPLATES, k=3, chunk_size=7)
+        results = dict(search.search(donors, recipients))
+        order = {rid: i for i, (rid, _, _) in enumerate(recipients)}
+        for donor_id, _, _ in donors:
+            rows = [(r, s) for d, r, s in table if d == donor_id]
+            expected = sorted(rows, key=lambda rs: (-rs[1], order[rs[0]]))[:3]
+            assert results[donor_id] == expected
+
+    def test_global_top_k_matches_brute_force(self, wordlists):
+        donors, recipients = wordlists
+        table = _brute_force(donors, recipients, _adapt(), TEMPLATES)
+        search = LoanwordSearch(Scorer(FREQ), _adapt(), TEMPLATES, k=10, chunk_size=4)
+        expected = sorted(table, key=lambda row: -row[2])[:10]
+        assert search.search_global(iter(donors), recipients) == expected
+
+    @pytest.mark.parametrize("initial_gap", [True, False])
+    @pytest.mark.parametrize("final_gap", [True, False])
+    @pytest.mark.parametrize("weight", [1, 0.25])
+    def test_every_score_matches_uralign(self, initial_gap, final_gap, weight):
+        rng = random.Random(32)
+        recipients = random_words(rng, 60, "katoi", "r") + [("empty", [], [])]
+        donors = random_words(rng, 20, "katoi", "d") + [("empty", [], [])]
+        tokens = ["k", "a", "t", "o", "i", "#-", "-", "-#", "+", "a.t", "t.a"]
+        freq = {
+            (rng.choice(tokens), rng.choice(tokens)): rng.randint(0, 9) * weight
+            for _ in range(60)
+        }
+        search = LoanwordSearch(
+            freq,
+            k=len(recipients),
+            initial_gap=initial_gap,
+            final_gap=final_gap,
+            chunk_size=16,
+        )
+        for donor_id, matches in search.search(donors, recipients):
+            _, segments, profile = next(d for d in donors if d[0] == donor_id)
+            expected = {
+                recipient_id: Uralign.get_score(
+                    *Uralign.hu_many(
+                        [(rec, segments, "".join(rec_cv[:1]), "".join(profile[:1]))],
+                        initial_gap,
+                        final_gap,
+                    )[0],
+                    freq,
+                )
+                for recipient_id, rec, rec_cv in recipients
+            }
+            assert dict(matches) == expected
+
+    @pytest.mark.parametrize("blocking", [False, True])
+    def test_public_steps_match_search(self, wordlists, blocking):
+        donors, recipients = wordlists
+        search = LoanwordSearch(FREQ, _adapt(), TEMPLATES, k=4, blocking=blocking)
+        ids, words = search.prepare(recipients)
+        assert ids == [recipient_id for recipient_id, _, _ in recipients]
+        index = search.build_index(words)
+        assert (index is not None) == blocking
+        for (donor_id, matches), (_, segments, profile) in zip(
+            search.search(donors, recipients), donors
+        ):
+            adapted = search.adapt_word(segments, profile)
+            ranked = search.rank(*adapted, words, index)
+            assert [(ids[i], score) for i, score in ranked] == matches
+            scored = {
+                i: score
+                for chunk, scores in search.scored_chunks(*adapted, words, index)
+                for i, score in zip(chunk, scores)
+            }
+            assert all(scored[i] == score for i, score in ranked)
+
+    def test_min_score_filters_matches(self, wordlists):
+        donors, recipients = wordlists
+        search = LoanwordSearch(FREQ, _adapt(), TEMPLATES, k=50, min_score=0)
+        for _, matches in search.search(donors, recipients):
+            assert all(score >= 0 for _, score in matches)
+
+    def test_streams_donors_lazily(self, wordlists):
+        donors, recipients = wordlists
+        search = LoanwordSearch(FREQ, k=1)
+        stream = search.search(iter(donors), recipients)
+        donor_id, matches = next(stream)
+        assert donor_id == "d0"
+        assert len(matches) == 1
+
+    def test_without_adaptation_uses_segments_as_given(self):
+        search = LoanwordSearch(FREQ, k=1)
+        donors = [("d", ["k", "a", "t"], ["C", "V", "C"])]
+        recipients = [("r", ["k", "a", "t"], ["C", "V", "C"])]
+        assert list(search.search(donors, recipients)) == [("d", [("r", 15)])]
+
+    def test_invalid_parameters(self):
+        with pytest.raises(ValueError, match="k must"):
+            LoanwordSearch(FREQ, k=0)
+        with pytest.raises(ValueError, match="chunk_size"):
+            LoanwordSearch(FREQ, chunk_size=0)
+
+    def test_blocking_keeps_all_positive_matches(self, wordlists):
+        donors, recipients = wordlists
+        plain = LoanwordSearch(FREQ, _adapt(), TEMPLATES, k=5, min_score=0)
+        blocked = LoanwordSearch(
+            FREQ, _adapt(), TEMPLATES, k=5, min_score=0, blocking=True, chunk_size=3
+        )
+        assert list(blocked.search(donors, recipients)) == list(
+            plain.search(donors, recipients)
+        )
+        assert blocked.search_global(donors, recipients) == plain.search_global(
+            donors, recipients
+        )
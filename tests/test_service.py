@@ -0,0 +1,273 @@
+"""Tests for loanpy.service, over localhost only."""
+
+import asyncio
+import json
+import random
+import socket
+import threading
+
+import pytest
+from conftest import random_words
+
+from loanpy import Adapt, LoanwordSearch, ScoringService
+
+FREQ = {
+    ("k", "k"): 4,
+    ("a", "a"): 6,
+    ("a", "o"): 3,
+    ("t", "t"): 5,
+    ("t", "d"): 2,
+    ("#-", "-"): 3,
+    ("i", "i"): 2,
+    ("-#", "a"): 2,
+}
+TEMPLATES = ["C V", "C V C", "C V C V", "V C V"]
+
+
+def _search():
+    adapt = Adapt()
+    adapt.substitutions = {"d": "t", "h": ""}
+    return LoanwordSearch(FREQ, adapt, TEMPLATES, k=3)
+
+
+@pytest.fixture
+def wordlists():
+    rng = random.Random(46)
+    return random_words(rng, 12, "kathdo", "d"), random_words(rng, 30, "katoi", "r")
+
+
+async def _request(reader, writer, method, path, payload=None, close=False):
+    body = b"" if payload is None else json.dumps(payload).encode()
+    writer.write(
+        (
+            f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            + ("Connection: close\r\n" if close else "")
+            + "\r\n"
+        ).encode()
+        + body
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while (line := await reader.readline()).strip():
+        name, _, value = line.decode().partition(":")
+        headers[name.lower()] = value.strip()
+    data = await reader.readexactly(int(headers["content-length"]))
+    return status, json.loads(data)
+
+
+class TestScoringService:
+    def test_concurrent_requests_are_batched(self, wordlists):
+        donors, recipients = wordlists
+        expected = list(_search().search(donors * 3, recipients))
+
+        async def main():
+            service = ScoringService(_search(), recipients, max_batch=8)
+            results = await asyncio.gather(
+                *(service.score(seg, cv) for _, seg, cv in donors * 3)
+            )
+            stats = service.stats()
+            await service.close()
+            return results, stats
+
+        results, stats = asyncio.run(main())
+        assert results == [matches for _, matches in expected]
+        assert stats["requests"] == len(donors) * 3
+        assert stats["batches"] < stats["requests"]
+        assert stats["mean_batch_size"] > 1
+        assert stats["errors"] == 0
+        assert stats["latency_ms"]["max"] >= stats["latency_ms"]["p50"] > 0
+
+    def test_errors_reach_every_request_of_the_batch(self, wordlists):
+        _, recipients = wordlists
+
+        async def main():
+            service = ScoringService(_search(), recipients)
+            service.search.adapt.substitutions = None
+            results = await asyncio.gather(
+                service.score(["k"], ["C"]),
+                service.score(["a"], ["V"]),
+                return_exceptions=True,
+            )
+            stats = service.stats()
+            await service.close()
+            return results, stats
+
+        results, stats = asyncio.run(main())
+        assert all(isinstance(result, AttributeError) for result in results)
+        assert stats["errors"] == 2
+
+    def test_http_endpoints(self, wordlists):
+        donors, recipients = wordlists
+        expected = dict(_search().search(donors, recipients))
+
+        async def main():
+            service = ScoringService(_search(), recipients)
+            server = await service.start()
+            host, port = server.sockets[0].getsockname()[:2]
+            reader, writer = await asyncio.open_connection(host, port)
+            responses = []
+            for _, segments, profile in donors[:2]:
+                payload = {"segments": " ".join(segments), "cv_profile": profile}
+                responses.append(
+                    await _request(reader, writer, "POST", "/score", payload)
+                )
+            responses.append(await _request(reader, writer, "GET", "/stats"))
+            responses.append(await _request(reader, writer, "GET", "/nope"))
+            responses.append(await _request(reader, writer, "GET", "/score"))
+            responses.append(
+                await _request(reader, writer, "POST", "/score", {"x": 1}, close=True)
+            )
+            closed = await reader.read() == b""
+            writer.close()
+            server.close()
+            await server.wait_closed()
+            await service.close()
+            return responses, closed
+
+        responses, closed = asyncio.run(main())
+        (s1, r1), (s2, r2), (s3, stats), (s4, _), (s5, _), (s6, error) = responses
+        assert (s1, s2, s3, s4, s5, s6) == (200, 200, 200, 404, 405, 400)
+        for (donor_id, _, _), matches in zip(donors, (r1, r2)):
+            assert [tuple(m) for m in matches["matches"]] == expected[donor_id]
+        assert stats["requests"] == 2
+        assert "segments" in error["error"]
+        assert closed
+
+    def test_bad_forms_and_server_errors(self, wordlists):
+        donors, recipients = wordlists
+        _, segments, profile = donors[0]
+        bad = [
+            {"segments": 5, "cv_profile": "C"},
+            {"segments": [["x"]], "cv_profile": ["C"]},
+            {"segments": ["k", "a"], "cv_profile": ["C"]},
+        ]
+
+        async def main():
+            service = ScoringService(_search(), recipients)
+            server = await service.start()
+            host, port = server.sockets[0].getsockname()[:2]
+            reader, writer = await asyncio.open_connection(host, port)
+            responses = [
+                await _request(reader, writer, "POST", "/score", payload)
+                for payload in bad
+            ]
+            valid = {"segments": segments, "cv_profile": profile}
+            responses.append(await _request(reader, writer, "POST", "/score", valid))
+            service.search.adapt.substitutions = None
+            responses.append(await _request(reader, writer, "POST", "/score", valid))
+
+            async def broken(*args):
+                raise KeyError("boom")
+
+            service._dispatch = broken
+            responses.append(await _request(reader, writer, "GET", "/stats"))
+            writer.close()
+            server.close()
+            await server.wait_closed()
+            stats = service.stats()
+            await service.close()
+            return responses, stats
+
+        responses, stats = asyncio.run(main())
+        statuses = [status for status, _ in responses]
+        assert statuses == [400, 400, 400, 200, 500, 500]
+        assert "differ in length" in responses[2][1]["error"]
+        assert stats["errors"] == 2
+        with pytest.raises(ValueError, match="list of strings"):
+            asyncio.run(ScoringService(_search(), recipients).score(5, "C"))
+
+    def test_batch_failure_keeps_batcher_running(self, wordlists):
+        donors, recipients = wordlists
+        _, segments, profile = donors[0]
+
+        async def main():
+            service = ScoringService(_search(), recipients)
+            service._ensure_batcher()
+            batcher = service._batcher
+            future = asyncio.get_running_loop().create_future()
+            # An unhashable form that bypassed validation fails its batch only.
+            await service._queue.put(((["x"],), future))
+            results = await asyncio.gather(
+                future, service.score(segments, profile), return_exceptions=True
+            )
+            again = await service.score(segments, profile)
+            alive = service._batcher is batcher and not batcher.done()
+            await service.close()
+            return results, again, alive
+
+        (failed, second), again, alive = asyncio.run(main())
+        assert isinstance(failed, TypeError)
+        assert isinstance(second, TypeError) or second == again
+        assert again and alive
+
+    def test_restarted_batcher_answers_queued_requests(self, wordlists):
+        donors, recipients = wordlists
+        forms = [(segments, profile) for _, segments, profile in donors[:4]]
+        expected = dict(_search().search(donors[:4], recipients))
+
+        async def main():
+            service = ScoringService(_search(), recipients, max_batch=1)
+            entered, release = threading.Event(), threading.Event()
+            rank = service._rank_each
+
+            def slow_rank(batch_forms):
+                entered.set()
+                release.wait(5)
+                return rank(batch_forms)
+
+            service._rank_each = slow_rank
+            service._ensure_batcher()
+            queue, batcher = service._queue, service._batcher
+            first = asyncio.ensure_future(service.score(*forms[0]))
+            queued = [asyncio.ensure_future(service.score(*f)) for f in forms[1:3]]
+            await asyncio.get_running_loop().run_in_executor(None, entered.wait, 5)
+            # The task dies mid-batch with requests still waiting in the queue.
+            batcher.cancel()
+            await asyncio.gather(batcher, return_exceptions=True)
+            release.set()
+            last = await service.score(*forms[3])
+            results = await asyncio.wait_for(asyncio.gather(*queued), 5)
+            same_queue = service._queue is queue
+            await service.close()
+            return first, results + [last], same_queue
+
+        first, results, same_queue = asyncio.run(main())
+        assert first.cancelled()
+        assert results == [expected[donor_id] for donor_id, _, _ in donors[1:4]]
+        assert same_queue
+
+    @pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix sockets")
+    def test_unix_socket(self, wordlists, tmp_path):
+        donors, recipients = wordlists
+        _, segments, profile = donors[0]
+
+        async def main():
+            service = ScoringService(_search(), recipients)
+            path = str(tmp_path / "loanpy.sock")
+            server = await service.start(path=path)
+            reader, writer = await asyncio.open_unix_connection(path)
+            response = await _request(
+                reader,
+                writer,
+                "POST",
+                "/score",
+                {"segments": segments, "cv_profile": "".join(profile)},
+                close=True,
+            )
+            writer.close()
+            server.close()
+            await server.wait_closed()
+            await service.close()
+            return response
+
+        status, body = asyncio.run(main())
+        assert status == 200
+        assert [tuple(m) for m in body["matches"]] == dict(
+            _search().search(donors[:1], recipients)
+        )[donors[0][0]]
+
+    def test_invalid_parameters(self):
+        with pytest.raises(ValueError, match="max_batch"):
+            ScoringService(_search(), [], max_batch=0)
@@ -0,0 +1,121 @@
+"""Tests for loanpy.sharedmem."""
+
+import gc
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import pytest
+
+from loanpy import Scorer, SharedLexicon, SharedScorer, Uralign
+from loanpy import sharedmem
+
+FREQ = {("k", "k"): 5, ("a", "a"): 6, ("t", "t"): 4, ("a", "o"): 1, ("-", "a"): 2}
+WORDS = [(["k", "a", "t"], ["C", "V", "C"]), ([], []), (["a", "t", "a"], "VCV")]
+
+
+def _score_in_worker(scorer_name, lexicon_name, index, donor):
+    with SharedScorer.attach(scorer_name) as shared:
+        with SharedLexicon.attach(lexicon_name) as lexicon:
+            segments, cv_profile = lexicon[index]
+            alignment = Uralign.hu_many(
+                [(segments, donor, cv_profile[0], "C")]
+            )
+            return [shared.scorer.score(*pair) for pair in alignment]
+
+
+class TestSharedBlock:
+    def test_header_growth_keeps_arrays_apart(self):
+        # Offsets past 255 pickle one byte longer each, which grows the header
+        # and pushes the offsets further; sweep headers across that step.
+        arrays = {f"a{i}": array("b", [i]) for i in range(10)}
+        for pad in range(300):
+            block = sharedmem.SharedBlock._create({"pad": "x" * pad}, arrays, None)
+            with block:
+                assert block.header == {"pad": "x" * pad}
+                for key, values in arrays.items():
+                    assert block.arrays[key].tolist() == values.tolist()
+
+
+class TestSharedScorer:
+    @pytest.mark.parametrize("freq", [FREQ, {**FREQ, ("a", "a"): 6.5}])
+    def test_attached_scorer_matches(self, freq):
+        scorer = Scorer(freq)
+        with SharedScorer.publish(scorer) as shared:
+            attached = SharedScorer.attach(shared.name)
+            view = attached.scorer
+            assert view.descendant_ids == scorer.descendant_ids
+            assert view.ancestor_ids == scorer.ancestor_ids
+            assert view.max_weight == scorer.max_weight
+            for seqA, seqB in [("kat", "kat"), ("-at", "aot"), ("x", "k")]:
+                assert view.score(seqA, seqB) == scorer.score(seqA, seqB)
+            assert view.get_score([1, 2], [1, 0]) == scorer.get_score([1, 2], [1, 0])
+            attached.close()
+
+    def test_attach_without_with_block(self, monkeypatch):
+        unraisable = []
+        monkeypatch.setattr(sys, "unraisablehook", unraisable.append)
+        with SharedScorer.publish(Scorer(FREQ)) as shared:
+            # The pattern of the module docstring's init_worker.
+            handle = SharedScorer.attach(shared.name)
+            scorer = handle.scorer
+            gc.collect()
+            assert scorer.score("k", "k") == 5
+            handle.close()
+            del handle, scorer
+            gc.collect()
+        assert not unraisable
+
+    def test_owner_unlinks_on_exit(self):
+        with SharedScorer.publish(Scorer(FREQ)) as shared:
+            name = shared.name
+            assert name in sharedmem._PUBLISHED
+        assert name not in sharedmem._PUBLISHED
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+    def test_cleanup_unlinks_leftovers(self):
+        shared = SharedScorer.publish(Scorer(FREQ))
+        name = shared.name
+        assert shared.scorer.score("k", "k") == 5
+        sharedmem.cleanup()
+        assert not sharedmem._PUBLISHED
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+
+class TestSharedLexicon:
+    def test_roundtrip(self):
+        with SharedLexicon.publish(WORDS) as lexicon:
+            assert len(lexicon) == 3
+            assert lexicon[0] == (["k", "a", "t"], ["C", "V", "C"])
+            assert lexicon[1] == ([], [])
+            assert lexicon[-1] == (["a", "t", "a"], ["V", "C", "V"])
+            assert list(lexicon.ids(2)) == [1, 2, 1]
+            assert lexicon.header["segments"] == ["k", "a", "t"]
+            with pytest.raises(IndexError):
+                lexicon[3]
+
+    def test_mismatched_profile(self):
+        with pytest.raises(ValueError, match="word 0"):
+            SharedLexicon.publish([(["k", "a"], ["C"])])
+        # Equal totals must not hide profiles shifted between words.
+        with pytest.raises(ValueError, match="word 0"):
+            SharedLexicon.publish([(["k", "a"], ["C"]), (["t"], ["C", "V"])])
+        assert not sharedmem._PUBLISHED
+
+    def test_workers_attach_by_name(self):
+        scorer = Scorer(FREQ)
+        expected = [
+            Scorer(FREQ).score(*pair)
+            for pair in Uralign.hu_many([(list("kat"), list("kat"), "C", "C")])
+        ]
+        with SharedScorer.publish(scorer) as shared:
+            with SharedLexicon.publish(WORDS) as lexicon:
+                with ProcessPoolExecutor(2) as executor:
+                    result = executor.submit(
+                        _score_in_worker, shared.name, lexicon.name, 0, list("kat")
+                    ).result()
+        assert result == expected
+        assert not sharedmem._PUBLISHED
@@ -0,0 +1,85 @@
+"""Tests for loanpy.significance."""
+
+import random
+
+import pytest
+
+from loanpy import Scorer, Uralign, permutation_pvalues, score_matrix
+
+FREQ = {("k", "k"): 5, ("a", "a"): 6, ("t", "t"): 4, ("a", "o"): 2}
+
+
+def _word(segments):
+    return segments, ["V" if seg in "aoi" else "C" for seg in segments]
+
+
+@pytest.fixture
+def wordlists():
+    rng = random.Random(3)
+    recipients = [
+        _word([rng.choice("kat") for _ in range(rng.randint(1, 4))]) for _ in range(12)
+    ]
+    donors = [_word(list(segments)) for segments, _ in recipients[:6]]
+    donors += [
+        _word([rng.choice("kato") for _ in range(rng.randint(1, 4))]) for _ in range(6)
+    ]
+    return recipients, donors
+
+
+class TestScoreMatrix:
+    def test_matches_uralign(self, wordlists):
+        recipients, donors = wordlists
+        matrix = score_matrix(recipients, donors, FREQ)
+        for i, (d_segments, d_profile) in enumerate(donors):
+            for j, (r_segments, r_profile) in enumerate(recipients):
+                alm_r, alm_d = Uralign.hu(
+                    r_segments.copy(), d_segments.copy(), r_profile[0], d_profile[0]
+                )
+                assert matrix[i][j] == Uralign.get_score(alm_r, alm_d, FREQ)
+
+    def test_accepts_compiled_scorer(self, wordlists):
+        recipients, donors = wordlists
+        assert score_matrix(recipients, donors, Scorer(FREQ)) == score_matrix(
+            recipients, donors, FREQ
+        )
+
+
+class TestPermutationPvalues:
+    def test_reference_shuffle_and_rescore(self):
+        matrix = [[5, 1, 1], [0, 2, 9], [3, 3, 3]]
+        pvalues = permutation_pvalues(matrix, n_permutations=200, seed=4, block_size=50)
+        # reference: the same seeded permutations, counted naively
+        block_rng = random.Random(4)
+        counts = [0, 0, 0]
+        for _ in range(4):
+            rng = random.Random(block_rng.getrandbits(64))
+            permutation = [0, 1, 2]
+            for _ in range(50):
+                rng.shuffle(permutation)
+                for i in range(3):
+                    counts[i] += matrix[i][permutation[i]] >= matrix[i][i]
+        assert pvalues == [(1 + c) / 201 for c in counts]
+        assert pvalues[2] == 1.0
+
+    def test_true_pairs_are_significant(self, wordlists):
+        recipients, donors = wordlists
+        matrix = score_matrix(recipients, donors, FREQ)
+        pvalues = permutation_pvalues(matrix, n_permutations=300, seed=1)
+        assert max(pvalues[:6]) < min(pvalues[6:])
+
+    def test_seeded_and_independent_of_processes(self, wordlists):
+        recipients, donors = wordlists
+        matrix = score_matrix(recipients, donors, FREQ)
+        serial = permutation_pvalues(matrix, 120, seed=9, block_size=40)
+        parallel = permutation_pvalues(
+            matrix, 120, seed=9, processes=2, block_size=40
+        )
+        assert serial == parallel
+        assert serial != permutation_pvalues(matrix, 120, seed=10, block_size=40)
+
+    def test_zero_permutations(self):
+        assert permutation_pvalues([[1]], n_permutations=0) == [1.0]
+
+    def test_non_square_raises(self):
+        with pytest.raises(ValueError, match="square"):
+            permutation_pvalues([[1, 2]])
@@ -0,0 +1,200 @@
+"""Tests for loanpy.store."""
+
+import random
+
+import pytest
+from conftest import random_words
+
+from loanpy import Adapt, CorpusStore, LoanwordSearch, store as store_module
+from loanpy.correspondences import get_sound_correspondences
+
+FREQ = {
+    ("k", "k"): 4,
+    ("a", "a"): 6,
+    ("a", "o"): 3,
+    ("t", "t"): 5,
+    ("t", "d"): 2,
+    ("#-", "-"): 3,
+    ("i", "i"): 2,
+    ("-#", "a"): 2,
+}
+TEMPLATES = ["C V", "C V C", "C V C V", "V C V"]
+ROWS = [
+    {"Language_ID": "H", "Cognateset_ID": "1", "Uralign": "k a t"},
+    {"Language_ID": "U", "Cognateset_ID": "1", "Uralign": "k o t"},
+    {"Language_ID": "H", "Cognateset_ID": "2", "Uralign": "t a"},
+    {"Language_ID": "U", "Cognateset_ID": "2", "Uralign": "d a"},
+]
+
+
+class CountingAdapt(Adapt):
+    def __init__(self):
+        self.substitutions = {"d": "t", "h": ""}
+        self.calls = 0
+
+    def substitute(self, segments):
+        self.calls += 1
+        return super().substitute(segments)
+
+
+def _forms(words):
+    return len({(tuple(s), tuple(c)) for _, s, c in words})
+
+
+@pytest.fixture
+def wordlists():
+    rng = random.Random(47)
+    donors = random_words(rng, 20, "kathdo", "d")
+    donors.append(("dup", *donors[0][1:]))
+    return donors, random_words(rng, 30, "katoi", "r")
+
+
+class TestLexicon:
+    def test_sync_reports_changes_and_round_trips(self, wordlists):
+        donors, _ = wordlists
+        store = CorpusStore()
+        assert store.sync_lexicon("d", donors) == {
+            "added": len(donors),
+            "changed": 0,
+            "removed": 0,
+            "unchanged": 0,
+        }
+        assert store.lexicon("d") == donors
+        edited = [donors[1], ("d0", ["k", "a"], ["C", "V"]), *donors[3:]]
+        assert store.sync_lexicon("d", edited) == {
+            "added": 0,
+            "changed": 1,
+            "removed": 1,
+            "unchanged": len(donors) - 2,
+        }
+        assert store.lexicon("d") == edited
+
+    def test_duplicate_ids_raise(self):
+        with pytest.raises(ValueError, match="duplicate"):
+            CorpusStore().sync_lexicon("d", [(1, ["a"], ["V"]), (1, ["b"], ["C"])])
+
+    def test_persists_on_disk(self, tmp_path, wordlists):
+        donors, _ = wordlists
+        with CorpusStore(tmp_path / "store.sqlite") as store:
+            store.sync_lexicon("d", donors)
+        with CorpusStore(tmp_path / "store.sqlite") as store:
+            assert store.lexicon("d") == donors
+
+
+class TestCorrespondences:
+    def test_round_trip(self):
+        stats = get_sound_correspondences(ROWS, "Uralign")
+        store = CorpusStore()
+        assert store.load_correspondences("uralic") is None
+        store.save_correspondences("uralic", stats)
+        loaded = store.load_correspondences("uralic")
+        assert loaded == stats
+        assert list(loaded["AbsoluteFrequency"]) == list(stats["AbsoluteFrequency"])
+
+    def test_mining_is_skipped_for_unchanged_input(self, monkeypatch):
+        store = CorpusStore()
+        first = store.mine_correspondences("uralic", ROWS, "Uralign")
+
+        def fail(*args, **kwargs):
+            raise AssertionError("mined again")
+
+        monkeypatch.setattr("loanpy.store.get_sound_correspondences", fail)
+        assert store.mine_correspondences("uralic", ROWS, "Uralign") == first
+        changed = [dict(ROWS[0], Uralign="k a"), *ROWS[1:]]
+        with pytest.raises(AssertionError, match="mined again"):
+            store.mine_correspondences("uralic", changed, "Uralign")
+
+
+class TestScores:
+    def _search(self, adapt, k=3):
+        return LoanwordSearch(FREQ, adapt, TEMPLATES, k=k, min_score=0)
+
+    def test_top_matches_equal_search(self, wordlists):
+        donors, recipients = wordlists
+        store = CorpusStore()
+        store.sync_lexicon("d", donors)
+        store.sync_lexicon("r", recipients)
+        search = self._search(CountingAdapt())
+        distinct = _forms(donors)
+        assert store.update_scores(search, "d", "r") == distinct * _forms(recipients)
+        expected = list(self._search(CountingAdapt()).search(donors, recipients))
+        assert store.top_matches(search, "d", "r") == expected
+        assert search.adapt.calls == distinct
+
+    def test_only_changed_rows_are_recomputed(self, wordlists):
+        donors, recipients = wordlists
+        store = CorpusStore(commit_every=4)
+        store.sync_lexicon("d", donors)
+        store.sync_lexicon("r", recipients)
+        adapt = CountingAdapt()
+        store.update_scores(self._search(adapt), "d", "r")
+        assert store.update_scores(self._search(adapt), "d", "r") == 0
+
+        new_donor = ("d_new", ["k", "o", "t"], ["C", "V", "C"])
+        new_recipient = ("r_new", ["k", "a", "t", "a"], ["C", "V", "C", "V"])
+        donors = [*donors[1:], new_donor]
+        recipients = [new_recipient, *recipients[:-1]]
+        store.sync_lexicon("d", donors)
+        store.sync_lexicon("r", recipients)
+        calls = adapt.calls
+        # Old donor forms only meet the new recipient; only the new donor
+        # form is adapted, and it meets every distinct recipient form.
+        assert store.update_scores(self._search(adapt), "d", "r") == (
+            _forms(donors) - 1 + _forms(recipients)
+        )
+        assert adapt.calls == calls + 1
+        expected = list(self._search(CountingAdapt()).search(donors, recipients))
+        assert store.top_matches(self._search(adapt), "d", "r") == expected
+
+    def test_other_settings_do_not_reuse_scores(self, wordlists):
+        donors, recipients = wordlists
+        store = CorpusStore()
+        store.sync_lexicon("d", donors)
+        store.sync_lexicon("r", recipients)
+        store.update_scores(self._search(CountingAdapt()), "d", "r")
+        other = LoanwordSearch(FREQ, None, None, k=2, min_score=0, final_gap=False)
+        assert store.update_scores(other, "d", "r") > 0
+        assert store.top_matches(other, "d", "r") == list(
+            other.search(donors, recipients)
+        )
+
+    def test_blocking_is_honoured(self, wordlists):
+        donors, recipients = wordlists
+        store = CorpusStore()
+        store.sync_lexicon("d", donors)
+        store.sync_lexicon("r", recipients)
+        # With k this large, blocking drops pairs that would fill the ranking.
+        plain = LoanwordSearch(FREQ, CountingAdapt(), TEMPLATES, k=10)
+        blocked = LoanwordSearch(FREQ, CountingAdapt(), TEMPLATES, k=10, blocking=True)
+        pairs = _forms(donors) * _forms(recipients)
+        assert store.update_scores(plain, "d", "r") == pairs
+        assert 0 < store.update_scores(blocked, "d", "r") < pairs
+        expected = list(blocked.search(donors, recipients))
+        assert expected != list(plain.search(donors, recipients))
+        assert store.top_matches(blocked, "d", "r") == expected
+        assert store.top_matches(plain, "d", "r") == list(
+            plain.search(donors, recipients)
+        )
+
+    def test_scorer_is_hashed_once(self, wordlists, monkeypatch):
+        donors, recipients = wordlists
+        store = CorpusStore()
+        store.sync_lexicon("d", donors)
+        store.sync_lexicon("r", recipients)
+        search = self._search(CountingAdapt())
+        hashed = []
+        content_hash = store_module.content_hash
+
+        def counting_hash(*parts):
+            if parts and parts[-1] == search.scorer.weights:
+                hashed.append(parts)
+            return content_hash(*parts)
+
+        monkeypatch.setattr(store_module, "content_hash", counting_hash)
+        for _ in range(3):
+            store.update_scores(search, "d", "r")
+            store.top_matches(search, "d", "r")
+        assert len(hashed) == 1
+        other = self._search(CountingAdapt())
+        store.top_matches(other, "d", "r")
+        assert len(hashed) == 2
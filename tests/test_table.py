@@ -0,0 +1,97 @@
+"""Tests for loanpy.table."""
+
+import csv
+
+import pytest
+
+from loanpy import Adapt, Cluster, SegmentTable, SegmentVocabulary, Uralign
+
+ROWS = [
+    {"ID": "w1", "Segments": "f l a", "CV": "C C V"},
+    {"ID": "w2", "Segments": "a p", "CV": "VC"},
+    {"ID": "w3", "Segments": "", "CV": ""},
+]
+
+
+class TestSegmentTable:
+    def test_from_rows_columns_and_views(self):
+        table = SegmentTable.from_rows(ROWS, "Segments", "CV", ["ID"])
+        assert len(table) == 3
+        assert table.columns == {"ID": ["w1", "w2", "w3"]}
+        assert list(table.offsets) == [0, 3, 5, 5]
+        assert table.cv == "CCVVC"
+        view, profile = table[1]
+        assert isinstance(view, memoryview)
+        assert table.vocabulary.decode(view) == ["a", "p"] and profile == "VC"
+        assert table.decode(0) == (["f", "l", "a"], ["C", "C", "V"])
+        assert table.decode(2) == ([], [])
+        with pytest.raises(BufferError):
+            table.append("k")
+        del view
+
+    def test_from_csv(self, tmp_path):
+        path = tmp_path / "forms.csv"
+        with open(path, "w", encoding="utf-8", newline="") as file:
+            writer = csv.DictWriter(file, ["ID", "Segments", "CV"])
+            writer.writeheader()
+            writer.writerows(ROWS)
+        table = SegmentTable.from_csv(path, "Segments", "CV", ["ID"])
+        assert [table.decode(i) for i in range(3)] == [
+            SegmentTable.from_rows(ROWS, "Segments", "CV").decode(i) for i in range(3)
+        ]
+
+    def test_append_profiles_and_metadata(self):
+        table = SegmentTable()
+        table.append(["k", "a"])
+        table.append("t a", "CV", Gloss="x")
+        assert table.cv_profile(0) == "??"
+        assert table.columns == {"Gloss": [None, "x"]}
+        with pytest.raises(ValueError, match="same length"):
+            table.append("k a", "C")
+
+    def test_cluster_cv_needs_profiles(self):
+        table = SegmentTable.from_rows(ROWS, "Segments")
+        assert table.cv_profile(0) == "???"
+        with pytest.raises(ValueError, match="word 0 has no C/V profile"):
+            table.cluster_cv()
+        table = SegmentTable.from_rows(ROWS, "Segments", "CV")
+        table.append("k a")
+        with pytest.raises(ValueError, match="word 3"):
+            table.cluster_cv()
+
+    def test_batch_methods_match_string_apis(self):
+        vocab = SegmentVocabulary()
+        recipients = SegmentTable.from_rows(ROWS, "Segments", "CV", ["ID"], vocab)
+        donors = SegmentTable.from_rows(
+            [
+                {"Segments": "p a ʔ t", "CV": "CVCC"},
+                {"Segments": "o t", "CV": "VC"},
+                {"Segments": "k", "CV": "C"},
+            ],
+            "Segments",
+            "CV",
+            vocabulary=vocab,
+        )
+        adapt = Adapt()
+        adapt.substitutions = {"ʔ": "", "o": "a"}
+        adapted = donors.substitute(adapt)
+        assert adapted.decode(0) == (["p", "a", "t"], ["C", "V", "C"])
+
+        clustered = recipients.cluster_cv()
+        assert clustered.decode(0) == (["f.l", "a"], ["C", "V"])
+        assert clustered.columns == recipients.columns
+
+        expected = []
+        for i in range(3):
+            seg_hu, cv_hu = clustered.decode(i)
+            seg_pu, cv_pu = adapted.decode(i)
+            assert seg_hu == Cluster.cv(*recipients.decode(i))
+            expected.append(
+                Uralign.hu(seg_hu, seg_pu, "".join(cv_hu[:1]), "".join(cv_pu[:1]))
+            )
+        out = clustered.hu_many(adapted)
+        assert [(vocab.decode(h), vocab.decode(p)) for h, p in out] == expected
+        out = clustered.hu_many(adapted, pairs=[(1, 0)])
+        assert vocab.decode(out[0][0]) == ["#-", "a", "p"]
+        with pytest.raises(ValueError):
+            clustered.hu_many(SegmentTable())
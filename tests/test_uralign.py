@@ -1,6 +1,8 @@
 """Tests for loanpy.uralign."""
 
-from loanpy import Uralign
+import random
+
+from loanpy import PRUNED, SegmentVocabulary, Uralign
 
 
 class TestUralignHu:
@@ -75,3 +77,116 @@ class TestUralignGetScore:
 
     def test_empty_alignment_zero(self):
         assert Uralign.get_score([], [], {}, freq_filter=2) == 0
+
+
+class TestUralignGetScoreMinScore:
+    scorer = {("a", "x"): 5, ("b", "y"): 3}
+
+    def test_reachable_threshold_returns_exact_score(self):
+        score = Uralign.get_score(
+            ["a", "b"], ["x", "y"], self.scorer, freq_filter=2, min_score=8
+        )
+        assert score == 8
+
+    def test_unreachable_threshold_returns_sentinel(self):
+        score = Uralign.get_score(
+            ["a", "b"], ["x", "y"], self.scorer, freq_filter=2, min_score=9
+        )
+        assert score == PRUNED
+
+    def test_stops_after_first_penalty(self):
+        class CountingScorer(dict):
+            lookups = 0
+
+            def get(self, key, default=None):
+                CountingScorer.lookups += 1
+                return super().get(key, default)
+
+        scorer = CountingScorer(self.scorer)
+        seq_a, seq_b = ["q"] + ["a"] * 9, ["q"] + ["x"] * 9
+        score = Uralign.get_score(
+            seq_a, seq_b, scorer, freq_filter=2, min_score=0, max_weight=5
+        )
+        assert score == PRUNED
+        assert CountingScorer.lookups == 1
+
+    def test_max_weight_scanned_once_per_table(self):
+        class CountingScorer(dict):
+            scans = 0
+
+            def values(self):
+                CountingScorer.scans += 1
+                return super().values()
+
+        scorer = CountingScorer(self.scorer)
+        for _ in range(100):
+            Uralign.get_score(["a", "b"], ["x", "y"], scorer, min_score=3)
+        assert CountingScorer.scans == 1
+        Uralign.get_score(["a"], ["x"], scorer, freq_filter=6, min_score=3)
+        scorer[("c", "z")] = 9
+        assert Uralign.get_score(["c"], ["z"], scorer, min_score=9) == 9
+        assert CountingScorer.scans == 3
+
+    def test_matches_unbounded_scores_above_threshold(self):
+        pairs = [(["a", "b"], ["x", "y"]), (["a", "q"], ["x", "y"]), (["b"], ["y"])]
+        for seq_a, seq_b in pairs:
+            full = Uralign.get_score(seq_a, seq_b, self.scorer)
+            bounded = Uralign.get_score(seq_a, seq_b, self.scorer, min_score=3)
+            assert bounded == (full if full >= 3 else PRUNED)
+
+
+class TestUralignHuMany:
+    def test_matches_hu_without_mutating_inputs(self):
+        rng = random.Random(0)
+        words = []
+        for _ in range(300):
+            seg_h = [rng.choice("ktaie") for _ in range(rng.randint(0, 5))]
+            seg_p = [rng.choice("ktaie") for _ in range(rng.randint(0, 5))]
+            words.append((seg_h, seg_p, rng.choice("CV"), rng.choice("CV")))
+        snapshot = [(list(h), list(p)) for h, p, _, _ in words]
+        for initial_gap in (True, False):
+            for final_gap in (True, False):
+                out = Uralign.hu_many(words, initial_gap, final_gap)
+                for (seg_h, seg_p, cv_h, cv_p), (out_h, out_p) in zip(words, out):
+                    exp_h, exp_p = Uralign.hu(
+                        seg_h.copy(), seg_p.copy(), cv_h, cv_p, initial_gap, final_gap
+                    )
+                    assert (list(out_h), list(out_p)) == (exp_h, exp_p)
+        assert [(h, p) for h, p, _, _ in words] == snapshot
+
+    def test_accepts_tuples_and_returns_input_order(self):
+        words = [(("k",), ("k", "a", "t"), "C", "C"), ("a", "o", "V", "V")]
+        out = Uralign.hu_many(words)
+        assert out[0] == (("k", "-#"), ("k", "a.t"))
+        assert out[1] == (("#-", "a"), ("-", "o"))
+
+    def test_ids_match_strings_and_score_identically(self):
+        rng = random.Random(1)
+        freq = {("k", "k"): 4, ("a", "a"): 5, ("#-", "-"): 3, ("-#", "t.a"): 2}
+        vocab = SegmentVocabulary()
+        id_freq = vocab.encode_pairs(freq)
+        for initial_gap in (True, False):
+            for final_gap in (True, False):
+                words = [
+                    (
+                        [rng.choice("kta") for _ in range(rng.randint(0, 4))],
+                        [rng.choice("kta") for _ in range(rng.randint(0, 4))],
+                        rng.choice("CV"),
+                        rng.choice("CV"),
+                    )
+                    for _ in range(100)
+                ]
+                encoded = [
+                    (vocab.encode(h), vocab.encode(p), cv_h, cv_p)
+                    for h, p, cv_h, cv_p in words
+                ]
+                out = Uralign.hu_many(words, initial_gap, final_gap)
+                out_ids = Uralign.hu_many_ids(encoded, vocab, initial_gap, final_gap)
+                for (h, p), (ids_h, ids_p) in zip(out, out_ids):
+                    assert (vocab.decode(ids_h), vocab.decode(ids_p)) == (
+                        list(h),
+                        list(p),
+                    )
+                    assert Uralign.get_score(ids_h, ids_p, id_freq) == (
+                        Uralign.get_score(h, p, freq)
+                    )
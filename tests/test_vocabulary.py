@@ -0,0 +1,29 @@
+"""Tests for loanpy.vocabulary."""
+
+from loanpy import SegmentVocabulary
+
+
+class TestSegmentVocabulary:
+    def test_intern_encode_decode(self):
+        vocab = SegmentVocabulary(["k", "a"])
+        assert vocab.encode(["a", "t", "k"]) == [1, 2, 0]
+        assert vocab.decode([2, 0]) == ["t", "k"]
+        assert len(vocab) == 3
+        assert "t" in vocab and "x" not in vocab
+        assert vocab[1] == "a"
+
+    def test_join_flattens_and_memoises(self):
+        vocab = SegmentVocabulary()
+        k, a, t = vocab.encode("kat")
+        ka = vocab.join((k, a))
+        assert vocab[ka] == "k.a"
+        assert vocab[vocab.join((ka, t))] == vocab[vocab.join((k, a, t))] == "k.a.t"
+        assert vocab.join([k, a]) == ka
+        assert vocab[vocab.join((k, a), sep=" ")] == "k a"
+
+    def test_pairs_roundtrip(self):
+        vocab = SegmentVocabulary()
+        freq = {("k", "k"): 3, ("a", "o"): 1}
+        encoded = vocab.encode_pairs(freq)
+        assert encoded == {(0, 0): 3, (1, 2): 1}
+        assert vocab.decode_pairs(encoded) == freq